@@ -0,0 +1,675 @@
+#!/usr/bin/env python3
+"""
+BlackCube - Suite de benchmarks hors ligne
+Mesure le parsing des klines, le calcul des indicateurs, le rendu des chandeliers
+(backend Agg), la lecture d'une série en mémoire partagée, l'application de diffs au carnet d'ordres local, l'évaluation des
+règles d'alerte, l'exécution d'ordres simulés, les corrélations glissantes (300 symboles x 10 000
+bougies) et l'actualisation de la watchlist contre un serveur local.
+
+Exemples :
+    python bench.py --length 1000 --symbols 20 --output bench_results.json
+    python bench.py --save-baseline bench_baseline.json
+    python bench.py --baseline bench_baseline.json --threshold 0.25
+    python bench.py --check
+
+Des vérifications de comportement (résultats comparés à des références simples)
+sont exécutées avant les mesures ; un échec fait sortir le script en erreur.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+
+import main
+from mock_server import MarketDataServer, Recorder, ReplaySource, SyntheticSource
+from synthetic import SyntheticDepth, generate_klines, synthetic_symbols
+
+STAGES = ['parse_klines', 'indicators', 'render', 'series_read', 'orderbook', 'alerts',
+          'paper_trading', 'correlation_load', 'correlation_update', 'watchlist_refresh']
+SERIES_ROWS = 1000  # plus longue série publiée par le collecteur (limite d'une requête klines)
+
+def time_stage(func: Callable, repeat: int, setup: Callable = None) -> List[float]:
+    """Exécute `func` `repeat` fois et retourne les durées (s)"""
+    samples = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        func(arg) if setup else func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def summarize(samples: List[float]) -> Dict:
+    """Statistiques d'une série de mesures"""
+    ordered = sorted(samples)
+    return {
+        'n': len(ordered),
+        'min': ordered[0],
+        'median': statistics.median(ordered),
+        'mean': statistics.fmean(ordered),
+        'p95': ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))],
+        'max': ordered[-1]
+    }
+
+def run_benchmarks(length: int, symbol_count: int, repeat: int, seed: int) -> Dict:
+    """Exécute toutes les étapes et retourne les résultats"""
+    symbols = synthetic_symbols(symbol_count)
+    klines = {symbol: generate_klines(symbol, length, seed=seed) for symbol in symbols}
+    provider = main.DataProvider()
+    first = symbols[0]
+    samples: Dict[str, List[float]] = {}
+
+    # Parsing des klines (par symbole)
+    samples['parse_klines'] = time_stage(lambda: provider._parse_klines(klines[first]), repeat)
+
+    # Indicateurs techniques
+    parsed = provider._parse_klines(klines[first])
+    samples['indicators'] = time_stage(main.compute_indicators, repeat,
+                                       setup=lambda: parsed.copy())
+
+    # Rendu des chandeliers (Agg, hors écran) avec tous les indicateurs
+    data = main.compute_indicators(parsed.copy())
+    chart = main.ChartWidget()
+    indicators = ['SMA_20', 'SMA_50', 'BB_upper', 'RSI', 'MACD']
+    samples['render'] = time_stage(lambda: chart.plot_candlestick(data, first, indicators), repeat)
+
+    # Lecture par l'interface d'une série publiée (copie seqlock de l'emplacement en DataFrame),
+    # à la longueur maximale : coût ajouté sur le thread Tk à chaque mise à jour de graphique
+    segment = main.SharedSeries.create(SERIES_ROWS)
+    try:
+        slot, _ = segment.write(1, main.compute_indicators(
+            provider._parse_klines(generate_klines(first, SERIES_ROWS, seed=seed))))
+        samples['series_read'] = time_stage(lambda: segment.read(slot), repeat)
+    finally:
+        segment.close()
+
+    # Carnet d'ordres : snapshot puis 10 000 diffs
+    depth = SyntheticDepth(first, levels=1000, seed=seed)
+    snapshot = depth.snapshot(5000)
+    events = [depth.next_event(0) for _ in range(10_000)]
+
+    def apply_events(book):
+        for event in events:
+            book.apply_diff(event)
+
+    def fresh_book():
+        book = main.LocalOrderBook(first)
+        book.apply_snapshot(snapshot)
+        return book
+
+    samples['orderbook'] = time_stage(apply_events, repeat, setup=fresh_book)
+
+    # Alertes : 10 000 règles réparties sur les symboles, 1 000 ticks de tickers
+    closes = {symbol: float(klines[symbol][-1][4]) for symbol in symbols}
+    engine = main.AlertEngine(handlers=[])  # pas de journalisation pendant la mesure
+    rng = np.random.default_rng(seed)
+    for position in range(10_000):
+        symbol = symbols[position % len(symbols)]
+        engine.add_rule(symbol, 'price', ('above', 'below', 'cross')[position % 3],
+                        closes[symbol] * rng.uniform(0.95, 1.05), once=False)
+    walks = np.exp(np.cumsum(rng.normal(0.0, 0.001, (1000, len(symbols))), axis=0))
+    ticks = [{symbol: {'lastPrice': closes[symbol] * walk[column], 'priceChangePercent': 0.0}
+              for column, symbol in enumerate(symbols)} for walk in walks]
+
+    def evaluate_alerts():
+        for tick in ticks:
+            engine.update_tickers(tick)
+
+    samples['alerts'] = time_stage(evaluate_alerts, repeat)
+    engine.close()
+
+    # Trading papier : 500 ordres limite/stop ouverts, mêmes 1 000 ticks
+    def paper_session():
+        trader = main.PaperTrader()
+        trader.on_tickers(ticks[0])
+        for position in range(500):
+            symbol = symbols[position % len(symbols)]
+            trader.submit(symbol, ('buy', 'sell')[position % 2], 1.0, ('limit', 'stop')[position // 2 % 2],
+                          closes[symbol] * rng.uniform(0.9, 1.1))
+        return trader
+
+    def match_orders(trader):
+        for tick in ticks:
+            trader.on_tickers(tick)
+
+    samples['paper_trading'] = time_stage(match_orders, repeat, setup=paper_session)
+
+    # Corrélations : chargement de 300 x 10 000 clôtures puis 100 nouvelles bougies
+    walks = np.exp(np.cumsum(rng.normal(0.0, 0.01, (10_100, 300)), axis=0))
+    correlation_closes = pd.DataFrame(walks, index=pd.date_range('2020-01-01', periods=len(walks), freq='h'),
+                                      columns=synthetic_symbols(300))
+    history = correlation_closes.iloc[:10_000]
+
+    def loaded_analytics():
+        analytics = main.PortfolioAnalytics(window=500)
+        analytics.update(history)
+        return analytics
+
+    samples['correlation_load'] = time_stage(lambda: loaded_analytics().correlation(), repeat)
+    samples['correlation_update'] = time_stage(lambda analytics: (analytics.update(correlation_closes),
+                                                                  analytics.correlation()),
+                                               repeat, setup=loaded_analytics)
+
+    # Actualisation de la watchlist contre le serveur local
+    with MarketDataServer(SyntheticSource(length, seed), symbols=symbols, seed=seed) as server:
+        remote = main.DataProvider(server.base_url)
+        remote.get_watchlist_prices(symbols)  # préchauffe le cache du serveur
+        samples['watchlist_refresh'] = time_stage(lambda: remote.get_watchlist_prices(symbols), repeat)
+
+    return {
+        'meta': {
+            'timestamp': time.time(),
+            'length': length,
+            'symbols': symbol_count,
+            'repeat': repeat,
+            'seed': seed,
+            'python': platform.python_version(),
+            'platform': platform.platform()
+        },
+        'stages': {stage: summarize(samples[stage]) for stage in STAGES}
+    }
+
+def check_orderbook_sequencing(seed: int) -> List[str]:
+    """Séquence U/u : diffs antérieurs ignorés, premier diff à cheval accepté, trou
+    et chevauchement refusés, resynchronisation ; carnet comparé à des dicts"""
+    failures = []
+    depth = SyntheticDepth('BTCUSDT', levels=300, seed=seed)
+    stale = [depth.next_event(0) for _ in range(20)]
+    # Snapshot pris au milieu d'un diff couvrant plusieurs ids : ce diff doit être accepté
+    straddling = next(event for event in stale[10:] if event['u'] > event['U'])
+    snapshot = depth.snapshot(5000)
+    snapshot['lastUpdateId'] = straddling['U']
+    events = [depth.next_event(0) for _ in range(500)]
+    reference = {'bids': {float(price): float(quantity) for price, quantity in snapshot['bids']},
+                 'asks': {float(price): float(quantity) for price, quantity in snapshot['asks']}}
+
+    def apply_reference(event):
+        for side, key in (('bids', 'b'), ('asks', 'a')):
+            for price, quantity in event[key]:
+                if float(quantity):
+                    reference[side][float(price)] = float(quantity)
+                else:
+                    reference[side].pop(float(price), None)
+
+    def compare(book, label):
+        for side, descending in (('bids', True), ('asks', False)):
+            expected = sorted(reference[side].items(), reverse=descending)
+            prices, quantities = getattr(book, side).top(len(expected) + 1)
+            if list(zip(prices.tolist(), quantities.tolist())) != expected:
+                failures.append(f"{label}: {side} différents de la référence")
+
+    book = main.LocalOrderBook('BTCUSDT')
+    book.apply_snapshot(snapshot)
+    applied = [book.apply_diff(event) for event in stale]
+    if any(applied[:stale.index(straddling)]) or not all(applied[stale.index(straddling):]):
+        failures.append("diffs antérieurs au snapshot mal filtrés")
+    for event in stale[stale.index(straddling):] + events[:200]:
+        apply_reference(event)
+    for event in events[:200]:
+        book.apply_diff(event)
+    compare(book, "après 200 diffs")
+
+    # Trou (diff perdu) puis chevauchement une fois raccordé : les deux sont refusés
+    for label, event in (("trou", events[201]), ("chevauchement", dict(events[200], U=events[199]['u']))):
+        try:
+            book.apply_diff(event)
+            failures.append(f"{label} non détecté")
+        except main.OrderBookGap:
+            pass
+    book.reset()
+    try:
+        book.apply_diff(events[200])
+        failures.append("diff accepté sans snapshot")
+    except main.OrderBookGap:
+        pass
+
+    # Resynchronisation sur le carnet complet (référence reconstruite depuis le générateur)
+    resync = SyntheticDepth('BTCUSDT', levels=300, seed=seed)
+    for _ in range(len(stale) + 300):
+        resync.next_event(0)
+    snapshot = resync.snapshot(5000)
+    book.apply_snapshot(snapshot)
+    reference = {'bids': {float(price): float(quantity) for price, quantity in snapshot['bids']},
+                 'asks': {float(price): float(quantity) for price, quantity in snapshot['asks']}}
+    for event in events[250:]:
+        book.apply_diff(event)
+    for event in events[300:]:
+        apply_reference(event)
+    compare(book, "après resynchronisation")
+    if book.best_bid()[0] >= book.best_ask()[0]:
+        failures.append("carnet croisé")
+    return failures
+
+def check_orderbook_replay(seed: int) -> List[str]:
+    """Enregistre un flux à trous du serveur local puis le rejoue hors ligne :
+    mêmes resynchronisations et même meilleur bid/ask"""
+    failures = []
+    with tempfile.TemporaryDirectory() as directory, \
+            MarketDataServer(seed=seed, depth_interval=0.005, gap_rate=0.05) as server:
+        path = str(Path(directory) / 'depth.jsonl')
+        live = main.DataProvider(server.base_url).open_order_book('BTCUSDT', record_path=path)
+        deadline = time.monotonic() + 10
+        while live.resyncs < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        live.stop()
+        live.join(5)
+        if live.resyncs < 2:
+            return [f"carnet: {live.resyncs} resync en 10s (trous attendus)"]
+
+        stream_factory, snapshot_fn = main.replay_depth_file(path)
+        replay = main.OrderBookFeed('BTCUSDT', stream_factory, snapshot_fn, reconnect=False).start()
+        replay.join(5)
+        if replay.running or replay.error:
+            failures.append(f"rejeu du carnet inachevé ({replay.error})")
+        if replay.resyncs != live.resyncs:
+            failures.append(f"rejeu: {replay.resyncs} resyncs au lieu de {live.resyncs}")
+        for side in ('best_bid', 'best_ask'):
+            if getattr(replay.book, side)() != getattr(live.book, side)():
+                failures.append(f"rejeu: {side} {getattr(replay.book, side)()} != {getattr(live.book, side)()}")
+    return failures
+
+def check_ticker_replay(seed: int) -> List[str]:
+    """Enregistre des tickers demandés par lots (?symbols=[...]) puis les rejoue sans
+    repli synthétique : mêmes tickers pour chaque symbole"""
+    symbols = synthetic_symbols(150)  # deux lots
+    with tempfile.TemporaryDirectory() as directory, MarketDataServer(seed=seed) as upstream:
+        path = str(Path(directory) / 'session.jsonl')
+        with MarketDataServer(recorder=Recorder(upstream.base_url, path), seed=seed) as recording:
+            recorded = main.DataProvider(recording.base_url).get_tickers(symbols)
+        with MarketDataServer(ReplaySource(path), seed=seed) as replay:
+            replayed = main.DataProvider(replay.base_url).get_tickers(symbols)
+    if sorted(recorded) != sorted(symbols):
+        return [f"enregistrement: {len(recorded)} tickers sur {len(symbols)}"]
+    different = [symbol for symbol in symbols if replayed.get(symbol) != recorded[symbol]]
+    if different:
+        return [f"rejeu: {len(different)} tickers différents de l'enregistrement (ex. {different[0]})"]
+    return []
+
+def check_hedged_requests(seed: int) -> List[str]:
+    """Requêtes couvertes contre deux serveurs locaux : le secours rapide répond dans le
+    budget quand le principal est lent, et immédiatement quand le principal échoue"""
+    failures = []
+    delay, symbols = 0.1, synthetic_symbols(5)
+    with MarketDataServer(latency=2.0, seed=seed) as slow, MarketDataServer(seed=seed) as fast, \
+            MarketDataServer(error_rate=1.0, seed=seed) as failing:
+        for label, primary, counter in (("principal lent", slow, 'hedge_backup_won'),
+                                        ("principal en erreur", failing, 'hedge_source_errors')):
+            provider = main.DataProvider(primary.base_url, backup_url=fast.base_url, hedge_delay=delay)
+            before = main.metrics.snapshot()['counters']
+            start = time.perf_counter()
+            tickers = provider.get_tickers(symbols)
+            elapsed = time.perf_counter() - start
+            after = main.metrics.snapshot()['counters']
+            if sorted(tickers) != sorted(symbols):
+                failures.append(f"{label}: {len(tickers)} tickers sur {len(symbols)}")
+            # Budget de couverture + marge, bien en dessous de la latence du serveur lent
+            if elapsed > delay + 0.5:
+                failures.append(f"{label}: réponse en {elapsed:.2f}s (budget {delay}s)")
+            for name in {counter, 'hedge_backup_won'}:
+                if after.get(name, 0) <= before.get(name, 0):
+                    failures.append(f"{label}: compteur {name} non incrémenté")
+    return failures
+
+def check_shared_series(seed: int) -> List[str]:
+    """Séries en mémoire partagée : écriture puis lecture identiques aux données, copies
+    indépendantes des emplacements réutilisés, lectures jamais déchirées par une écriture
+    concurrente ; collecteur identique au DataProvider local, métriques rapatriées"""
+    failures = []
+    columns = main.SERIES_COLUMNS[1:]
+    data = main.compute_indicators(main.BinanceSource.parse_klines(generate_klines('BTCUSDT', 1500, seed=seed)))
+    segment = main.SharedSeries.create(len(data))
+    try:
+        version, frame = segment.read(segment.write(1, data)[0])
+        if version != 1 or not frame.index.equals(data.index) or \
+                not np.array_equal(frame[columns].to_numpy(), data[columns].to_numpy(), equal_nan=True):
+            failures.append("lecture différente des données écrites")
+        for version in range(2, 2 + main.SharedSeries.SLOTS):  # réutilise l'emplacement lu
+            segment.write(version, data.iloc[:100] * 0)
+        if not np.array_equal(frame[columns].to_numpy(), data[columns].to_numpy(), equal_nan=True):
+            failures.append("copie lue modifiée par une publication ultérieure")
+        try:
+            segment.write(99, pd.concat([data, data.iloc[:1]]))
+            failures.append("données plus grandes que le segment acceptées")
+        except ValueError:
+            pass
+
+        # Écrivain concurrent : chaque publication ne contient que son numéro de version
+        stop = threading.Event()
+
+        def writer():
+            version = 100
+            while not stop.is_set():
+                version += 1
+                segment.write(version, pd.DataFrame(float(version), index=data.index[:500], columns=columns))
+
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # bascules fréquentes : l'écrivain est interrompu en pleine écriture
+        thread = threading.Thread(target=writer)
+        thread.start()
+        torn = reads = 0
+        deadline = time.monotonic() + 0.5
+        try:
+            while time.monotonic() < deadline:
+                for slot in range(main.SharedSeries.SLOTS):
+                    version, frame = segment.read(slot)
+                    values = frame[columns].to_numpy()
+                    reads += version > 100
+                    torn += version > 100 and not (values == version).all()
+        finally:
+            stop.set()
+            thread.join()
+            sys.setswitchinterval(switch_interval)
+        if not reads:
+            failures.append("aucune lecture pendant les écritures concurrentes")
+        if torn:
+            failures.append(f"{torn} lectures déchirées par une écriture concurrente")
+    finally:
+        segment.close()
+
+    # Collecteur contre DataProvider local sur le même serveur
+    with MarketDataServer(seed=seed) as server:
+        client = main.CollectorClient(server.base_url).start()
+        fetches = lambda: main.metrics.snapshot()['stages'].get('http_fetch', {}).get('count', 0)
+        try:
+            before = fetches()  # une requête locale + une requête du collecteur attendues
+            shared = client.get_crypto_data('BTCUSDT', '1h', 60)
+            local = main.DataProvider(server.base_url).get_crypto_data('BTCUSDT', '1h', 60)
+            if shared is None or len(shared) != len(local) or \
+                    not np.array_equal(shared[columns].to_numpy(), local[columns].to_numpy(), equal_nan=True):
+                failures.append("série du collecteur différente de celle du DataProvider")
+            deadline = time.monotonic() + 5
+            while fetches() < before + 2 and time.monotonic() < deadline:
+                time.sleep(0.05)
+            if fetches() < before + 2:
+                failures.append("métriques du collecteur non rapatriées")
+        finally:
+            client.shutdown()
+    return failures
+
+def check_alert_boundaries(seed: int) -> List[str]:
+    """Moteur d'alertes contre une évaluation exhaustive : prix tombant exactement sur
+    les seuils, règles à déclenchement unique retirées, ajouts et retraits en cours"""
+    rng = np.random.default_rng(seed)
+    with main.AlertEngine(handlers=[]) as engine:
+        grid = np.round(np.arange(90.0, 110.5, 0.5), 1)  # prix et seuils sur la même grille
+        reference: Dict[int, main.AlertRule] = {}
+
+        def add_rules(count):
+            for _ in range(count):
+                rule = engine.add_rule(str(rng.choice(['AAA', 'BBB'])), str(rng.choice(['price', 'RSI'])),
+                                       str(rng.choice(main.AlertEngine.CONDITIONS)), float(rng.choice(grid)),
+                                       once=bool(rng.random() < 0.5))
+                reference[rule.rule_id] = rule
+
+        def crossed(rule, previous, value):
+            up = previous < rule.threshold <= value
+            down = value <= rule.threshold < previous
+            return {'above': up, 'below': down, 'cross': up or down}[rule.condition]
+
+        add_rules(300)
+        last: Dict[Tuple[str, str], float] = {}
+        for tick in range(2000):
+            if tick % 250 == 100:
+                add_rules(20)
+            if tick % 250 == 200 and reference:
+                for rule_id in rng.choice(list(reference), size=min(10, len(reference)), replace=False):
+                    engine.remove_rule(int(rule_id))
+                    del reference[int(rule_id)]
+            symbol = str(rng.choice(['AAA', 'BBB']))
+            values = {metric: float(rng.choice(grid)) for metric in ('price', 'RSI')}
+            fired = sorted(event.rule.rule_id for event in engine.update(symbol, values))
+            expected = sorted(rule.rule_id for rule in reference.values()
+                              if rule.symbol == symbol and (symbol, rule.metric) in last
+                              and crossed(rule, last[(symbol, rule.metric)], values[rule.metric]))
+            if fired != expected:
+                return [f"tick {tick}: déclenchées {fired}, attendues {expected}"]
+            for rule_id in expected:
+                if reference[rule_id].once:
+                    del reference[rule_id]
+            last.update({(symbol, metric): value for metric, value in values.items()})
+        if sorted(rule.rule_id for rule in engine.rules()) != sorted(reference):
+            return ["règles restantes différentes de la référence"]
+        return []
+
+def check_paper_trading(seed: int) -> List[str]:
+    """Prix moyen, PnL réalisé et retournements de position du trading papier,
+    contre un cas calculé à la main et une comptabilité par lots d'ouverture"""
+    failures = []
+    current = {}  # dernier cours, aussi source de prix des symboles encore inconnus du simulateur
+    trader = main.PaperTrader(cash=10_000.0, fee_rate=0.001, slippage=0.0, price_source=current.get)
+    for price, side, quantity in ((100.0, 'buy', 2), (110.0, 'buy', 2), (120.0, 'sell', 5), (100.0, 'buy', 1)):
+        current['AAA'] = price
+        trader.on_prices(current)
+        trader.submit('AAA', side, quantity)
+        if price == 120.0:
+            position = trader.positions()[0]
+            if (position['quantity'], position['average_price'], position['realized_pnl']) != (-1.0, 120.0, 60.0):
+                failures.append(f"retournement: {position}")
+    position = trader.positions()[0]
+    expected_fees = 0.001 * (200 + 220 + 600 + 100)
+    if (position['quantity'], position['realized_pnl']) != (0.0, 80.0) or \
+            abs(position['fees'] - expected_fees) > 1e-9 or abs(trader.cash - (10_080.0 - expected_fees)) > 1e-9:
+        failures.append(f"clôture: {position}, liquidités {trader.cash}")
+
+    # Ordres invalides refusés avant d'être enregistrés
+    for args in (('AAA', 'short', 1), ('AAA', 'buy', 1, 'trailing', 100.0), ('AAA', 'buy', 0),
+                 ('AAA', 'buy', 1, 'limit'), ('AAA', 'sell', 1, 'stop', -5.0)):
+        try:
+            trader.submit(*args)
+            failures.append(f"ordre invalide accepté: {args}")
+        except ValueError:
+            pass
+    if trader.open_orders() or trader.count != 4:
+        failures.append(f"ordres invalides enregistrés ({trader.count} ordres)")
+    # Ordre au marché sans prix connu : ouvert jusqu'au premier ticker du symbole
+    pending = trader.submit('ZZZ', 'buy', 1)
+    if [order['id'] for order in trader.open_orders()] != [pending]:
+        failures.append("ordre au marché sans prix non conservé")
+    trader.on_prices({'ZZZ': 50.0})
+    if trader.open_orders() or trader.fill_price[pending] != 50.0:
+        failures.append("ordre au marché en attente non exécuté au ticker suivant")
+    # Une bougie plus ancienne que le dernier ticker ne remplace pas le dernier prix
+    trader.on_prices({'AAA': 105.0})
+    trader.on_candle('AAA', time.time() - 7200, 99.0, 98.0, 98.5, close_time=time.time() - 3600)
+    if trader.positions()[0]['last_price'] != 105.0:
+        failures.append(f"dernier prix remplacé par une bougie ancienne: {trader.positions()[0]['last_price']}")
+    trader.on_candle('AAA', time.time() - 60, 107.0, 104.0, 106.0, close_time=time.time() + 1)
+    if trader.positions()[0]['last_price'] != 106.0:
+        failures.append("dernier prix non mis à jour par une bougie récente")
+
+    # Ordres au marché aléatoires (glissement compris) : lots ouverts depuis le dernier passage par zéro
+    rng = np.random.default_rng(seed)
+    books = {symbol: {'lots': [], 'position': 0.0, 'realized': 0.0} for symbol in ('AAA', 'BBB', 'CCC')}
+    prices = {symbol: 100.0 for symbol in books}
+    trader = main.PaperTrader(cash=0.0, fee_rate=0.001, slippage=0.0005, price_source=prices.get)
+    flips = 0
+    for _ in range(3000):
+        symbol = str(rng.choice(list(books)))
+        prices[symbol] *= float(np.exp(rng.normal(0.0, 0.01)))
+        trader.on_prices({symbol: prices[symbol]})
+        side = 1 if rng.random() < 0.5 else -1
+        quantity = float(rng.integers(1, 6))
+        trader.submit(symbol, 'buy' if side > 0 else 'sell', quantity)
+        fill = prices[symbol] * (1 + side * 0.0005)
+
+        book = books[symbol]
+        average = sum(q * p for q, p in book['lots']) / sum(q for q, _ in book['lots']) if book['lots'] else 0.0
+        if book['position'] == 0 or (book['position'] > 0) == (side > 0):
+            book['lots'].append((quantity, fill))
+        else:
+            closed = min(quantity, abs(book['position']))
+            book['realized'] += closed * (fill - average) * np.sign(book['position'])
+            if quantity > abs(book['position']):
+                book['lots'] = [(quantity - closed, fill)]
+                flips += 1
+            else:
+                # Fermeture partielle : chaque lot est réduit au prorata, le prix moyen ne bouge pas
+                remaining = 1 - closed / abs(book['position'])
+                book['lots'] = [(q * remaining, p) for q, p in book['lots']] if remaining else []
+        book['position'] += side * quantity
+
+    for position in trader.positions():
+        book = books[position['symbol']]
+        average = sum(q * p for q, p in book['lots']) / sum(q for q, _ in book['lots']) if book['lots'] else 0.0
+        if position['quantity'] != book['position'] or abs(position['average_price'] - average) > 1e-9 * average \
+                or abs(position['realized_pnl'] - book['realized']) > 1e-6:
+            failures.append(f"{position['symbol']}: {position} (attendu {book['position']}, "
+                            f"{average}, {book['realized']})")
+    # Liquidités + positions = PnL réalisé + latent - frais
+    pnl = sum(p['realized_pnl'] + p['unrealized_pnl'] - p['fees'] for p in trader.positions())
+    if abs(trader.equity() - pnl) > 1e-6:
+        failures.append(f"valeur {trader.equity()} != PnL {pnl}")
+    if not flips:
+        failures.append("aucun retournement de position exercé")
+    return failures
+
+def check_incremental_covariance(seed: int) -> List[str]:
+    """Covariance glissante incrémentale (et resynchronisations périodiques) contre numpy
+    sur la même fenêtre de rendements, avec bêtas, force relative et instantané"""
+    failures = []
+    rng = np.random.default_rng(seed)
+    window, symbols = 50, synthetic_symbols(8)
+    walks = np.exp(np.cumsum(rng.normal(0.0, 0.02, (700, len(symbols))), axis=0))
+    closes = pd.DataFrame(walks, index=pd.date_range('2024-01-01', periods=len(walks), freq='h'), columns=symbols)
+    analytics = main.PortfolioAnalytics(window=window)
+    analytics.update(closes.iloc[:120])
+    for end in list(range(121, len(closes), 37)) + [len(closes)]:  # lots de tailles variables, plusieurs resyncs
+        analytics.update(closes.iloc[:end])
+        returns = np.diff(np.log(closes.iloc[:end].to_numpy()), axis=0)[-window:]
+        benchmark = symbols[end % len(symbols)]
+        column = symbols.index(benchmark)
+        covariance = np.cov(returns, rowvar=False)
+        expected = {
+            'covariance': (analytics.covariance(), covariance),
+            'correlation': (analytics.correlation(), np.corrcoef(returns, rowvar=False)),
+            'beta': (analytics.beta(benchmark), covariance[:, column] / covariance[column, column]),
+            'relative_strength': (analytics.relative_strength(benchmark),
+                                  (np.exp(returns.sum(axis=0) - returns[:, column].sum()) - 1) * 100)
+        }
+        snapshot = analytics.snapshot()
+        expected['snapshot_beta'] = (snapshot.beta(benchmark), expected['beta'][1])
+        for name, (actual, reference) in expected.items():
+            error = np.abs(actual - reference).max() / max(np.abs(reference).max(), 1e-12)
+            if error > 1e-9:
+                failures.append(f"{name} après {end} bougies: écart relatif {error:.2e}")
+    if analytics.last_timestamp != closes.index[-1]:
+        failures.append("dernière bougie non intégrée")
+    # Tendance forte sur 10 000 bougies : sans resynchronisation, les sommes dérivent (~5e-11)
+    trend = np.exp(np.cumsum(0.05 + rng.normal(0.0, 1e-3, (10_000, len(symbols))), axis=0))
+    trend = pd.DataFrame(trend, index=pd.date_range('2024-01-01', periods=len(trend), freq='h'), columns=symbols)
+    drifting = main.PortfolioAnalytics(window=window)
+    drifting.update(trend.iloc[:100])
+    drifting.update(trend)
+    reference = np.cov(np.diff(np.log(trend.to_numpy()), axis=0)[-window:], rowvar=False)
+    error = np.abs(drifting.covariance() - reference).max() / np.abs(reference).max()
+    if error > 1e-11:
+        failures.append(f"dérive après 10 000 bougies: écart relatif {error:.2e}")
+
+    # Changement de symboles : rechargement complet
+    analytics.update(closes.iloc[:, :4])
+    if analytics.symbols != symbols[:4] or analytics.covariance().shape != (4, 4):
+        failures.append("symboles modifiés non rechargés")
+    return failures
+
+CHECKS = [check_orderbook_sequencing, check_orderbook_replay, check_ticker_replay, check_hedged_requests,
+          check_shared_series, check_alert_boundaries, check_paper_trading, check_incremental_covariance]
+
+def run_checks(seed: int) -> List[str]:
+    """Exécute les vérifications et retourne les échecs"""
+    failures = []
+    for check in CHECKS:
+        failures += [f"{check.__name__}: {failure}" for failure in check(seed)]
+    return failures
+
+def find_regressions(results: Dict, baseline: Dict, threshold: float,
+                     stage_thresholds: Dict[str, float]) -> List[str]:
+    """Compare les médianes au baseline et liste les étapes en régression"""
+    regressions = []
+    for stage, stats in results['stages'].items():
+        reference = baseline.get('stages', {}).get(stage)
+        if not reference or reference['median'] <= 0:
+            continue
+        limit = stage_thresholds.get(stage, threshold)
+        ratio = stats['median'] / reference['median'] - 1
+        stats['vs_baseline'] = ratio
+        if ratio > limit:
+            regressions.append(f"{stage}: {ratio:+.1%} (seuil {limit:.0%}, "
+                               f"{reference['median'] * 1000:.2f}ms -> {stats['median'] * 1000:.2f}ms)")
+    return regressions
+
+def stage_threshold(value: str) -> Tuple[str, float]:
+    """Type argparse d'une option --stage-threshold stage=ratio"""
+    stage, _, ratio = value.partition('=')
+    try:
+        if stage in STAGES:
+            return stage, float(ratio)
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(f"seuil invalide: {value} (attendu <étape>=<ratio>, "
+                                     f"étapes: {', '.join(STAGES)})")
+
+def main_cli(argv=None) -> int:
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Benchmarks BlackCube (hors ligne)")
+    parser.add_argument('--length', type=int, default=500, help="nombre de klines par symbole")
+    parser.add_argument('--symbols', type=int, default=20, help="nombre de symboles de la watchlist")
+    parser.add_argument('--repeat', type=int, default=5, help="répétitions par étape")
+    parser.add_argument('--seed', type=int, default=42, help="graine des données synthétiques")
+    parser.add_argument('--output', default='bench_results.json', help="fichier de résultats JSON")
+    parser.add_argument('--baseline', help="résultats de référence à comparer")
+    parser.add_argument('--save-baseline', help="enregistre aussi les résultats comme référence")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="régression tolérée sur la médiane (0.25 = +25%%)")
+    parser.add_argument('--stage-threshold', action='append', default=[], type=stage_threshold,
+                        help="seuil spécifique, ex: render=0.5")
+    parser.add_argument('--check', action='store_true', help="vérifications seulement, sans mesures")
+    args = parser.parse_args(argv)
+
+    failures = run_checks(args.seed)
+    if failures:
+        print("Vérifications en échec :")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    if args.check:
+        print(f"{len(CHECKS)} vérifications OK")
+        return 0
+
+    results = run_benchmarks(args.length, args.symbols, args.repeat, args.seed)
+
+    regressions = []
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        regressions = find_regressions(results, baseline, args.threshold,
+                                       dict(args.stage_threshold))
+        results['regressions'] = regressions
+
+    Path(args.output).write_text(json.dumps(results, indent=2), encoding='utf-8')
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(results, indent=2), encoding='utf-8')
+
+    print(f"{'Étape':<20} {'médiane':>10} {'p95':>10} {'min':>10}")
+    for stage, stats in results['stages'].items():
+        print(f"{stage:<20} {stats['median'] * 1000:>8.2f}ms {stats['p95'] * 1000:>8.2f}ms "
+              f"{stats['min'] * 1000:>8.2f}ms")
+
+    if regressions:
+        print("\nRégressions détectées :")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -4,12 +4,17 @@ BlackCube - Bot d'évaluation et trading de cryptomonnaies
 Version 2.0 - Interface graphique moderne avec analyses avancées
 """
 
+import abc
+import argparse
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import requests
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.figure import Figure
+from matplotlib.collections import PolyCollection
+from matplotlib.ticker import MaxNLocator
 import matplotlib.dates as mdates
 from datetime import datetime, timedelta
 import json
@@ -17,15 +22,237 @@ import pandas as pd
 import numpy as np
 import threading
 import time
+import base64
+import bisect
+import io
+import multiprocessing
+import queue
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from multiprocessing import shared_memory
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
+import os
 from pathlib import Path
 
+try:
+    import websocket  # websocket-client, optionnel (carnet d'ordres Binance en direct)
+except ImportError:
+    websocket = None
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+class LatencyHistogram:
+    """Histogramme de latences à buckets fixes (en secondes)"""
+    
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)  # dernier bucket = +Inf
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+    
+    def observe(self, value: float):
+        """Enregistre une mesure"""
+        index = 0
+        while index < len(self.BUCKETS) and value > self.BUCKETS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+    
+    def merge(self, stats: Dict):
+        """Ajoute les mesures d'un résumé `snapshot()` (histogramme d'un autre processus)"""
+        if not stats['count']:
+            return
+        self.counts = [a + b for a, b in zip(self.counts, stats['buckets'])]
+        self.count += stats['count']
+        self.total += stats['sum']
+        self.min = min(self.min, stats['min'])
+        self.max = max(self.max, stats['max'])
+    
+    def quantile(self, q: float) -> float:
+        """Estime un quantile à partir des buckets (borne supérieure)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return min(self.BUCKETS[index], self.max) if index < len(self.BUCKETS) else self.max
+        return self.max
+    
+    def snapshot(self) -> Dict:
+        """Résumé sérialisable de l'histogramme"""
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'min': self.min if self.count else 0.0,
+            'max': self.max,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': list(self.counts)
+        }
+
+class Metrics:
+    """Registre thread-safe des métriques de performance (latences, compteurs, jauges)"""
+    
+    def __init__(self, prefix: str = 'blackcube'):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, float] = {}
+    
+    def observe(self, stage: str, seconds: float):
+        """Enregistre la durée d'une étape"""
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            histogram.observe(seconds)
+    
+    @contextmanager
+    def timer(self, stage: str):
+        """Chronomètre le bloc et l'enregistre sous le nom de l'étape"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+    
+    def increment(self, name: str, value: int = 1):
+        """Incrémente un compteur"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+    
+    def set_gauge(self, name: str, value: float):
+        """Fixe la valeur d'une jauge"""
+        with self._lock:
+            self.gauges[name] = value
+    
+    def drain(self) -> Dict:
+        """Copie des métriques puis remise à zéro des latences et compteurs (les jauges restent)"""
+        with self._lock:
+            snapshot = {
+                'timestamp': time.time(),
+                'stages': {name: h.snapshot() for name, h in self.histograms.items()},
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges)
+            }
+            self.histograms.clear()
+            self.counters.clear()
+            return snapshot
+    
+    def merge(self, snapshot: Dict):
+        """Ajoute les métriques drainées d'un autre processus (collecteur)"""
+        with self._lock:
+            for stage, stats in snapshot['stages'].items():
+                histogram = self.histograms.get(stage)
+                if histogram is None:
+                    histogram = self.histograms[stage] = LatencyHistogram()
+                histogram.merge(stats)
+            for name, value in snapshot['counters'].items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            self.gauges.update(snapshot['gauges'])
+    
+    def reset(self):
+        """Remet toutes les métriques à zéro"""
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.gauges.clear()
+    
+    def snapshot(self) -> Dict:
+        """Copie cohérente de toutes les métriques"""
+        with self._lock:
+            return {
+                'timestamp': time.time(),
+                'stages': {name: h.snapshot() for name, h in self.histograms.items()},
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges)
+            }
+    
+    @staticmethod
+    def _label(value: str) -> str:
+        """Échappe une valeur de label Prometheus (\\, " et retours à la ligne)"""
+        return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    
+    def export_prometheus(self) -> str:
+        """Exporte les métriques au format texte Prometheus"""
+        snapshot = self.snapshot()
+        lines = []
+        
+        name = f'{self.prefix}_stage_seconds'
+        lines.append(f'# HELP {name} Durée des étapes instrumentées')
+        lines.append(f'# TYPE {name} histogram')
+        for stage, stats in sorted(snapshot['stages'].items()):
+            stage = self._label(stage)
+            cumulative = 0
+            for bound, bucket_count in zip(LatencyHistogram.BUCKETS, stats['buckets']):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {stats["count"]}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {stats["sum"]:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {stats["count"]}')
+        
+        name = f'{self.prefix}_events_total'
+        lines.append(f'# HELP {name} Compteurs d\'événements')
+        lines.append(f'# TYPE {name} counter')
+        for event, value in sorted(snapshot['counters'].items()):
+            lines.append(f'{name}{{event="{self._label(event)}"}} {value}')
+        
+        name = f'{self.prefix}_gauge'
+        lines.append(f'# HELP {name} Jauges (tailles de cache, etc.)')
+        lines.append(f'# TYPE {name} gauge')
+        for gauge, value in sorted(snapshot['gauges'].items()):
+            lines.append(f'{name}{{name="{self._label(gauge)}"}} {value}')
+        
+        return '\n'.join(lines) + '\n'
+    
+    def export_jsonl(self) -> str:
+        """Exporte les métriques en JSON lines (une ligne par métrique)"""
+        snapshot = self.snapshot()
+        timestamp = snapshot['timestamp']
+        lines = []
+        for stage, stats in sorted(snapshot['stages'].items()):
+            lines.append(json.dumps({'ts': timestamp, 'type': 'histogram', 'name': stage, **stats}))
+        for event, value in sorted(snapshot['counters'].items()):
+            lines.append(json.dumps({'ts': timestamp, 'type': 'counter', 'name': event, 'value': value}))
+        for gauge, value in sorted(snapshot['gauges'].items()):
+            lines.append(json.dumps({'ts': timestamp, 'type': 'gauge', 'name': gauge, 'value': value}))
+        return '\n'.join(lines) + '\n'
+    
+    def format_report(self) -> str:
+        """Rapport lisible pour le panneau de debug"""
+        snapshot = self.snapshot()
+        lines = [f"{'Étape':<20} {'n':>6} {'moy.':>9} {'p50':>9} {'p95':>9} {'max':>9}"]
+        for stage, stats in sorted(snapshot['stages'].items()):
+            lines.append(f"{stage:<20} {stats['count']:>6} {stats['mean'] * 1000:>7.1f}ms "
+                         f"{stats['p50'] * 1000:>7.1f}ms {stats['p95'] * 1000:>7.1f}ms "
+                         f"{stats['max'] * 1000:>7.1f}ms")
+        lines.append('')
+        for event, value in sorted(snapshot['counters'].items()):
+            lines.append(f"{event:<28} {value:>10}")
+        for gauge, value in sorted(snapshot['gauges'].items()):
+            lines.append(f"{gauge:<28} {value:>10g}")
+        return '\n'.join(lines)
+
+# Registre global des métriques
+metrics = Metrics()
+
 @dataclass
 class AssetData:
     """Structure pour stocker les données d'un actif"""
@@ -35,115 +262,457 @@ class AssetData:
     change_24h: float
     data: Optional[pd.DataFrame] = None
 
+SERIES_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+
+class MarketSource(abc.ABC):
+    """Interface d'une source de données de marché
+    
+    Toutes les sources retournent les mêmes séries typées : un DataFrame indexé par
+    date ('datetime') avec les colonnes float64 de SERIES_FIELDS, et des tickers au
+    format /ticker/24hr (au minimum symbol, lastPrice, priceChangePercent).
+    """
+    
+    name = 'source'
+    catch_all = False  # True : accepte tout symbole sans le connaître (consultée après les autres)
+    
+    def supports(self, symbol: str) -> bool:
+        return True
+    
+    @abc.abstractmethod
+    def klines(self, symbol: str, interval: str = '1d', days: int = 30) -> pd.DataFrame:
+        """Série typée du symbole sur les `days` derniers jours"""
+    
+    @abc.abstractmethod
+    def tickers(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Tickers 24h des symboles connus de la source (les autres sont omis)"""
+
+class BinanceSource(MarketSource):
+    """API REST Binance v3 (ou compatible : miroir, serveur local)"""
+    
+    catch_all = True
+    
+    KLINE_COLUMNS = [
+        'timestamp', 'open', 'high', 'low', 'close', 'volume',
+        'close_time', 'quote_asset_volume', 'number_of_trades',
+        'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
+    ]
+    
+    def __init__(self, base_url: str, name: str = 'binance'):
+        self.base_url = base_url.rstrip('/')
+        self.name = name
+    
+    def supports(self, symbol: str) -> bool:
+        return symbol not in MetalsSource.METALS
+    
+    def raw_klines(self, symbol: str, interval: str = '1d', days: int = 30) -> List[list]:
+        """Récupère les klines brutes (listes JSON) sans les convertir"""
+        url = f'{self.base_url}/klines'
+        end_time = int(datetime.now().timestamp() * 1000)
+        start_time = int((datetime.now() - timedelta(days=days)).timestamp() * 1000)
+        
+        params = {
+            'symbol': symbol,
+            'interval': interval,
+            'startTime': start_time,
+            'endTime': end_time,
+            'limit': 1000
+        }
+        
+        with metrics.timer('http_fetch'):
+            response = requests.get(url, params=params, timeout=10)
+            response.raise_for_status()
+        metrics.increment('http_requests')
+        
+        with metrics.timer('json_decode'):
+            return response.json()
+    
+    @classmethod
+    def parse_klines(cls, raw_klines: List[list]) -> pd.DataFrame:
+        """Convertit les klines brutes de l'API en série typée (SERIES_FIELDS en float64, indexée par date)"""
+        data = pd.DataFrame(raw_klines, columns=cls.KLINE_COLUMNS)
+        
+        # Conversion des types
+        for col in SERIES_FIELDS:
+            data[col] = pd.to_numeric(data[col], errors='coerce')
+        
+        data['datetime'] = pd.to_datetime(data['timestamp'], unit='ms')
+        return data.set_index('datetime')[SERIES_FIELDS].astype(np.float64)
+    
+    def klines(self, symbol: str, interval: str = '1d', days: int = 30) -> pd.DataFrame:
+        raw_klines = self.raw_klines(symbol, interval, days)
+        with metrics.timer('kline_parse'):
+            return self.parse_klines(raw_klines)
+    
+    def tickers(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Tickers 24h d'un lot de symboles en une requête (paramètre `symbols`)"""
+        params = ({'symbol': symbols[0]} if len(symbols) == 1
+                  else {'symbols': json.dumps(symbols, separators=(',', ':'))})
+        with metrics.timer('http_ticker_batch'):
+            response = requests.get(f'{self.base_url}/ticker/24hr', params=params, timeout=10)
+            response.raise_for_status()
+        metrics.increment('http_requests')
+        
+        with metrics.timer('json_parse_ticker'):
+            body = response.json()
+            return {ticker['symbol']: ticker for ticker in (body if isinstance(body, list) else [body])}
+
+class MetalsSource(MarketSource):
+    """Cours spot des métaux précieux (API au format metals.live)
+    
+    `/spot` retourne les derniers cours ([{"gold": 2345.6}, ...]) et `/spot/<métal>`
+    l'historique ([{"timestamp": ms, "price": 2345.6}, ...]), ré-échantillonné en bougies.
+    """
+    
+    METALS = {'XAUUSD': 'gold', 'XAGUSD': 'silver', 'XPTUSD': 'platinum', 'XPDUSD': 'palladium'}
+    RESAMPLE = {'1m': '1min', '5m': '5min', '15m': '15min', '30m': '30min',
+                '1h': '1h', '4h': '4h', '1d': '1D', '1w': '1W'}
+    
+    def __init__(self, base_url: str, name: str = 'metals'):
+        self.base_url = base_url.rstrip('/')
+        self.name = name
+        self._day_open: Dict[str, Tuple[int, float]] = {}  # métal -> (jour UTC, cours d'ouverture)
+    
+    def supports(self, symbol: str) -> bool:
+        return symbol in self.METALS
+    
+    def _history(self, metal: str) -> pd.Series:
+        """Historique des cours d'un métal, trié par date"""
+        with metrics.timer('http_fetch'):
+            response = requests.get(f'{self.base_url}/{metal}', timeout=10)
+            response.raise_for_status()
+        metrics.increment('http_requests')
+        
+        points = response.json()
+        prices = pd.Series([float(point.get('price', point.get(metal))) for point in points],
+                           index=pd.to_datetime([point['timestamp'] for point in points], unit='ms'),
+                           dtype=np.float64)
+        return prices.sort_index()
+    
+    def _open_price(self, metal: str, day: int) -> Optional[float]:
+        """Cours d'ouverture du jour UTC tiré de l'historique (une requête par métal et par jour)"""
+        cached = self._day_open.get(metal)
+        if cached is not None and cached[0] == day:
+            return cached[1]
+        prices = self._history(metal)
+        if not len(prices):
+            return None
+        # Premier cours du jour, sinon dernier cours de la veille
+        today = prices[prices.index >= pd.Timestamp(day * 86400, unit='s')]
+        open_price = float(today.iloc[0] if len(today) else prices.iloc[-1])
+        self._day_open[metal] = (day, open_price)
+        return open_price
+    
+    def klines(self, symbol: str, interval: str = '1d', days: int = 30) -> pd.DataFrame:
+        prices = self._history(self.METALS[symbol])
+        prices = prices[prices.index >= prices.index.max() - pd.Timedelta(days=days)]
+        data = prices.resample(self.RESAMPLE.get(interval, '1D')).ohlc().dropna()
+        data['volume'] = 0.0
+        data.index.name = 'datetime'
+        return data.astype(np.float64)
+    
+    def tickers(self, symbols: List[str]) -> Dict[str, Dict]:
+        with metrics.timer('http_ticker_batch'):
+            response = requests.get(self.base_url, timeout=10)
+            response.raise_for_status()
+        metrics.increment('http_requests')
+        
+        spot = {}
+        for entry in response.json():
+            spot.update(entry)
+        day = int(time.time() // 86400)
+        tickers = {}
+        for symbol in symbols:
+            metal = self.METALS.get(symbol)
+            if metal not in spot:
+                continue
+            price = float(spot[metal])
+            # `/spot` ne donne pas d'ouverture : variation depuis l'ouverture du jour UTC de l'historique
+            open_price = self._open_price(metal, day) or price
+            tickers[symbol] = {'symbol': symbol, 'lastPrice': price,
+                               'priceChangePercent': (price - open_price) / open_price * 100}
+        return tickers
+
+class FileSource(MarketSource):
+    """Séries locales : fichiers CSV `<symbole>_<intervalle>.csv` ou `<symbole>.csv`
+    
+    Même format que l'export CSV de l'application (index de dates + colonnes OHLCV).
+    """
+    
+    def __init__(self, directory: str, name: str = 'file'):
+        self.directory = Path(directory)
+        self.name = name
+        self._listing: Tuple[Optional[int], Dict[str, Dict[Optional[str], Path]]] = (None, {})
+        self._frames: Dict[Path, Tuple[int, pd.DataFrame]] = {}  # fichier -> (mtime, série lue)
+    
+    def _files(self) -> Dict[str, Dict[Optional[str], Path]]:
+        """symbole -> {intervalle (None sans suffixe): fichier}, relu seulement si le dossier change"""
+        try:
+            mtime = self.directory.stat().st_mtime_ns
+        except OSError:
+            return {}
+        if self._listing[0] != mtime:
+            files: Dict[str, Dict[Optional[str], Path]] = {}
+            for path in sorted(self.directory.glob('*.csv')):
+                symbol, _, interval = path.stem.partition('_')
+                files.setdefault(symbol, {})[interval or None] = path
+            self._listing = (mtime, files)
+        return self._listing[1]
+    
+    def _path(self, symbol: str, interval: Optional[str] = None) -> Optional[Path]:
+        """Fichier de l'intervalle demandé ou sans intervalle ; sans `interval`, n'importe lequel"""
+        files = self._files().get(symbol)
+        if not files:
+            return None
+        if interval:
+            return files.get(interval, files.get(None))
+        return files.get(None) or files.get('1d') or next(iter(files.values()))
+    
+    def supports(self, symbol: str) -> bool:
+        return self._path(symbol) is not None
+    
+    def _read(self, symbol: str, interval: Optional[str] = None) -> pd.DataFrame:
+        path = self._path(symbol, interval)
+        if path is None:
+            raise FileNotFoundError(f"Pas de fichier pour {symbol} dans {self.directory}")
+        # Relu seulement si le fichier a changé (les tickers le demandent à chaque actualisation)
+        mtime = path.stat().st_mtime_ns
+        cached = self._frames.get(path)
+        if cached is None or cached[0] != mtime:
+            data = pd.read_csv(path, index_col=0, parse_dates=True)
+            data.index.name = 'datetime'
+            cached = self._frames[path] = (mtime, data[SERIES_FIELDS].astype(np.float64))
+        return cached[1]
+    
+    def klines(self, symbol: str, interval: str = '1d', days: int = 30) -> pd.DataFrame:
+        data = self._read(symbol, interval)
+        # Copie : les indicateurs sont ajoutés à la série retournée, pas à celle du cache
+        return data[data.index >= data.index.max() - pd.Timedelta(days=days)].copy()
+    
+    def tickers(self, symbols: List[str]) -> Dict[str, Dict]:
+        tickers = {}
+        for symbol in symbols:
+            if self._path(symbol) is None:
+                continue
+            closes = self._read(symbol)['close']
+            previous = closes.iloc[-2] if len(closes) > 1 else closes.iloc[-1]
+            tickers[symbol] = {'symbol': symbol, 'lastPrice': float(closes.iloc[-1]),
+                               'priceChangePercent': float((closes.iloc[-1] - previous) / previous * 100)}
+        return tickers
+
+class HedgedFetcher:
+    """Requêtes couvertes : si la source principale n'a pas répondu dans le budget de
+    latence (ou a échoué), la suivante est interrogée et la première bonne réponse gagne
+    
+    La latence de queue d'une actualisation est ainsi bornée par la source la plus rapide.
+    """
+    
+    def __init__(self, delay: float = 0.25, max_workers: int = 16):
+        self.delay = delay  # budget de latence avant la requête de secours (s)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedge')
+    
+    def call(self, calls: List, delay: Optional[float] = None):
+        """Exécute `calls` (fonctions sans argument, par ordre de préférence) en couverture"""
+        if not calls:
+            raise ValueError("Aucune source disponible")
+        delay = self.delay if delay is None else delay
+        start = time.perf_counter()
+        remaining = list(enumerate(calls))
+        pending: Dict = {}
+        error = None
+        
+        while remaining or pending:
+            if remaining and (not pending or error is not None):
+                position, call = remaining.pop(0)
+                pending[self._executor.submit(call)] = position
+                error = None
+            done, _ = wait(pending, timeout=delay if remaining else None, return_when=FIRST_COMPLETED)
+            if not done:
+                # Budget dépassé : on lance la source suivante sans abandonner la première
+                metrics.increment('hedge_fired')
+                position, call = remaining.pop(0)
+                pending[self._executor.submit(call)] = position
+                continue
+            for future in done:
+                position = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    metrics.increment('hedge_source_errors')
+                    continue
+                if result is None or len(result) == 0:
+                    error = ValueError("Réponse vide")
+                    continue
+                if position:
+                    metrics.increment('hedge_backup_won')
+                metrics.observe('hedged_fetch', time.perf_counter() - start)
+                return result
+        raise error
+
+def compute_indicators(data: pd.DataFrame) -> pd.DataFrame:
+    """Ajoute les indicateurs techniques (SMA, EMA, MACD, RSI, Bollinger) à une série typée"""
+    try:
+        # Moyennes mobiles
+        data['SMA_9'] = data['close'].rolling(window=9).mean()
+        data['SMA_20'] = data['close'].rolling(window=20).mean()
+        data['SMA_50'] = data['close'].rolling(window=50).mean()
+        
+        # EMA
+        data['EMA_12'] = data['close'].ewm(span=12).mean()
+        data['EMA_26'] = data['close'].ewm(span=26).mean()
+        
+        # MACD
+        data['MACD'] = data['EMA_12'] - data['EMA_26']
+        data['MACD_signal'] = data['MACD'].ewm(span=9).mean()
+        data['MACD_histogram'] = data['MACD'] - data['MACD_signal']
+        
+        # RSI
+        delta = data['close'].diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        rs = gain / loss
+        data['RSI'] = 100 - (100 / (1 + rs))
+        
+        # Bandes de Bollinger
+        data['BB_middle'] = data['close'].rolling(window=20).mean()
+        bb_std = data['close'].rolling(window=20).std()
+        data['BB_upper'] = data['BB_middle'] + (bb_std * 2)
+        data['BB_lower'] = data['BB_middle'] - (bb_std * 2)
+        
+        return data
+        
+    except Exception as e:
+        logger.error(f"Erreur calcul indicateurs: {e}")
+        return data
+
 class DataProvider:
-    """Gestionnaire des données de marché"""
+    """Gestionnaire des données de marché
     
-    def __init__(self):
-        self.base_url_binance = 'https://api.binance.com/api/v3'
-        self.base_url_metals = 'https://api.metals.live/v1/spot'  # API métaux (exemple)
+    Chaque symbole est servi par les sources qui le supportent (Binance et son
+    secours, métaux, fichiers locaux), interrogées en requêtes couvertes.
+    """
+    
+    KLINE_COLUMNS = BinanceSource.KLINE_COLUMNS
+    
+    DEFAULT_BASE_URL = 'https://api.binance.com/api/v3'
+    DEFAULT_BACKUP_URL = 'https://data-api.binance.vision/api/v3'  # miroir public Binance
+    
+    def __init__(self, base_url: Optional[str] = None, backup_url: Optional[str] = None,
+                 metals_url: Optional[str] = None, data_dir: Optional[str] = None,
+                 hedge_delay: float = 0.25):
+        # URL de l'API : argument, variable BLACKCUBE_API_URL ou Binance par défaut
+        self.base_url_binance = (base_url or os.environ.get('BLACKCUBE_API_URL')
+                                 or self.DEFAULT_BASE_URL).rstrip('/')
+        # Secours : miroir Binance par défaut, aucun pour une API personnalisée
+        backup_url = backup_url or os.environ.get('BLACKCUBE_BACKUP_API_URL') or (
+            self.DEFAULT_BACKUP_URL if self.base_url_binance == self.DEFAULT_BASE_URL else None)
+        self.base_url_metals = (metals_url or os.environ.get('BLACKCUBE_METALS_URL')
+                                or 'https://api.metals.live/v1/spot').rstrip('/')
+        data_dir = data_dir or os.environ.get('BLACKCUBE_DATA_DIR')
+        
+        # Sources par ordre de préférence
+        self.binance = BinanceSource(self.base_url_binance)
+        self.sources: List[MarketSource] = [self.binance]
+        if backup_url:
+            self.sources.append(BinanceSource(backup_url, name='binance-backup'))
+        self.sources.append(MetalsSource(self.base_url_metals))
+        if data_dir:
+            self.sources.append(FileSource(data_dir))
+        self.hedger = HedgedFetcher(hedge_delay)
+        # Lots de tickers en parallèle (pool distinct : chaque lot attend ses requêtes couvertes)
+        self._ticker_batches = ThreadPoolExecutor(max_workers=8, thread_name_prefix='tickers')
+        
         self.cache = {}
         self.cache_timeout = 300  # 5 minutes
+        self._cache_lock = threading.Lock()
+        self._inflight: Dict[str, list] = {}  # clé -> [verrou, appels en cours]
     
-    def get_crypto_data(self, symbol: str, interval: str = '1d', days: int = 30) -> Optional[pd.DataFrame]:
-        """Récupère les données d'une cryptomonnaie depuis Binance"""
+    def get_crypto_data(self, symbol: str, interval: str = '1d', days: int = 30,
+                        max_age: Optional[float] = None) -> Optional[pd.DataFrame]:
+        """Récupère les données d'une cryptomonnaie depuis Binance
+        
+        `max_age` remplace `cache_timeout` pour les vues qui veulent des données plus fraîches.
+        """
         try:
             cache_key = f"{symbol}_{interval}_{days}"
-            current_time = time.time()
+            timeout = self.cache_timeout if max_age is None else max_age
             
             # Vérifier le cache
-            if cache_key in self.cache:
-                data, timestamp = self.cache[cache_key]
-                if current_time - timestamp < self.cache_timeout:
-                    return data
-            
-            # Requête API
-            url = f'{self.base_url_binance}/klines'
-            end_time = int(datetime.now().timestamp() * 1000)
-            start_time = int((datetime.now() - timedelta(days=days)).timestamp() * 1000)
-            
-            params = {
-                'symbol': symbol,
-                'interval': interval,
-                'startTime': start_time,
-                'endTime': end_time,
-                'limit': 1000
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            # Traitement des données
-            data = pd.DataFrame(response.json(), columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_asset_volume', 'number_of_trades',
-                'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'
-            ])
-            
-            # Conversion des types
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                data[col] = pd.to_numeric(data[col], errors='coerce')
-            
-            data['datetime'] = pd.to_datetime(data['timestamp'], unit='ms')
-            data = data.set_index('datetime')
+            data = self._cached(cache_key, timeout)
+            if data is not None:
+                return data
             
-            # Calcul des indicateurs techniques
-            data = self._calculate_indicators(data)
-            
-            # Mise en cache
-            self.cache[cache_key] = (data, current_time)
+            # Une seule requête à la fois par clé : les appels concurrents attendent le résultat.
+            # Le verrou de la clé est compté et retiré quand plus personne ne l'utilise.
+            with self._cache_lock:
+                inflight = self._inflight.setdefault(cache_key, [threading.Lock(), 0])
+                inflight[1] += 1
+            try:
+                with inflight[0]:
+                    data = self._cached(cache_key, timeout)
+                    if data is not None:
+                        return data
+                    metrics.increment('cache_miss')
+                    current_time = time.time()
+                    
+                    # Requête (couverte) et traitement des données
+                    data = self.get_klines(symbol, interval, days)
+                    
+                    # Calcul des indicateurs techniques
+                    data = self._calculate_indicators(data)
+                    
+                    # Mise en cache
+                    self.cache[cache_key] = (data, current_time)
+                    metrics.set_gauge('cache_entries', len(self.cache))
+            finally:
+                with self._cache_lock:
+                    inflight[1] -= 1
+                    if not inflight[1]:
+                        del self._inflight[cache_key]
             
             return data
             
         except Exception as e:
+            metrics.increment('fetch_errors')
             logger.error(f"Erreur lors de la récupération de {symbol}: {e}")
             return None
     
+    def _cached(self, cache_key: str, timeout: float) -> Optional[pd.DataFrame]:
+        """Retourne l'entrée du cache si elle a moins de `timeout` secondes"""
+        entry = self.cache.get(cache_key)
+        if entry is not None and time.time() - entry[1] < timeout:
+            metrics.increment('cache_hit')
+            return entry[0]
+        return None
+    
+    def route(self, symbol: str) -> List[MarketSource]:
+        """Sources capables de servir le symbole, par ordre de préférence
+        
+        Les sources qui connaissent le symbole (fichiers, métaux) passent avant Binance,
+        qui accepte tout symbole : un symbole local n'attend pas un refus de l'API.
+        """
+        return sorted((source for source in self.sources if source.supports(symbol)),
+                      key=lambda source: source.catch_all)
+    
+    def get_klines(self, symbol: str, interval: str = '1d', days: int = 30) -> pd.DataFrame:
+        """Série typée du symbole (toutes sources, requêtes couvertes), sans indicateurs ni cache"""
+        return self.hedger.call([lambda source=source: source.klines(symbol, interval, days)
+                                 for source in self.route(symbol)])
+    
+    def _parse_klines(self, raw_klines: List[list]) -> pd.DataFrame:
+        """Convertit les klines brutes de l'API en DataFrame indexé par date"""
+        return BinanceSource.parse_klines(raw_klines)
+    
     def _calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
         """Calcule les indicateurs techniques"""
-        try:
-            # Moyennes mobiles
-            data['SMA_9'] = data['close'].rolling(window=9).mean()
-            data['SMA_20'] = data['close'].rolling(window=20).mean()
-            data['SMA_50'] = data['close'].rolling(window=50).mean()
-            
-            # EMA
-            data['EMA_12'] = data['close'].ewm(span=12).mean()
-            data['EMA_26'] = data['close'].ewm(span=26).mean()
-            
-            # MACD
-            data['MACD'] = data['EMA_12'] - data['EMA_26']
-            data['MACD_signal'] = data['MACD'].ewm(span=9).mean()
-            data['MACD_histogram'] = data['MACD'] - data['MACD_signal']
-            
-            # RSI
-            delta = data['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            rs = gain / loss
-            data['RSI'] = 100 - (100 / (1 + rs))
-            
-            # Bandes de Bollinger
-            data['BB_middle'] = data['close'].rolling(window=20).mean()
-            bb_std = data['close'].rolling(window=20).std()
-            data['BB_upper'] = data['BB_middle'] + (bb_std * 2)
-            data['BB_lower'] = data['BB_middle'] - (bb_std * 2)
-            
-            return data
-            
-        except Exception as e:
-            logger.error(f"Erreur calcul indicateurs: {e}")
-            return data
+        with metrics.timer('indicators'):
+            return compute_indicators(data)
     
     def get_current_price(self, symbol: str) -> Optional[AssetData]:
         """Récupère le prix actuel d'un actif"""
         try:
-            url = f'{self.base_url_binance}/ticker/24hr'
-            params = {'symbol': symbol}
-            
-            response = requests.get(url, params=params, timeout=5)
-            response.raise_for_status()
-            
-            data = response.json()
+            with metrics.timer('http_ticker'):
+                data = self._hedged_tickers([symbol])[symbol]
             
             return AssetData(
                 symbol=symbol,
@@ -153,8 +722,1181 @@ class DataProvider:
             )
             
         except Exception as e:
+            metrics.increment('ticker_errors')
             logger.error(f"Erreur prix actuel {symbol}: {e}")
             return None
+    
+    def _hedged_tickers(self, symbols: List[str]) -> Dict[str, Dict]:
+        """Tickers d'un lot de symboles servis par les mêmes sources"""
+        return self.hedger.call([lambda source=source: source.tickers(symbols)
+                                 for source in self.route(symbols[0])])
+    
+    def get_tickers(self, symbols: List[str], batch_size: int = 100) -> Dict[str, Dict]:
+        """Récupère les tickers 24h bruts par lots, groupés par sources
+        
+        Les lots sont envoyés simultanément : la durée d'une actualisation reste
+        proche de celle d'une requête, quelle que soit la taille de la watchlist.
+        """
+        groups: Dict[tuple, List[str]] = {}
+        for symbol in symbols:
+            groups.setdefault(tuple(source.name for source in self.route(symbol)), []).append(symbol)
+        batches = [group[start:start + batch_size]
+                   for group in groups.values() for start in range(0, len(group), batch_size)]
+        
+        tickers = {}
+        for result in (self._ticker_batches.map(self._ticker_batch, batches) if len(batches) > 1
+                       else map(self._ticker_batch, batches)):
+            tickers.update(result)
+        return tickers
+    
+    def _ticker_batch(self, batch: List[str]) -> Dict[str, Dict]:
+        try:
+            return self._hedged_tickers(batch)
+        except Exception as e:
+            # Un seul symbole invalide fait échouer tout le lot : repli symbole par symbole
+            metrics.increment('ticker_batch_errors')
+            logger.warning(f"Erreur lot de tickers ({len(batch)} symboles): {e}")
+            tickers = {}
+            for symbol in batch:
+                asset_data = self.get_current_price(symbol)
+                if asset_data:
+                    tickers[symbol] = {
+                        'symbol': symbol,
+                        'lastPrice': asset_data.current_price,
+                        'priceChangePercent': asset_data.change_24h
+                    }
+            return tickers
+    
+    def get_depth_snapshot(self, symbol: str, limit: int = 1000) -> Dict:
+        """Récupère un snapshot du carnet d'ordres (/depth)"""
+        with metrics.timer('http_depth'):
+            response = requests.get(f'{self.base_url_binance}/depth',
+                                    params={'symbol': symbol, 'limit': limit}, timeout=10)
+            response.raise_for_status()
+        metrics.increment('http_requests')
+        return response.json()
+    
+    def open_order_book(self, symbol: str, record_path: Optional[str] = None) -> 'OrderBookFeed':
+        """Démarre un carnet d'ordres local pour le symbole
+        
+        Flux websocket sur l'API Binance, flux /depthStream sur un serveur local.
+        """
+        if self.base_url_binance == self.DEFAULT_BASE_URL:
+            stream_factory = lambda: binance_depth_stream(symbol)
+        else:
+            stream_factory = lambda: http_depth_stream(self.base_url_binance, symbol)
+        return OrderBookFeed(symbol, stream_factory, lambda: self.get_depth_snapshot(symbol),
+                             record_path=record_path).start()
+    
+    def get_watchlist_prices(self, symbols: List[str]) -> Dict[str, Optional[AssetData]]:
+        """Récupère les prix actuels de tous les symboles de la watchlist"""
+        with metrics.timer('watchlist_fetch'):
+            tickers = self.get_tickers(symbols)
+        
+        prices = {}
+        for symbol in symbols:
+            ticker = tickers.get(symbol)
+            prices[symbol] = AssetData(
+                symbol=symbol,
+                name=symbol.replace('USDT', ''),
+                current_price=float(ticker['lastPrice']),
+                change_24h=float(ticker['priceChangePercent'])
+            ) if ticker else None
+        return prices
+
+class WatchlistModel:
+    """Table de prix en colonnes (tableaux numpy) partagée entre le thread réseau et Tk
+    
+    Chaque symbole possède aussi un historique circulaire de taille fixe (prix et
+    variation 24h) préalloué dans des tableaux 2D : aucun objet Python n'est créé
+    par tick et la mémoire par symbole reste constante.
+    """
+    
+    STATUS_PENDING, STATUS_OK, STATUS_ERROR = 0, 1, 2
+    
+    def __init__(self, symbols: List[str] = None, capacity: int = 64,
+                 history_length: int = 240, history_step: float = 30.0):
+        self._lock = threading.Lock()
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.history_length = history_length
+        self.history_step = history_step  # secondes entre deux points d'historique
+        self.prices = np.full(capacity, np.nan)
+        self.changes = np.full(capacity, np.nan)
+        self.status = np.zeros(capacity, dtype=np.int8)
+        self.versions = np.zeros(capacity, dtype=np.int64)  # version de chaque ligne
+        # Historique circulaire : une ligne de tableau par symbole
+        self.history_prices = np.full((capacity, history_length), np.nan, dtype=np.float32)
+        self.history_changes = np.full((capacity, history_length), np.nan, dtype=np.float32)
+        self.history_times = np.zeros((capacity, history_length), dtype=np.uint32)
+        self.history_head = np.zeros(capacity, dtype=np.int32)  # prochaine case à écrire
+        self.history_count = np.zeros(capacity, dtype=np.int32)
+        # Extrêmes de la journée (UTC), alimentés par les ticks
+        self.day_low = np.full(capacity, np.nan)
+        self.day_high = np.full(capacity, np.nan)
+        self.day = None
+        self.generation = 0  # incrémenté à chaque modification visible
+        for symbol in symbols or []:
+            self.add(symbol)
+    
+    def __len__(self):
+        return len(self.symbols)
+    
+    def _grow(self, capacity: int):
+        """Agrandit les colonnes (capacité doublée)"""
+        def resized(column, fill):
+            grown = np.full((capacity,) + column.shape[1:], fill, dtype=column.dtype)
+            grown[:len(column)] = column
+            return grown
+        self.prices = resized(self.prices, np.nan)
+        self.changes = resized(self.changes, np.nan)
+        self.status = resized(self.status, self.STATUS_PENDING)
+        self.versions = resized(self.versions, 0)
+        self.history_prices = resized(self.history_prices, np.nan)
+        self.history_changes = resized(self.history_changes, np.nan)
+        self.history_times = resized(self.history_times, 0)
+        self.history_head = resized(self.history_head, 0)
+        self.history_count = resized(self.history_count, 0)
+        self.day_low = resized(self.day_low, np.nan)
+        self.day_high = resized(self.day_high, np.nan)
+    
+    def add(self, symbol: str) -> int:
+        """Ajoute un symbole et retourne son numéro de ligne"""
+        with self._lock:
+            if symbol in self.index:
+                return self.index[symbol]
+            row = len(self.symbols)
+            if row >= len(self.prices):
+                self._grow(max(64, 2 * len(self.prices)))
+            self.symbols.append(symbol)
+            self.index[symbol] = row
+            self.generation += 1
+            return row
+    
+    def memory_bytes(self) -> int:
+        """Mémoire occupée par les colonnes et l'historique"""
+        columns = (self.prices, self.changes, self.status, self.versions, self.history_prices,
+                   self.history_changes, self.history_times, self.history_head,
+                   self.history_count, self.day_low, self.day_high)
+        return sum(column.nbytes for column in columns)
+    
+    def update_from_tickers(self, tickers: Dict[str, Dict], missing: List[str] = (),
+                            now: Optional[float] = None):
+        """Applique des tickers bruts ; seules les lignes modifiées changent la génération"""
+        now = time.time() if now is None else now
+        rows, prices, changes = [], [], []
+        for symbol, ticker in tickers.items():
+            row = self.index.get(symbol)
+            if row is not None:
+                rows.append(row)
+                prices.append(float(ticker['lastPrice']))
+                changes.append(float(ticker['priceChangePercent']))
+        
+        with self._lock:
+            rows = np.asarray(rows, dtype=np.intp)
+            prices = np.asarray(prices, dtype=np.float64)
+            changes = np.asarray(changes, dtype=np.float64)
+            changed = ((self.prices[rows] != prices) | (self.changes[rows] != changes)
+                       | (self.status[rows] != self.STATUS_OK))
+            changed |= self._record_range(rows, prices, now)
+            error_rows = np.asarray([self.index[symbol] for symbol in missing if symbol in self.index],
+                                    dtype=np.intp)
+            
+            appended = self._record_history(rows, prices, changes, now)
+            
+            if changed.any() or appended.any() or len(error_rows):
+                self.prices[rows] = prices
+                self.changes[rows] = changes
+                self.status[rows] = self.STATUS_OK
+                self.status[error_rows] = self.STATUS_ERROR
+                self.versions[rows[changed | appended]] += 1
+                self.versions[error_rows] += 1
+                self.generation += 1
+            return int(changed.sum())
+    
+    def _record_range(self, rows: np.ndarray, prices: np.ndarray, now: float) -> np.ndarray:
+        """Met à jour les extrêmes du jour UTC (vectorisé, verrou tenu) et retourne le masque
+        des lignes modifiées
+        
+        Toutes les sources sont traitées de la même façon : extrêmes des ticks reçus depuis
+        minuit UTC (les lowPrice/highPrice de Binance couvrent 24h glissantes, pas la journée).
+        """
+        # Nouveau jour UTC : remise à zéro des extrêmes
+        day = int(now // 86400)
+        if day != self.day:
+            self.day = day
+            self.day_low[:] = np.nan
+            self.day_high[:] = np.nan
+        previous_low, previous_high = self.day_low[rows], self.day_high[rows]
+        self.day_low[rows] = np.fmin(previous_low, prices)
+        self.day_high[rows] = np.fmax(previous_high, prices)
+        return (self.day_low[rows] != previous_low) | (self.day_high[rows] != previous_high)
+    
+    def _record_history(self, rows: np.ndarray, prices: np.ndarray, changes: np.ndarray,
+                        now: float) -> np.ndarray:
+        """Écrit les points d'historique (vectorisé, verrou tenu)
+        
+        Retourne le masque des lignes ayant reçu un nouveau point.
+        """
+        # Un point par tranche de `history_step` secondes : dans la même tranche, le dernier point est remplacé
+        head = self.history_head[rows]
+        last = (head - 1) % self.history_length
+        stamp = np.uint32(now)
+        last_bucket = self.history_times[rows, last] // self.history_step
+        append = (self.history_count[rows] == 0) | (last_bucket != stamp // self.history_step)
+        slots = np.where(append, head, last)
+        
+        self.history_prices[rows, slots] = prices
+        self.history_changes[rows, slots] = changes
+        self.history_times[rows, slots] = stamp
+        self.history_head[rows] = np.where(append, (head + 1) % self.history_length, head)
+        self.history_count[rows] = np.minimum(self.history_count[rows] + append, self.history_length)
+        return append
+    
+    def history(self, row: int, column: str = 'price') -> np.ndarray:
+        """Historique d'une ligne dans l'ordre chronologique (copie)"""
+        with self._lock:
+            count = self.history_count[row]
+            head = self.history_head[row]
+            values = self.history_prices[row] if column == 'price' else self.history_changes[row]
+            return np.roll(values, -head)[self.history_length - count:]
+    
+    def sorted_rows(self, key: str = 'symbol', descending: bool = False) -> np.ndarray:
+        """Ordre d'affichage des lignes (les valeurs manquantes en dernier)"""
+        with self._lock:
+            count = len(self.symbols)
+            if key == 'symbol':
+                order = np.argsort(np.array(self.symbols, dtype=str), kind='stable')
+                return order[::-1] if descending else order
+            values = (self.prices if key == 'price' else self.changes)[:count]
+            return np.argsort(-values if descending else values, kind='stable')
+    
+    def cells(self, rows) -> List[tuple]:
+        """Textes et état des lignes demandées (appelé uniquement pour les lignes visibles)"""
+        with self._lock:
+            result = []
+            for row in rows:
+                symbol = self.symbols[row]
+                status = self.status[row]
+                version = int(self.versions[row])
+                if status == self.STATUS_OK:
+                    day_range = f"▼{self.day_low[row]:,.2f} ▲{self.day_high[row]:,.2f}"
+                    result.append((symbol, symbol.replace('USDT', ''), f"${self.prices[row]:,.2f}",
+                                   f"{self.changes[row]:+.2f}%", bool(self.changes[row] >= 0),
+                                   day_range, row, version))
+                else:
+                    text = "Erreur" if status == self.STATUS_ERROR else "..."
+                    result.append((symbol, symbol.replace('USDT', ''), text, "", None, "", row, version))
+            return result
+
+class OrderBookSide:
+    """Un côté du carnet d'ordres : niveaux triés dans des tableaux numpy préalloués
+    
+    Les clés (prix pour les achats, -prix pour les ventes) sont croissantes, le
+    meilleur niveau est donc toujours en fin de tableau : les modifications, presque
+    toujours proches du meilleur prix, ne déplacent que quelques éléments.
+    """
+    
+    def __init__(self, is_bid: bool, capacity: int = 2048):
+        self.sign = 1.0 if is_bid else -1.0
+        self.keys = np.empty(capacity)
+        self.quantities = np.empty(capacity)
+        self.size = 0
+    
+    def __len__(self):
+        return self.size
+    
+    def _grow(self):
+        capacity = 2 * len(self.keys)
+        keys, quantities = np.empty(capacity), np.empty(capacity)
+        keys[:self.size] = self.keys[:self.size]
+        quantities[:self.size] = self.quantities[:self.size]
+        self.keys, self.quantities = keys, quantities
+    
+    def load(self, prices: np.ndarray, quantities: np.ndarray):
+        """Remplace tous les niveaux (snapshot)"""
+        keep = quantities > 0
+        keys, quantities = prices[keep] * self.sign, quantities[keep]
+        order = np.argsort(keys)
+        while len(keys) > len(self.keys):
+            self._grow()
+        self.size = len(keys)
+        self.keys[:self.size] = keys[order]
+        self.quantities[:self.size] = quantities[order]
+    
+    def update(self, price: float, quantity: float):
+        """Applique un niveau de diff : quantité 0 = suppression du niveau"""
+        key = price * self.sign
+        size = self.size
+        index = int(np.searchsorted(self.keys[:size], key))
+        if index < size and self.keys[index] == key:
+            if quantity == 0:
+                self.keys[index:size - 1] = self.keys[index + 1:size]
+                self.quantities[index:size - 1] = self.quantities[index + 1:size]
+                self.size -= 1
+            else:
+                self.quantities[index] = quantity
+        elif quantity != 0:
+            if size == len(self.keys):
+                self._grow()
+            self.keys[index + 1:size + 1] = self.keys[index:size]
+            self.quantities[index + 1:size + 1] = self.quantities[index:size]
+            self.keys[index] = key
+            self.quantities[index] = quantity
+            self.size += 1
+    
+    def best(self) -> Optional[Tuple[float, float]]:
+        """Meilleur niveau (prix, quantité)"""
+        if not self.size:
+            return None
+        return float(self.keys[self.size - 1] * self.sign), float(self.quantities[self.size - 1])
+    
+    def top(self, levels: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Les `levels` meilleurs niveaux, du meilleur au moins bon (copies)"""
+        start = max(0, self.size - levels)
+        prices = self.keys[start:self.size][::-1] * self.sign
+        return prices, self.quantities[start:self.size][::-1].copy()
+    
+    def volume_to(self, price: float) -> float:
+        """Quantité cumulée du meilleur niveau jusqu'à `price` inclus"""
+        start = int(np.searchsorted(self.keys[:self.size], price * self.sign, side='left'))
+        return float(self.quantities[start:self.size].sum())
+
+class OrderBookGap(Exception):
+    """Trou dans la séquence des mises à jour : le carnet doit être resynchronisé"""
+
+class LocalOrderBook:
+    """Carnet d'ordres local : snapshot REST + diffs (séquence lastUpdateId / U / u de Binance)"""
+    
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = OrderBookSide(is_bid=True)
+        self.asks = OrderBookSide(is_bid=False)
+        self.last_update_id: Optional[int] = None
+        self.live = False  # True après le premier diff raccordé au snapshot
+        self.updates = 0
+        self.lock = threading.Lock()
+    
+    def reset(self):
+        """Invalide le carnet en attendant un nouveau snapshot"""
+        with self.lock:
+            self.last_update_id = None
+            self.live = False
+    
+    def apply_snapshot(self, snapshot: Dict):
+        """Charge un snapshot /depth"""
+        bids = np.asarray(snapshot['bids'], dtype=float).reshape(-1, 2)
+        asks = np.asarray(snapshot['asks'], dtype=float).reshape(-1, 2)
+        with self.lock:
+            self.bids.load(bids[:, 0], bids[:, 1])
+            self.asks.load(asks[:, 0], asks[:, 1])
+            self.last_update_id = int(snapshot['lastUpdateId'])
+            self.live = False
+    
+    def apply_diff(self, event: Dict) -> bool:
+        """Applique un événement depthUpdate ; False s'il est antérieur au snapshot
+        
+        Lève OrderBookGap si la séquence est rompue.
+        """
+        first, final = event['U'], event['u']
+        with self.lock:
+            if self.last_update_id is None:
+                raise OrderBookGap(f"{self.symbol}: pas de snapshot")
+            if final <= self.last_update_id:
+                return False
+            expected = self.last_update_id + 1
+            if (first > expected) if not self.live else (first != expected):
+                raise OrderBookGap(f"{self.symbol}: attendu {expected}, reçu {first}-{final}")
+            
+            for price, quantity in event['b']:
+                self.bids.update(float(price), float(quantity))
+            for price, quantity in event['a']:
+                self.asks.update(float(price), float(quantity))
+            self.last_update_id = final
+            self.live = True
+            self.updates += 1
+            return True
+    
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        with self.lock:
+            return self.bids.best()
+    
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        with self.lock:
+            return self.asks.best()
+    
+    def spread(self) -> Optional[float]:
+        """Écart entre la meilleure vente et le meilleur achat"""
+        with self.lock:
+            bid, ask = self.bids.best(), self.asks.best()
+        return ask[0] - bid[0] if bid and ask else None
+    
+    def mid_price(self) -> Optional[float]:
+        with self.lock:
+            bid, ask = self.bids.best(), self.asks.best()
+        return (ask[0] + bid[0]) / 2 if bid and ask else None
+    
+    def cumulative_depth(self, levels: int = 100) -> Dict[str, np.ndarray]:
+        """Prix et quantités cumulées des `levels` meilleurs niveaux de chaque côté"""
+        with self.lock:
+            bid_prices, bid_quantities = self.bids.top(levels)
+            ask_prices, ask_quantities = self.asks.top(levels)
+        return {
+            'bid_prices': bid_prices, 'bid_depth': np.cumsum(bid_quantities),
+            'ask_prices': ask_prices, 'ask_depth': np.cumsum(ask_quantities)
+        }
+    
+    def depth_within(self, percent: float) -> Tuple[float, float]:
+        """Quantités (achat, vente) disponibles à moins de `percent` % du prix médian"""
+        mid = self.mid_price()
+        if mid is None:
+            return 0.0, 0.0
+        with self.lock:
+            return (self.bids.volume_to(mid * (1 - percent / 100)),
+                    self.asks.volume_to(mid * (1 + percent / 100)))
+
+class OrderBookFeed:
+    """Maintient un LocalOrderBook à jour depuis un flux de diffs (thread dédié)
+    
+    Suit la procédure Binance : ouvrir le flux, mettre en tampon, lire le snapshot,
+    ignorer les diffs antérieurs puis appliquer la suite ; tout trou de séquence
+    déclenche une resynchronisation par un nouveau snapshot. Un flux direct qui se
+    ferme est rouvert ; seul un rejeu (`reconnect=False`) s'arrête en fin de flux.
+    """
+    
+    def __init__(self, symbol: str, stream_factory, snapshot_fn, record_path: Optional[str] = None,
+                 reconnect: bool = True):
+        self.symbol = symbol
+        self.book = LocalOrderBook(symbol)
+        self.stream_factory = stream_factory  # () -> itérateur d'événements depthUpdate
+        self.snapshot_fn = snapshot_fn  # () -> snapshot /depth
+        self.record_path = record_path
+        self.reconnect = reconnect
+        self.resyncs = 0
+        self.error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self) -> 'OrderBookFeed':
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f'depth-{self.symbol}')
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop.set()
+    
+    def join(self, timeout: Optional[float] = None):
+        if self._thread:
+            self._thread.join(timeout)
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def _run(self):
+        record = open(self.record_path, 'a', encoding='utf-8') if self.record_path else None
+        try:
+            while not self._stop.is_set():
+                try:
+                    self._consume(record)
+                    if self._stop.is_set() or not self.reconnect:
+                        return  # arrêt demandé ou rejeu terminé
+                    raise ConnectionError("flux fermé par le serveur")
+                except Exception as e:
+                    self.error = str(e)
+                    logger.error(f"Flux carnet {self.symbol} interrompu: {e}")
+                    self._stop.wait(2.0)
+        finally:
+            if record:
+                record.close()
+    
+    def _consume(self, record):
+        stream = self.stream_factory()
+        try:
+            for event in stream:
+                if self._stop.is_set():
+                    return
+                if self.book.last_update_id is None:
+                    # Le flux est ouvert (les diffs arrivent) : on peut lire le snapshot
+                    self._load_snapshot(record)
+                if record:
+                    # Tous les événements reçus, trous compris : le rejeu refait les mêmes resyncs
+                    record.write(json.dumps(event) + '\n')
+                try:
+                    with metrics.timer('orderbook_apply'):
+                        self.book.apply_diff(event)
+                except OrderBookGap as e:
+                    self.resyncs += 1
+                    metrics.increment('orderbook_resync')
+                    logger.warning(f"Resynchronisation du carnet: {e}")
+                    self.book.reset()
+        finally:
+            close = getattr(stream, 'close', None)
+            if close:
+                close()
+    
+    def _load_snapshot(self, record):
+        with metrics.timer('orderbook_snapshot'):
+            snapshot = self.snapshot_fn()
+        self.book.apply_snapshot(snapshot)
+        if record:
+            record.write(json.dumps({'snapshot': snapshot}) + '\n')
+
+def replay_depth_file(path: str):
+    """Sources (flux, snapshot) rejouant un fichier enregistré par OrderBookFeed"""
+    snapshots, events = [], []
+    with open(path, encoding='utf-8') as source:
+        for line in source:
+            if line.strip():
+                record = json.loads(line)
+                (snapshots if 'snapshot' in record else events).append(record.get('snapshot', record))
+    if not snapshots:
+        raise ValueError(f"{path}: aucun snapshot enregistré")
+    snapshot_iter = iter(snapshots)
+    return (lambda: iter(events)), (lambda: next(snapshot_iter, snapshots[-1]))
+
+def binance_depth_stream(symbol: str, speed_ms: int = 100):
+    """Flux websocket Binance <symbol>@depth (dépendance optionnelle websocket-client)"""
+    if websocket is None:
+        raise RuntimeError("Le paquet websocket-client est requis pour le carnet d'ordres en direct")
+    connection = websocket.create_connection(
+        f'wss://stream.binance.com:9443/ws/{symbol.lower()}@depth@{speed_ms}ms', timeout=30)
+    try:
+        while True:
+            yield json.loads(connection.recv())
+    finally:
+        connection.close()
+
+def http_depth_stream(base_url: str, symbol: str):
+    """Flux de diffs en JSON lines servi par mock_server.py (/depthStream)"""
+    response = requests.get(f'{base_url}/depthStream', params={'symbol': symbol}, stream=True, timeout=30)
+    response.raise_for_status()
+    try:
+        for line in response.iter_lines():
+            if line:
+                yield json.loads(line)
+    finally:
+        response.close()
+
+@dataclass
+class AlertRule:
+    """Règle d'alerte : la métrique d'un symbole franchit un seuil"""
+    symbol: str
+    metric: str  # 'price', 'change' (variation 24h en %) ou indicateur ('RSI', 'MACD'...)
+    condition: str  # 'above' (franchissement à la hausse), 'below' ou 'cross' (les deux)
+    threshold: float
+    once: bool = True  # désactivée après le premier déclenchement
+    rule_id: int = 0
+    
+    def describe(self) -> str:
+        arrows = {'above': '↑', 'below': '↓', 'cross': '↕'}
+        return f"{self.symbol} {self.metric} {arrows.get(self.condition, '?')} {self.threshold:g}"
+
+@dataclass
+class AlertEvent:
+    """Déclenchement d'une règle"""
+    rule: AlertRule
+    value: float
+    previous: float
+    timestamp: float
+    
+    def message(self) -> str:
+        return f"🔔 {self.rule.describe()} (valeur {self.value:g})"
+
+class AlertEngine:
+    """Évalue des milliers de règles d'alerte par tick à l'aide d'index de seuils triés
+    
+    Pour chaque (symbole, métrique), les seuils des règles sont gardés dans des listes
+    triées (une pour la hausse, une pour la baisse) : un nouveau prix ne parcourt que la
+    tranche de seuils comprise entre l'ancienne et la nouvelle valeur (bisect). Les
+    notifications sont envoyées par un thread dédié, jamais par le thread Tk.
+    """
+    
+    CONDITIONS = ('above', 'below', 'cross')
+    
+    def __init__(self, handlers: Optional[List] = None):
+        self._lock = threading.Lock()
+        self._rules: Dict[int, AlertRule] = {}
+        self._keys: Dict[Tuple[str, str], set] = {}  # (symbole, métrique) -> ids des règles
+        self._indexes: Dict[Tuple[str, str], Tuple[list, list, list, list]] = {}
+        self._last: Dict[Tuple[str, str], float] = {}
+        self._next_id = 1
+        self._handlers = [lambda event: logger.info(event.message())] if handlers is None else list(handlers)
+        self._events = queue.Queue()
+        self._notifier = threading.Thread(target=self._notify_loop, daemon=True, name='alert-notifier')
+        self._notifier.start()
+    
+    def add_rule(self, symbol: str, metric: str, condition: str, threshold: float,
+                 once: bool = True) -> AlertRule:
+        """Ajoute une règle et retourne-la (avec son identifiant)"""
+        if condition not in self.CONDITIONS:
+            raise ValueError(f"Condition inconnue: {condition}")
+        with self._lock:
+            rule = AlertRule(symbol, metric, condition, float(threshold), once, self._next_id)
+            self._next_id += 1
+            self._rules[rule.rule_id] = rule
+            key = (symbol, metric)
+            self._keys.setdefault(key, set()).add(rule.rule_id)
+            self._indexes.pop(key, None)
+        return rule
+    
+    def remove_rule(self, rule_id: int):
+        with self._lock:
+            self._remove(rule_id)
+    
+    def _remove(self, rule_id: int):
+        rule = self._rules.pop(rule_id, None)
+        if rule is None:
+            return
+        key = (rule.symbol, rule.metric)
+        ids = self._keys[key]
+        ids.discard(rule_id)
+        if not ids:
+            del self._keys[key]
+        self._indexes.pop(key, None)  # reconstruit au prochain tick
+    
+    def rules(self) -> List[AlertRule]:
+        with self._lock:
+            return list(self._rules.values())
+    
+    def ticker_symbols(self) -> List[str]:
+        """Symboles ayant des règles sur le prix ou la variation (valeurs des tickers)"""
+        with self._lock:
+            return sorted({symbol for symbol, metric in self._keys if metric in ('price', 'change')})
+    
+    def indicator_symbols(self) -> List[str]:
+        """Symboles ayant des règles sur un indicateur (valeurs hors tickers)"""
+        with self._lock:
+            return sorted({symbol for symbol, metric in self._keys if metric not in ('price', 'change')})
+    
+    def add_handler(self, handler):
+        """Ajoute un destinataire des AlertEvent (appelé dans le thread de notification)"""
+        self._handlers.append(handler)
+    
+    def _index(self, key: Tuple[str, str]) -> Tuple[list, list, list, list]:
+        """Seuils triés (hausse, ids, baisse, ids) d'une clé, reconstruits si besoin"""
+        index = self._indexes.get(key)
+        if index is None:
+            rules = sorted((self._rules[rule_id] for rule_id in self._keys.get(key, ())),
+                           key=lambda rule: rule.threshold)
+            up = [rule for rule in rules if rule.condition != 'below']
+            down = [rule for rule in rules if rule.condition != 'above']
+            index = ([rule.threshold for rule in up], [rule.rule_id for rule in up],
+                     [rule.threshold for rule in down], [rule.rule_id for rule in down])
+            self._indexes[key] = index
+        return index
+    
+    def update(self, symbol: str, values: Dict[str, float], now: Optional[float] = None) -> List[AlertEvent]:
+        """Applique de nouvelles valeurs pour un symbole et retourne les alertes déclenchées"""
+        fired = []
+        with self._lock:
+            for metric, value in values.items():
+                key = (symbol, metric)
+                previous = self._last.get(key)
+                self._last[key] = value
+                if previous is None or key not in self._keys or value == previous or value != value:
+                    continue
+                up_thresholds, up_ids, down_thresholds, down_ids = self._index(key)
+                if value > previous:
+                    # Seuils dans ]previous, value]
+                    ids = up_ids[bisect.bisect_right(up_thresholds, previous):
+                                 bisect.bisect_right(up_thresholds, value)]
+                else:
+                    # Seuils dans [value, previous[
+                    ids = down_ids[bisect.bisect_left(down_thresholds, value):
+                                   bisect.bisect_left(down_thresholds, previous)]
+                for rule_id in ids:
+                    rule = self._rules[rule_id]
+                    fired.append(AlertEvent(rule, value, previous, now or time.time()))
+                    if rule.once:
+                        self._remove(rule_id)
+        
+        for event in fired:
+            self._events.put(event)
+        if fired:
+            metrics.increment('alerts_triggered', len(fired))
+        return fired
+    
+    def update_tickers(self, tickers: Dict[str, Dict], now: Optional[float] = None) -> List[AlertEvent]:
+        """Applique des tickers bruts : seuls les symboles ayant des règles sont évalués"""
+        with self._lock:
+            watched = {symbol for symbol, _ in self._keys}
+        fired = []
+        with metrics.timer('alerts_evaluate'):
+            for symbol in watched.intersection(tickers):
+                ticker = tickers[symbol]
+                fired.extend(self.update(symbol, {'price': float(ticker['lastPrice']),
+                                                  'change': float(ticker['priceChangePercent'])}, now))
+        return fired
+    
+    def close(self, timeout: Optional[float] = 5):
+        """Arrête le thread de notification après les alertes déjà en file"""
+        self._events.put(None)
+        self._notifier.join(timeout)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def _notify_loop(self):
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+            for handler in list(self._handlers):
+                try:
+                    handler(event)
+                except Exception as e:
+                    logger.error(f"Erreur notification d'alerte: {e}")
+
+def webhook_alert_handler(url: str):
+    """Destinataire d'alertes envoyant chaque AlertEvent en JSON (POST) vers `url`"""
+    def send(event: AlertEvent):
+        requests.post(url, json={'symbol': event.rule.symbol, 'metric': event.rule.metric,
+                                 'condition': event.rule.condition, 'threshold': event.rule.threshold,
+                                 'value': event.value, 'timestamp': event.timestamp,
+                                 'message': event.message()}, timeout=10)
+    return send
+
+class PaperTrader:
+    """Simulateur d'exécution (trading papier) alimenté par les tickers et klines
+    
+    Les ordres et les positions sont stockés en colonnes (tableaux numpy préalloués) :
+    à chaque tick, la comparaison des prix avec tous les ordres ouverts est vectorisée.
+    Chaque ordre, exécution et annulation est ajouté au journal JSON lines.
+    """
+    
+    BUY, SELL = 1, -1
+    MARKET, LIMIT, STOP = 0, 1, 2
+    OPEN, FILLED, CANCELLED = 0, 1, 2
+    ORDER_TYPES = {'market': MARKET, 'limit': LIMIT, 'stop': STOP}
+    SIDES = {'buy': BUY, 'sell': SELL}
+    
+    def __init__(self, cash: float = 10_000.0, fee_rate: float = 0.001, slippage: float = 0.0005,
+                 journal_path: Optional[str] = None, capacity: int = 256, price_source=None):
+        self._lock = threading.Lock()
+        self.price_source = price_source  # symbole -> dernier prix en cache (non bloquant, appelé sous verrou)
+        self.initial_cash = self.cash = cash
+        self.fee_rate = fee_rate  # frais sur le notionnel (0.1% = taker Binance)
+        self.slippage = slippage  # glissement des ordres au marché et stop
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        # Carnet d'ordres (une ligne par ordre, identifiant = ligne)
+        self.count = 0
+        self.order_symbol = np.zeros(capacity, dtype=np.int32)
+        self.order_side = np.zeros(capacity, dtype=np.int8)
+        self.order_type = np.zeros(capacity, dtype=np.int8)
+        self.order_status = np.zeros(capacity, dtype=np.int8)
+        self.order_price = np.zeros(capacity)
+        self.order_quantity = np.zeros(capacity)
+        self.order_time = np.zeros(capacity)
+        self.fill_price = np.full(capacity, np.nan)
+        # Positions (une ligne par symbole)
+        self.last_price = np.full(0, np.nan)
+        self.price_time = np.full(0, -np.inf)  # date (s) du dernier prix, pour ignorer les bougies plus anciennes
+        self.position = np.zeros(0)
+        self.average_price = np.zeros(0)
+        self.realized_pnl = np.zeros(0)
+        self.fees = np.zeros(0)
+        self.journal = open(journal_path, 'a', encoding='utf-8') if journal_path else None
+    
+    def _symbol_row(self, symbol: str) -> int:
+        row = self.index.get(symbol)
+        if row is None:
+            row = self.index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            self.last_price = np.append(self.last_price, np.nan)
+            self.price_time = np.append(self.price_time, -np.inf)
+            for name in ('position', 'average_price', 'realized_pnl', 'fees'):
+                setattr(self, name, np.append(getattr(self, name), 0.0))
+        return row
+    
+    def _grow(self):
+        for name in ('order_symbol', 'order_side', 'order_type', 'order_status', 'order_price',
+                     'order_quantity', 'order_time', 'fill_price'):
+            column = getattr(self, name)
+            grown = np.full(2 * len(column), np.nan) if name == 'fill_price' else np.zeros(2 * len(column), column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+    
+    def _log(self, record: Dict):
+        if self.journal:
+            self.journal.write(json.dumps(record) + '\n')
+    
+    def submit(self, symbol: str, side: str, quantity: float, order_type: str = 'market',
+               price: Optional[float] = None) -> int:
+        """Passe un ordre ('buy'/'sell', 'market'/'limit'/'stop') et retourne son identifiant"""
+        if side not in self.SIDES:
+            raise ValueError(f"Sens d'ordre inconnu: {side!r}")
+        if order_type not in self.ORDER_TYPES:
+            raise ValueError(f"Type d'ordre inconnu: {order_type!r}")
+        if not quantity > 0:
+            raise ValueError("La quantité doit être positive")
+        kind = self.ORDER_TYPES[order_type]
+        if kind != self.MARKET and not (price is not None and price > 0):
+            raise ValueError(f"Prix requis pour un ordre {order_type}")
+        with self._lock:
+            row = self._symbol_row(symbol)
+            if kind == self.MARKET and np.isnan(self.last_price[row]) and self.price_source:
+                # Symbole jamais coté ici : dernier prix en cache (sans requête), sinon
+                # l'ordre reste ouvert jusqu'au prochain ticker du symbole
+                seed = self.price_source(symbol)
+                if seed:
+                    self.last_price[row] = seed
+                    self.price_time[row] = time.time()
+            if self.count == len(self.order_side):
+                self._grow()
+            order_id = self.count
+            self.count += 1
+            self.order_symbol[order_id] = row
+            self.order_side[order_id] = self.SIDES[side]
+            self.order_type[order_id] = kind
+            self.order_status[order_id] = self.OPEN
+            self.order_price[order_id] = price or 0.0
+            self.order_quantity[order_id] = quantity
+            self.order_time[order_id] = time.time()
+            self._log({'ts': time.time(), 'event': 'order', 'id': order_id, 'symbol': symbol, 'side': side,
+                       'type': order_type, 'quantity': quantity, 'price': price})
+            # Un ordre au marché s'exécute immédiatement si un prix est connu
+            last = self.last_price[self.order_symbol[order_id]]
+            if kind == self.MARKET and last == last:
+                self._match(np.array([order_id]), np.array([last]))
+            if self.journal:
+                self.journal.flush()
+        return order_id
+    
+    def pending_symbols(self) -> List[str]:
+        """Symboles ayant des ordres ouverts (à coter même hors de la watchlist)"""
+        with self._lock:
+            rows = np.unique(self.order_symbol[:self.count][self.order_status[:self.count] == self.OPEN])
+            return [self.symbols[row] for row in rows.tolist()]
+    
+    def cancel(self, order_id: int) -> bool:
+        with self._lock:
+            if order_id >= self.count or self.order_status[order_id] != self.OPEN:
+                return False
+            self.order_status[order_id] = self.CANCELLED
+            self._log({'ts': time.time(), 'event': 'cancel', 'id': order_id})
+            if self.journal:
+                self.journal.flush()
+            return True
+    
+    def on_prices(self, prices: Dict[str, float]) -> int:
+        """Nouveaux derniers prix : exécute les ordres déclenchés et retourne leur nombre"""
+        now = time.time()
+        with self._lock, metrics.timer('paper_match'):
+            for symbol, price in prices.items():
+                row = self.index.get(symbol)
+                if row is not None:
+                    self.last_price[row] = price
+                    self.price_time[row] = now
+            open_orders = np.flatnonzero(self.order_status[:self.count] == self.OPEN)
+            if not len(open_orders):
+                return 0
+            price = self.last_price[self.order_symbol[open_orders]]
+            side = self.order_side[open_orders]
+            kind = self.order_type[open_orders]
+            limit = self.order_price[open_orders]
+            triggered = ((kind == self.MARKET)
+                         | ((kind == self.LIMIT) & (side * (limit - price) >= 0))
+                         | ((kind == self.STOP) & (side * (price - limit) >= 0)))
+            triggered &= price == price
+            filled = self._match(open_orders[triggered], price[triggered])
+            if filled and self.journal:
+                self.journal.flush()
+            return filled
+    
+    def on_tickers(self, tickers: Dict[str, Dict]) -> int:
+        """Applique des tickers bruts (symboles ayant des ordres ou des positions seulement)"""
+        return self.on_prices({symbol: float(tickers[symbol]['lastPrice'])
+                               for symbol in self.index if symbol in tickers})
+    
+    def on_candle(self, symbol: str, open_time: float, high: float, low: float, close: float,
+                  close_time: Optional[float] = None) -> int:
+        """Exécute les ordres passés avant une bougie (`open_time` en secondes) dont
+        le plus haut ou le plus bas a touché leur prix
+        
+        Le close ne remplace le dernier prix que s'il n'est pas plus ancien : `close_time`
+        pour une bougie clôturée, `open_time` (seule date sûre) pour une bougie en cours.
+        """
+        with self._lock:
+            row = self.index.get(symbol)
+            if row is None:
+                return 0
+            candidates = np.flatnonzero((self.order_status[:self.count] == self.OPEN)
+                                        & (self.order_symbol[:self.count] == row)
+                                        & (self.order_time[:self.count] <= open_time))
+            side = self.order_side[candidates]
+            kind = self.order_type[candidates]
+            limit = self.order_price[candidates]
+            # Achat limite touché par le plus bas, achat stop par le plus haut (et inversement)
+            touched = np.where((kind == self.LIMIT) == (side == self.BUY), low, high)
+            triggered = ((kind == self.MARKET)
+                         | ((kind == self.LIMIT) & (side * (limit - touched) >= 0))
+                         | ((kind == self.STOP) & (side * (touched - limit) >= 0)))
+            prices = np.where(kind == self.MARKET, close, limit)[triggered]
+            close_time = open_time if close_time is None else close_time
+            if close_time >= self.price_time[row]:
+                self.last_price[row] = close
+                self.price_time[row] = close_time
+            return self._match(candidates[triggered], prices)
+    
+    def on_klines(self, symbol: str, data: pd.DataFrame, candles: int = 2) -> int:
+        """Applique les dernières bougies d'une série (la dernière peut être encore ouverte)"""
+        if symbol not in self.index or data is None or not len(data):
+            return 0
+        filled = 0
+        recent = data[['high', 'low', 'close']].iloc[-candles:]
+        # Une bougie est clôturée à l'ouverture de la suivante ; la dernière peut être encore ouverte
+        open_times = [open_time.timestamp() for open_time in recent.index]
+        close_times = open_times[1:] + [None]
+        for open_time, close_time, row in zip(open_times, close_times, recent.itertuples()):
+            filled += self.on_candle(symbol, open_time, row.high, row.low, row.close, close_time)
+        if filled and self.journal:
+            with self._lock:
+                self.journal.flush()
+        return filled
+    
+    def _match(self, orders: np.ndarray, prices: np.ndarray) -> int:
+        """Exécute des ordres aux prix donnés (verrou déjà pris)"""
+        now = time.time()
+        for order_id, price in zip(orders.tolist(), prices.tolist()):
+            side = int(self.order_side[order_id])
+            if self.order_type[order_id] != self.LIMIT:
+                price *= 1 + side * self.slippage
+            quantity = side * self.order_quantity[order_id]
+            row = self.order_symbol[order_id]
+            fee = abs(quantity) * price * self.fee_rate
+            
+            position, average = self.position[row], self.average_price[row]
+            if position == 0 or (position > 0) == (quantity > 0):
+                self.average_price[row] = (average * abs(position) + price * abs(quantity)) / abs(position + quantity)
+            else:
+                closed = min(abs(quantity), abs(position))
+                self.realized_pnl[row] += closed * (price - average) * np.sign(position)
+                if abs(quantity) > abs(position):
+                    self.average_price[row] = price  # position retournée
+                elif abs(quantity) == abs(position):
+                    self.average_price[row] = 0.0
+            self.position[row] = position + quantity
+            self.fees[row] += fee
+            self.cash -= quantity * price + fee
+            
+            self.order_status[order_id] = self.FILLED
+            self.fill_price[order_id] = price
+            latency = now - self.order_time[order_id]
+            metrics.observe('paper_order_to_fill', latency)
+            self._log({'ts': time.time(), 'event': 'fill', 'id': order_id, 'symbol': self.symbols[row],
+                       'quantity': quantity, 'price': price, 'fee': fee})
+        if len(orders):
+            metrics.increment('paper_fills', len(orders))
+        return len(orders)
+    
+    def open_orders(self) -> List[Dict]:
+        """Ordres ouverts (pour l'affichage)"""
+        kinds = {value: name for name, value in self.ORDER_TYPES.items()}
+        with self._lock:
+            return [{'id': order_id, 'symbol': self.symbols[self.order_symbol[order_id]],
+                     'side': 'buy' if self.order_side[order_id] == self.BUY else 'sell',
+                     'type': kinds[int(self.order_type[order_id])],
+                     'quantity': float(self.order_quantity[order_id]),
+                     'price': float(self.order_price[order_id])}
+                    for order_id in np.flatnonzero(self.order_status[:self.count] == self.OPEN).tolist()]
+    
+    def positions(self) -> List[Dict]:
+        """Positions non nulles ou ayant généré du PnL, avec PnL latent"""
+        with self._lock:
+            unrealized = np.nan_to_num(self.position * (self.last_price - self.average_price))
+            return [{'symbol': symbol, 'quantity': float(self.position[row]),
+                     'average_price': float(self.average_price[row]),
+                     'last_price': float(self.last_price[row]),
+                     'unrealized_pnl': float(unrealized[row]),
+                     'realized_pnl': float(self.realized_pnl[row]), 'fees': float(self.fees[row])}
+                    for symbol, row in self.index.items()
+                    if self.position[row] or self.realized_pnl[row] or self.fees[row]]
+    
+    def equity(self) -> float:
+        """Liquidités + valeur des positions au dernier prix"""
+        with self._lock:
+            return float(self.cash + np.nansum(self.position * self.last_price))
+    
+    def close(self):
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+
+class PortfolioAnalytics:
+    """Corrélations, bêtas et force relative glissants sur une matrice de rendements alignés
+    
+    Les rendements logarithmiques des `window` dernières bougies sont gardés dans un
+    tampon circulaire (bougies x symboles) avec leurs sommes et la matrice des produits
+    croisés : une nouvelle bougie retire la plus ancienne et ajoute la nouvelle en
+    O(symboles²), sans recalcul complet. Les sommes sont recalculées exactement toutes
+    les `window` bougies pour éviter la dérive numérique.
+    """
+    
+    RANK_UPDATE = np.array([1.0, -1.0])
+    
+    def __init__(self, window: int = 500):
+        self.window = window
+        self.symbols: List[str] = []
+        self.last_timestamp = None  # date de la dernière bougie intégrée
+        self.version = 0
+        self._lock = threading.Lock()
+        self._reset(0)
+    
+    def _reset(self, count: int):
+        self.returns = np.zeros((self.window, count))
+        self.last_prices = np.full(count, np.nan)
+        self.head = 0
+        self.count = 0
+        self.sums = np.zeros(count)
+        self.products = np.zeros((count, count))
+        self._since_resync = 0
+    
+    @staticmethod
+    def align(series: Dict[str, pd.Series]) -> pd.DataFrame:
+        """Matrice de clôtures alignées dans le temps (dates x symboles, valeurs reportées)"""
+        closes = pd.concat(series, axis=1).sort_index()
+        return closes[~closes.index.duplicated(keep='last')].ffill()
+    
+    def load(self, closes: pd.DataFrame):
+        """Initialise à partir d'une matrice de clôtures alignées (dates x symboles)"""
+        prices = closes.to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.diff(np.log(prices), axis=0)
+        returns = np.nan_to_num(returns[-self.window:], nan=0.0, posinf=0.0, neginf=0.0)
+        with self._lock:
+            self.symbols = list(closes.columns)
+            self._reset(len(self.symbols))
+            self.count = len(returns)
+            self.returns[:self.count] = returns
+            self.head = self.count % self.window
+            self.sums = returns.sum(axis=0)
+            self.products = returns.T @ returns
+            self.last_prices = prices[-1].copy()
+            self.last_timestamp = closes.index[-1]
+            self.version += 1
+    
+    def append(self, prices: np.ndarray, timestamp=None):
+        """Ajoute une bougie (clôtures de tous les symboles, dans l'ordre de `symbols`)"""
+        with self._lock:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                new = np.log(prices / self.last_prices)
+            new = np.nan_to_num(new, nan=0.0, posinf=0.0, neginf=0.0)
+            self.last_prices = np.where(np.isnan(prices), self.last_prices, prices)
+            
+            old = self.returns[self.head].copy() if self.count == self.window else np.zeros_like(new)
+            self.count = min(self.count + 1, self.window)
+            self.returns[self.head] = new
+            self.head = (self.head + 1) % self.window
+            self.sums += new - old
+            # Mise à jour de rang 2 en un seul produit matriciel : + new·newᵀ - old·oldᵀ
+            rows = np.stack((new, old))
+            self.products += (rows.T * self.RANK_UPDATE) @ rows
+            
+            self._since_resync += 1
+            if self._since_resync >= self.window:
+                window = self.returns[:self.count]
+                self.sums = window.sum(axis=0)
+                self.products = window.T @ window
+                self._since_resync = 0
+            if timestamp is not None:
+                self.last_timestamp = timestamp
+            self.version += 1
+    
+    def update(self, closes: pd.DataFrame) -> int:
+        """Intègre les bougies postérieures à la dernière connue ; retourne leur nombre
+        
+        Un changement de symboles (ou un premier appel) recharge toute la matrice.
+        """
+        if list(closes.columns) != self.symbols or self.last_timestamp is None:
+            with metrics.timer('correlation_load'):
+                self.load(closes)
+            return len(closes)
+        new_rows = closes[closes.index > self.last_timestamp]
+        with metrics.timer('correlation_update'):
+            for timestamp, prices in zip(new_rows.index, new_rows.to_numpy(dtype=np.float64)):
+                self.append(prices, timestamp)
+        return len(new_rows)
+    
+    def covariance(self) -> np.ndarray:
+        with self._lock:
+            n = max(self.count, 2)
+            return (self.products - np.outer(self.sums, self.sums) / n) / (n - 1)
+    
+    def correlation(self) -> np.ndarray:
+        """Matrice de corrélation des rendements sur la fenêtre"""
+        covariance = self.covariance()
+        deviation = np.sqrt(np.clip(np.diag(covariance), 0, None))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = covariance / np.outer(deviation, deviation)
+        return np.clip(np.nan_to_num(correlation), -1.0, 1.0)
+    
+    def beta(self, benchmark: str) -> np.ndarray:
+        """Bêta de chaque symbole par rapport au symbole de référence"""
+        covariance = self.covariance()
+        column = self.symbols.index(benchmark)
+        variance = covariance[column, column]
+        return covariance[:, column] / variance if variance > 0 else np.zeros(len(self.symbols))
+    
+    def relative_strength(self, benchmark: str) -> np.ndarray:
+        """Performance sur la fenêtre relativement au symbole de référence (en %)"""
+        with self._lock:
+            sums = self.sums.copy()
+        return (np.exp(sums - sums[self.symbols.index(benchmark)]) - 1) * 100
+    
+    def snapshot(self) -> 'AnalyticsSnapshot':
+        """Résultats figés, assez légers pour être envoyés par le collecteur"""
+        correlation = self.correlation()
+        covariance = self.covariance()
+        with self._lock:
+            return AnalyticsSnapshot(list(self.symbols), correlation,
+                                     np.sqrt(np.clip(np.diag(covariance), 0, None)),
+                                     self.sums.copy(), self.count, self.version)
+
+@dataclass
+class AnalyticsSnapshot:
+    """Corrélations d'un PortfolioAnalytics à un instant donné (bêtas et force relative dérivés)"""
+    symbols: List[str]
+    correlation: np.ndarray
+    deviation: np.ndarray  # écarts-types des rendements
+    sums: np.ndarray  # rendements logarithmiques cumulés sur la fenêtre
+    count: int
+    version: int
+    
+    def beta(self, benchmark: str) -> np.ndarray:
+        column = self.symbols.index(benchmark)
+        if self.deviation[column] <= 0:
+            return np.zeros(len(self.symbols))
+        return self.correlation[:, column] * self.deviation / self.deviation[column]
+    
+    def relative_strength(self, benchmark: str) -> np.ndarray:
+        return (np.exp(self.sums - self.sums[self.symbols.index(benchmark)]) - 1) * 100
+
+def portfolio_snapshot(source, analytics: Dict[tuple, PortfolioAnalytics], symbols: List[str],
+                       interval: str, days: int, window: int,
+                       max_age: Optional[float] = None) -> Optional[AnalyticsSnapshot]:
+    """Clôtures des symboles, alignement, mise à jour incrémentale puis instantané
+    
+    `analytics` garde un PortfolioAnalytics par (intervalle, fenêtre) d'un appel à
+    l'autre ; `source` fournit `get_crypto_data` (DataProvider du collecteur, ou local).
+    """
+    portfolio = analytics.get((interval, window))
+    if portfolio is None:
+        portfolio = analytics[(interval, window)] = PortfolioAnalytics(window)
+    with ThreadPoolExecutor(max_workers=8, thread_name_prefix='analytics-fetch') as executor:
+        frames = executor.map(lambda symbol: (symbol, source.get_crypto_data(
+            symbol, interval, days, max_age=max_age)), symbols)
+        series = {symbol: data['close'] for symbol, data in frames if data is not None}
+    if len(series) < 2:
+        return None
+    # La dernière bougie est encore ouverte : seules les bougies closes sont intégrées
+    added = portfolio.update(PortfolioAnalytics.align(series).iloc[:-1])
+    metrics.increment('correlation_rows', added)
+    return portfolio.snapshot()
 
 class SplashScreen:
     """Écran de démarrage moderne"""
@@ -257,144 +1999,1062 @@ class SplashScreen:
         
         animate_step(0)
     
-    def close_splash(self):
-        """Ferme le splash et lance l'application principale"""
-        self.root.destroy()
-        self.main_callback()
+    def close_splash(self):
+        """Ferme le splash et lance l'application principale"""
+        self.root.destroy()
+        self.main_callback()
+
+class ChartWidget:
+    """Widget graphique avancé"""
+    
+    def __init__(self, parent=None, figsize=(12, 8), dpi=100):
+        self.parent = parent
+        self.figure = Figure(figsize=figsize, dpi=dpi, facecolor='#0d1117')
+        if parent is None:
+            # Rendu hors écran (benchmarks, miniatures) sans fenêtre Tk
+            self.canvas = FigureCanvasAgg(self.figure)
+        else:
+            self.canvas = FigureCanvasTkAgg(self.figure, parent)
+            self.canvas.get_tk_widget().configure(bg='#0d1117')
+        
+        # Style sombre
+        plt.style.use('dark_background')
+        
+    def plot_candlestick(self, data: pd.DataFrame, symbol: str, indicators: List[str] = None):
+        """Affiche un graphique en chandeliers avec indicateurs"""
+        try:
+            start = time.perf_counter()
+            self.figure.clear()
+            
+            # Configuration des subplots
+            if indicators and any(ind in ['RSI', 'MACD'] for ind in indicators):
+                gs = self.figure.add_gridspec(3, 1, height_ratios=[3, 1, 1], hspace=0.3)
+                ax_main = self.figure.add_subplot(gs[0])
+                ax_rsi = self.figure.add_subplot(gs[1]) if 'RSI' in indicators else None
+                ax_macd = self.figure.add_subplot(gs[2]) if 'MACD' in indicators else None
+            else:
+                ax_main = self.figure.add_subplot(111)
+                ax_rsi = ax_macd = None
+            
+            # Graphique principal - Chandeliers
+            self._plot_candlesticks(ax_main, data)
+            
+            # Indicateurs sur le graphique principal
+            if indicators:
+                self._plot_main_indicators(ax_main, data, indicators)
+            
+            # RSI
+            if ax_rsi and 'RSI' in indicators:
+                self._plot_rsi(ax_rsi, data)
+            
+            # MACD
+            if ax_macd and 'MACD' in indicators:
+                self._plot_macd(ax_macd, data)
+            
+            # Configuration générale
+            ax_main.set_title(f'{symbol} - Analyse Technique', 
+                            color='white', fontsize=14, fontweight='bold')
+            ax_main.grid(True, alpha=0.3)
+            ax_main.set_facecolor('#0d1117')
+            metrics.observe('plot_candlestick', time.perf_counter() - start)
+            
+            with metrics.timer('canvas_draw'):
+                self.canvas.draw()
+            
+        except Exception as e:
+            logger.error(f"Erreur affichage graphique: {e}")
+    
+    def _plot_candlesticks(self, ax, data):
+        """Dessine les chandeliers"""
+        # Conversion pour matplotlib
+        plot_ohlc(ax, mdates.date2num(data.index), data, width=0.6)
+        
+        # Format des dates
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
+        span_days = (data.index[-1] - data.index[0]).days if len(data) > 1 else 0
+        ax.xaxis.set_major_locator(mdates.DayLocator(interval=max(5, span_days // 6)))
+    
+    def _plot_main_indicators(self, ax, data, indicators):
+        """Affiche les indicateurs sur le graphique principal"""
+        if 'SMA_20' in indicators and 'SMA_20' in data.columns:
+            ax.plot(data.index, data['SMA_20'], label='SMA 20', color='#ffaa00', linewidth=1.5)
+        
+        if 'SMA_50' in indicators and 'SMA_50' in data.columns:
+            ax.plot(data.index, data['SMA_50'], label='SMA 50', color='#ff6600', linewidth=1.5)
+        
+        if 'BB_upper' in indicators and all(col in data.columns for col in ['BB_upper', 'BB_lower', 'BB_middle']):
+            ax.plot(data.index, data['BB_upper'], color='#888888', alpha=0.7, linewidth=1)
+            ax.plot(data.index, data['BB_lower'], color='#888888', alpha=0.7, linewidth=1)
+            ax.fill_between(data.index, data['BB_upper'], data['BB_lower'], 
+                          alpha=0.1, color='gray', label='Bollinger Bands')
+        
+        ax.legend(loc='upper left')
+    
+    def _plot_rsi(self, ax, data):
+        """Affiche le RSI"""
+        if 'RSI' in data.columns:
+            ax.plot(data.index, data['RSI'], color='#00aaff', linewidth=2)
+            ax.axhline(y=70, color='red', linestyle='--', alpha=0.7)
+            ax.axhline(y=30, color='green', linestyle='--', alpha=0.7)
+            ax.fill_between(data.index, 30, 70, alpha=0.1, color='gray')
+            ax.set_ylabel('RSI', color='white')
+            ax.set_ylim(0, 100)
+            ax.grid(True, alpha=0.3)
+            ax.set_facecolor('#0d1117')
+    
+    def _plot_macd(self, ax, data):
+        """Affiche le MACD"""
+        if all(col in data.columns for col in ['MACD', 'MACD_signal', 'MACD_histogram']):
+            ax.plot(data.index, data['MACD'], color='#00aaff', label='MACD', linewidth=1.5)
+            ax.plot(data.index, data['MACD_signal'], color='#ff6600', label='Signal', linewidth=1.5)
+            histogram = data['MACD_histogram'].fillna(0).to_numpy()
+            plot_bars(ax, mdates.date2num(data.index), histogram, np.zeros_like(histogram),
+                      width=0.8, colors='gray', alpha=0.6, label='Histogram')
+            ax.axhline(y=0, color='white', linestyle='-', alpha=0.5)
+            ax.legend(loc='upper left')
+            ax.set_ylabel('MACD', color='white')
+            ax.grid(True, alpha=0.3)
+            ax.set_facecolor('#0d1117')
+    
+    def get_widget(self):
+        """Retourne le widget canvas"""
+        return self.canvas.get_tk_widget()
+
+def plot_bars(ax, x, heights, bottoms, width: float, colors, alpha: float = 1.0, label: str = None):
+    """Barres verticales en une seule PolyCollection (ax.bar crée un Rectangle par barre)"""
+    x = np.asarray(x, dtype=float)
+    left, right = x - width / 2, x + width / 2
+    top = bottoms + heights
+    verts = np.stack([np.column_stack((left, bottoms)), np.column_stack((left, top)),
+                      np.column_stack((right, top)), np.column_stack((right, bottoms))], axis=1)
+    collection = PolyCollection(verts, facecolors=colors, edgecolors='none', alpha=alpha, label=label)
+    ax.add_collection(collection)
+    ax.autoscale_view()
+    return collection
+
+def plot_ohlc(ax, x, data: pd.DataFrame, width: float, linewidth: float = 1, alpha: float = 0.8):
+    """Dessine des chandeliers en deux collections (mèches + corps) au lieu d'un artiste par bougie"""
+    opens, closes = data['open'].to_numpy(), data['close'].to_numpy()
+    colors = np.where(closes >= opens, '#00ff88', '#ff4444')
+    ax.vlines(x, data['low'].to_numpy(), data['high'].to_numpy(), colors=colors, linewidth=linewidth)
+    plot_bars(ax, x, np.abs(closes - opens), np.minimum(opens, closes), width, colors, alpha)
+
+def render_thumbnail(symbol: str, times: np.ndarray, values: np.ndarray, width: int = 240,
+                     height: int = 150, dpi: int = 80) -> Tuple[bytes, float]:
+    """Rend une miniature PNG (chandeliers, SMA 20, RSI) avec le backend Agg
+    
+    `times` (datetime64) et `values` (lignes x SERIES_FIELDS, float64) viennent d'une
+    série typée, quelle que soit sa source. Fonction de module pour pouvoir être exécutée
+    dans un processus de travail : les indicateurs et le rendu n'utilisent pas le GIL de
+    l'interface.
+    """
+    start = time.perf_counter()
+    data = compute_indicators(pd.DataFrame(values, index=pd.DatetimeIndex(times, name='datetime'),
+                                           columns=SERIES_FIELDS))
+    
+    figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi, facecolor='#0d1117')
+    FigureCanvasAgg(figure)
+    gs = figure.add_gridspec(2, 1, height_ratios=[3, 1], hspace=0,
+                             left=0.02, right=0.98, top=0.86, bottom=0.04)
+    ax_main = figure.add_subplot(gs[0])
+    ax_rsi = figure.add_subplot(gs[1], sharex=ax_main)
+    
+    x = np.arange(len(data))
+    closes = data['close'].to_numpy()
+    plot_ohlc(ax_main, x, data, width=0.7, linewidth=0.6, alpha=1.0)
+    if 'SMA_20' in data.columns:
+        ax_main.plot(x, data['SMA_20'].to_numpy(), color='#ffaa00', linewidth=0.8)
+    
+    if 'RSI' in data.columns:
+        ax_rsi.plot(x, data['RSI'].to_numpy(), color='#00aaff', linewidth=0.8)
+        ax_rsi.axhline(y=70, color='red', linestyle='--', linewidth=0.5, alpha=0.7)
+        ax_rsi.axhline(y=30, color='green', linestyle='--', linewidth=0.5, alpha=0.7)
+        ax_rsi.set_ylim(0, 100)
+    
+    for ax in (ax_main, ax_rsi):
+        ax.set_facecolor('#0d1117')
+        ax.set_xticks([])
+        ax.set_yticks([])
+        for spine in ax.spines.values():
+            spine.set_color('#21262d')
+    
+    if len(data):
+        last, first = closes[-1], closes[0]
+        change = (last - first) / first * 100 if first else 0.0
+        figure.suptitle(f"{symbol.replace('USDT', '')}  ${last:,.2f}  {change:+.2f}%", x=0.02, y=0.97,
+                        ha='left', fontsize=8, color='#00ff88' if change >= 0 else '#ff4444')
+    
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png', facecolor='#0d1117')
+    return buffer.getvalue(), time.perf_counter() - start
+
+class ThumbnailService:
+    """Rendu de miniatures hors écran dans un pool de processus, avec cache LRU
+    
+    Les séries typées sont récupérées par des threads (E/S, toutes sources), puis
+    leurs tableaux numériques sont rendus dans des processus séparés. Les résultats sont déposés dans une file
+    (une par galerie, sinon la file commune) que le thread Tk vide avec `poll()`.
+    """
+    
+    def __init__(self, data_provider: DataProvider, size: Tuple[int, int] = (240, 150), dpi: int = 80,
+                 max_workers: Optional[int] = None, cache_size: int = 256):
+        self.data_provider = data_provider
+        self.size = size
+        self.dpi = dpi
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.cache_size = cache_size
+        self.cache: 'OrderedDict[tuple, bytes]' = OrderedDict()
+        self.results: 'queue.Queue[Tuple[str, Optional[bytes]]]' = queue.Queue()
+        self._cache_lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        self._processes = None
+        self._threads = ThreadPoolExecutor(max_workers=8, thread_name_prefix='thumbnail-fetch')
+    
+    def _pool(self) -> ProcessPoolExecutor:
+        """Pool créé à la demande ; 'spawn' évite de forker un processus qui porte Tk"""
+        with self._pool_lock:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                      mp_context=multiprocessing.get_context('spawn'))
+            return self._processes
+    
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        """Arrête un pool cassé ; il sera recréé à la prochaine demande"""
+        with self._pool_lock:
+            if self._processes is pool:  # un autre thread a pu le remplacer entre-temps
+                self._processes = None
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _cache_get(self, key: tuple) -> Optional[bytes]:
+        with self._cache_lock:
+            image = self.cache.get(key)
+            if image is not None:
+                self.cache.move_to_end(key)
+            return image
+    
+    def _cache_put(self, key: tuple, image: bytes):
+        with self._cache_lock:
+            self.cache[key] = image
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            metrics.set_gauge('thumbnail_cache_entries', len(self.cache))
+    
+    def request(self, symbols: List[str], interval: str = '1h', days: int = 3,
+                results: Optional[queue.Queue] = None):
+        """Demande les miniatures des symboles (résultats disponibles via `poll(results)`)"""
+        results = self.results if results is None else results
+        for symbol in symbols:
+            self._threads.submit(self._fetch_and_render, symbol, interval, days, results)
+    
+    def _fetch_and_render(self, symbol: str, interval: str, days: int, results: queue.Queue):
+        pool = None
+        try:
+            data = self.data_provider.get_klines(symbol, interval, days)
+            if not len(data):
+                raise ValueError("aucune donnée")
+            
+            # La miniature ne change que si une nouvelle bougie ou un nouveau close arrive
+            key = (symbol, interval, days, data.index[-1], float(data['close'].iloc[-1]), self.size, self.dpi)
+            image = self._cache_get(key)
+            if image is not None:
+                metrics.increment('thumbnail_cache_hit')
+            else:
+                metrics.increment('thumbnail_cache_miss')
+                pool = self._pool()
+                future = pool.submit(render_thumbnail, symbol, data.index.values,
+                                     data[SERIES_FIELDS].to_numpy(dtype=np.float64),
+                                     self.size[0], self.size[1], self.dpi)
+                image, duration = future.result()
+                metrics.observe('thumbnail_render', duration)
+                self._cache_put(key, image)
+            results.put((symbol, image))
+            
+        except BrokenProcessPool as e:
+            # Un processus de rendu est mort : le pool sera recréé à la prochaine demande
+            logger.error(f"Pool de rendu interrompu ({symbol}): {e}")
+            if pool is not None:
+                self._discard_pool(pool)
+            results.put((symbol, None))
+        except Exception as e:
+            logger.error(f"Erreur miniature {symbol}: {e}")
+            results.put((symbol, None))
+    
+    def poll(self, results: Optional[queue.Queue] = None) -> List[Tuple[str, Optional[bytes]]]:
+        """Résultats disponibles (à appeler depuis le thread Tk)"""
+        results = self.results if results is None else results
+        available = []
+        while True:
+            try:
+                available.append(results.get_nowait())
+            except queue.Empty:
+                return available
+    
+    def shutdown(self):
+        """Arrête les threads et les processus de rendu"""
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        with self._pool_lock:
+            pool, self._processes = self._processes, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+SERIES_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume',
+                  'SMA_9', 'SMA_20', 'SMA_50', 'EMA_12', 'EMA_26',
+                  'MACD', 'MACD_signal', 'MACD_histogram', 'RSI',
+                  'BB_middle', 'BB_upper', 'BB_lower']
+
+class SharedSeries:
+    """Séries d'un symbole/intervalle dans un segment de mémoire partagée
+    
+    Le segment contient `SLOTS` emplacements (une colonne float64 contiguë par
+    série, `capacity` lignes) précédés d'un en-tête (version, nombre de lignes) par
+    emplacement. Le collecteur écrit chaque publication dans l'emplacement suivant
+    et marque l'en-tête pendant l'écriture ; l'interface copie l'emplacement et
+    recommence si sa version a changé pendant la copie (seqlock).
+    """
+    
+    SLOTS = 4
+    WRITING = -1  # version d'un emplacement en cours d'écriture
+    MAX_SEGMENTS = 64  # segments gardés par le collecteur (et attachés par l'interface)
+    
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray((self.SLOTS, 2), dtype=np.int64, buffer=shm.buf)
+        # Capacité déduite de la taille : l'interface attache le segment par son seul nom
+        self.capacity = (shm.size - self.header.nbytes) // (8 * self.SLOTS * len(SERIES_COLUMNS))
+        self.slots = np.ndarray((self.SLOTS, len(SERIES_COLUMNS), self.capacity), dtype=np.float64,
+                                buffer=shm.buf, offset=self.header.nbytes)
+    
+    @classmethod
+    def create(cls, capacity: int) -> 'SharedSeries':
+        size = 8 * (cls.SLOTS * 2 + cls.SLOTS * len(SERIES_COLUMNS) * max(1, capacity))
+        return cls(shared_memory.SharedMemory(create=True, size=size), owner=True)
+    
+    @classmethod
+    def attach(cls, name: str) -> 'SharedSeries':
+        # Le collecteur (lancé par 'spawn') partage le resource_tracker de l'interface :
+        # les segments restants sont supprimés à la sortie même si le collecteur plante
+        series = cls(shared_memory.SharedMemory(name=name), owner=False)
+        series.header.flags.writeable = False
+        series.slots.flags.writeable = False
+        return series
+    
+    def write(self, version: int, data: pd.DataFrame) -> Tuple[int, int]:
+        """Copie un DataFrame dans l'emplacement de `version` ; retourne (emplacement, lignes)"""
+        rows = len(data)
+        if rows > self.capacity:
+            raise ValueError(f"{rows} lignes pour un segment de {self.capacity}")
+        slot = version % self.SLOTS
+        block = self.slots[slot]
+        self.header[slot, 0] = self.WRITING
+        # Horodatage tiré de l'index : toutes les sources n'ont pas de colonne 'timestamp'
+        block[0, :rows] = data.index.values.astype('datetime64[ms]').astype(np.int64)
+        for position, column in enumerate(SERIES_COLUMNS[1:], start=1):
+            if column in data.columns:
+                block[position, :rows] = data[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            else:
+                block[position, :rows] = np.nan
+        self.header[slot, 1] = rows
+        self.header[slot, 0] = version
+        return slot, rows
+    
+    def read(self, slot: int, attempts: int = 100) -> Tuple[int, pd.DataFrame]:
+        """Copie cohérente d'un emplacement : (version lue, DataFrame indépendant du segment)
+        
+        La version peut être plus récente que celle notifiée si l'emplacement a été réutilisé.
+        """
+        for _ in range(attempts):
+            version, rows = (int(value) for value in self.header[slot])
+            if version != self.WRITING:
+                block = self.slots[slot, :, :rows].copy()
+                if int(self.header[slot, 0]) == version:
+                    index = pd.to_datetime(block[0], unit='ms')
+                    index.name = 'datetime'
+                    return version, pd.DataFrame(block.T, index=index, columns=SERIES_COLUMNS, copy=False)
+            time.sleep(0.001)  # écriture en cours : on relit
+        raise TimeoutError(f"Emplacement {slot} de {self.shm.name} réécrit pendant chaque lecture")
+    
+    def close(self):
+        self.header = self.slots = None  # libère les vues numpy avant de fermer le segment
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+def run_collector(base_url: Optional[str], requests_queue, notifications, max_workers: int = 4):
+    """Processus collecteur : récupère, parse, calcule les indicateurs et publie en mémoire partagée
+    
+    Chaque requête ('series', id, symbole, intervalle, jours, max_age) reçoit une notification
+    (id, nom du segment, emplacement, version, lignes) ou (id, None, ...) en cas d'échec.
+    Les requêtes ('analytics', id, symboles, intervalle, jours, fenêtre, max_age) alignent les
+    clôtures et mettent à jour les corrélations ici ; la notification (id, AnalyticsSnapshot
+    ou None) ne transporte que les résultats. Après chaque requête, les métriques mesurées
+    depuis la précédente sont envoyées dans une notification ('metrics', instantané).
+    """
+    provider = DataProvider(base_url)
+    # Segments par clé, du moins au plus récemment utilisé (les plus anciens sont supprimés)
+    segments: 'OrderedDict[str, SharedSeries]' = OrderedDict()
+    published: Dict[str, Tuple[pd.DataFrame, int, int, int]] = {}  # clé -> (données, empl., version, lignes)
+    publish_lock = threading.Lock()
+    analytics: Dict[tuple, PortfolioAnalytics] = {}
+    analytics_lock = threading.Lock()
+    
+    def send_metrics():
+        snapshot = metrics.drain()
+        if snapshot['stages'] or snapshot['counters']:
+            notifications.put(('metrics', snapshot))
+    
+    def segment_for(key: str, rows: int) -> SharedSeries:
+        """Segment de la clé (verrou tenu), recréé s'il est trop petit pour les données"""
+        segment = segments.get(key)
+        if segment is not None and segment.capacity < rows:
+            segments.pop(key).close()
+            segment = None
+        if segment is None:
+            segment = segments[key] = SharedSeries.create(max(64, rows + rows // 4))
+            while len(segments) > SharedSeries.MAX_SEGMENTS:
+                evicted, oldest = segments.popitem(last=False)
+                published.pop(evicted, None)
+                oldest.close()
+            metrics.set_gauge('collector_segments', len(segments))
+        segments.move_to_end(key)
+        return segment
+    
+    def handle(request_id, symbol, interval, days, max_age):
+        try:
+            data = provider.get_crypto_data(symbol, interval, days, max_age=max_age)
+            if data is None:
+                notifications.put((request_id, None, 0, 0, 0))
+                return
+            key = f"{symbol}_{interval}_{days}"
+            with publish_lock:
+                segment = segment_for(key, len(data))
+                last = published.get(key)
+                if last is not None and last[0] is data:
+                    _, slot, version, rows = last  # données inchangées (cache) : rien à réécrire
+                else:
+                    version = last[2] + 1 if last else 1
+                    slot, rows = segment.write(version, data)
+                    published[key] = (data, slot, version, rows)
+                name = segment.shm.name
+            notifications.put((request_id, name, slot, version, rows))
+        except Exception as e:
+            logger.error(f"Erreur collecteur {symbol}: {e}")
+            notifications.put((request_id, None, 0, 0, 0))
+        finally:
+            send_metrics()
+    
+    def handle_analytics(request_id, symbols, interval, days, window, max_age):
+        try:
+            with analytics_lock:
+                snapshot = portfolio_snapshot(provider, analytics, symbols, interval, days, window, max_age)
+            notifications.put((request_id, snapshot))
+        except Exception as e:
+            logger.error(f"Erreur collecteur (corrélations): {e}")
+            notifications.put((request_id, None))
+        finally:
+            send_metrics()
+    
+    handlers = {'series': handle, 'analytics': handle_analytics}
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='collector')
+    try:
+        while True:
+            request = requests_queue.get()
+            if request is None:
+                break
+            executor.submit(handlers[request[0]], *request[1:])
+    finally:
+        executor.shutdown(wait=True)
+        for segment in segments.values():
+            segment.close()
+
+class CollectorClient:
+    """Côté interface du collecteur : même `get_crypto_data` que DataProvider
+    
+    La couche données (requêtes, parsing, indicateurs, cache) tourne dans un
+    processus séparé ; les DataFrames retournés sont des copies cohérentes de la
+    mémoire partagée (une copie mémoire, sans désérialisation). Sans processus
+    collecteur, les appels sont servis par un DataProvider local.
+    """
+    
+    def __init__(self, base_url: Optional[str] = None, fallback: Optional[DataProvider] = None):
+        self.base_url = base_url
+        self.fallback = fallback or DataProvider(base_url)
+        self._context = multiprocessing.get_context('spawn')
+        self._requests = self._context.Queue()
+        self._notifications = self._context.Queue()
+        self._process = None
+        self._receiver = None
+        self._segments: 'OrderedDict[str, SharedSeries]' = OrderedDict()  # attachés, du plus ancien au plus récent
+        self._frames: Dict[str, Tuple[int, pd.DataFrame]] = {}  # segment -> dernière copie lue
+        self._segments_lock = threading.Lock()
+        self._waiting: Dict[int, Tuple[threading.Event, list]] = {}
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._analytics: Dict[tuple, PortfolioAnalytics] = {}  # repli local sans collecteur
+        self._analytics_lock = threading.Lock()
+    
+    def start(self) -> 'CollectorClient':
+        """Lance le processus collecteur et le thread de réception des notifications"""
+        self._process = self._context.Process(target=run_collector, name='blackcube-collector',
+                                              args=(self.base_url, self._requests, self._notifications),
+                                              daemon=True)
+        self._process.start()
+        self._receiver = threading.Thread(target=self._receive, daemon=True, name='collector-notify')
+        self._receiver.start()
+        return self
+    
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+    
+    def _receive(self):
+        while True:
+            try:
+                notification = self._notifications.get()
+            except (EOFError, OSError):
+                return
+            if notification is None:
+                return
+            if notification[0] == 'metrics':
+                # Étapes mesurées dans le collecteur (requêtes, parsing, indicateurs)
+                metrics.merge(notification[1])
+                continue
+            with self._lock:
+                waiter = self._waiting.pop(notification[0], None)
+            if waiter:
+                waiter[1].append(notification)
+                waiter[0].set()
+    
+    def get_crypto_data(self, symbol: str, interval: str = '1d', days: int = 30,
+                        max_age: Optional[float] = None, timeout: float = 30) -> Optional[pd.DataFrame]:
+        """Demande une série au collecteur et attend la notification (thread appelant)"""
+        if not self.alive:
+            return self.fallback.get_crypto_data(symbol, interval, days, max_age=max_age)
+        
+        # Un segment peut être supprimé par le collecteur avant d'être attaché : on redemande une fois
+        for attempt in range(2):
+            start = time.perf_counter()
+            notification = self._request(('series', symbol, interval, days, max_age), timeout)
+            if notification is None:
+                logger.error(f"Collecteur: délai dépassé pour {symbol}")
+                return None
+            metrics.observe('collector_roundtrip', time.perf_counter() - start)
+            
+            _, name, slot, version, rows = notification
+            if name is None:
+                metrics.increment('fetch_errors')
+                return None
+            try:
+                return self._read_segment(name, slot, version)
+            except FileNotFoundError:
+                metrics.increment('collector_segment_gone')
+            except TimeoutError as e:
+                logger.error(f"Collecteur: {e}")
+                return None
+        return None
+    
+    def _read_segment(self, name: str, slot: int, version: int) -> pd.DataFrame:
+        """Copie de la publication `version` (ou plus récente) d'un segment"""
+        with self._segments_lock:
+            segment = self._segments.get(name)
+            if segment is None:
+                segment = self._segments[name] = SharedSeries.attach(name)
+                # Les segments les plus anciens ont pu être supprimés par le collecteur
+                while len(self._segments) > SharedSeries.MAX_SEGMENTS:
+                    evicted, oldest = self._segments.popitem(last=False)
+                    self._frames.pop(evicted, None)
+                    oldest.close()
+            self._segments.move_to_end(name)
+            # Version déjà lue : même objet, les vues peuvent détecter l'absence de changement
+            last = self._frames.get(name)
+            if last is None or last[0] < version:
+                last = self._frames[name] = segment.read(slot)
+            return last[1]
+    
+    def _request(self, request: tuple, timeout: float) -> Optional[tuple]:
+        """Envoie (type, arguments...) avec un nouvel identifiant et attend la notification"""
+        event, result = threading.Event(), []
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            self._waiting[request_id] = (event, result)
+        self._requests.put((request[0], request_id) + request[1:])
+        if not event.wait(timeout):
+            with self._lock:
+                self._waiting.pop(request_id, None)
+            return None
+        return result[0]
+    
+    def portfolio_analytics(self, symbols: List[str], interval: str, days: int, window: int,
+                            max_age: Optional[float] = None, timeout: float = 60) -> Optional[AnalyticsSnapshot]:
+        """Corrélations de la watchlist calculées dans le collecteur (hors GIL de l'interface)"""
+        if not self.alive:
+            with self._analytics_lock:
+                return portfolio_snapshot(self.fallback, self._analytics, symbols, interval, days,
+                                          window, max_age)
+        notification = self._request(('analytics', symbols, interval, days, window, max_age), timeout)
+        if notification is None:
+            logger.error("Collecteur: délai dépassé pour les corrélations")
+            return None
+        return notification[1]
+    
+    def shutdown(self):
+        """Arrête le collecteur (qui supprime ses segments)"""
+        if self._process is not None:
+            self._requests.put(None)
+            self._process.join(timeout=5)
+            self._notifications.put(None)
+            self._receiver.join(timeout=5)
+            self._process = None
+        with self._segments_lock:
+            for segment in self._segments.values():
+                segment.close()
+            self._segments.clear()
+            self._frames.clear()
+
+class ChartGrid:
+    """Grille de graphiques (2x2, 3x3...) dans une seule figure, lisant le cache partagé du DataProvider
+    
+    Les threads de chargement ne font que déposer les données ; la boucle de frames,
+    sur le thread Tk, retrace les cellules modifiées puis dessine la figure une seule
+    fois par frame, quel que soit le nombre de graphiques mis à jour. Un clic droit
+    sur une cellule passe à l'intervalle suivant, un double-clic ouvre le symbole.
+    """
+    
+    # Intervalle -> (jours d'historique, largeur d'une bougie en jours)
+    INTERVALS = {'15m': (1, 15 / 1440), '1h': (3, 1 / 24), '4h': (10, 4 / 24), '1d': (30, 1.0)}
+    
+    def __init__(self, parent, data_provider: DataProvider, rows: int = 2, cols: int = 2,
+                 cells: List[Tuple[str, str]] = None, fps: int = 10, refresh_interval: float = 10,
+                 on_select=None, should_refresh=None, on_data=None):
+        self.parent = parent
+        self.data_provider = data_provider
+        self.frame_ms = max(1, int(1000 / fps))
+        self.refresh_interval = refresh_interval
+        self.on_select = on_select
+        self.should_refresh = should_refresh
+        self.on_data = on_data  # (symbole, intervalle, données) après chaque chargement, hors thread Tk
+        self.figure = Figure(figsize=(12, 8), dpi=100, facecolor='#0d1117')
+        if parent is None:
+            self.canvas = FigureCanvasAgg(self.figure)
+        else:
+            self.canvas = FigureCanvasTkAgg(self.figure, parent)
+            self.canvas.get_tk_widget().configure(bg='#0d1117')
+        self.canvas.mpl_connect('button_press_event', self._on_click)
+        self.cells: List[Dict] = []
+        self._generation = 0  # incrémenté à chaque nouvelle disposition ou intervalle de cellule
+        self._pending: Dict[int, pd.DataFrame] = {}
+        self._pending_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='grid-fetch')
+        self._running = False
+        self._frame_job = None  # identifiants after() des boucles en cours
+        self._refresh_job = None
+        self._layout_dirty = False
+        self.set_layout(rows, cols, cells or [])
+    
+    def set_layout(self, rows: int, cols: int, cells: List[Tuple[str, str]]):
+        """Reconstruit la grille ; `cells` liste (symbole, intervalle) ligne par ligne"""
+        self.rows, self.cols = rows, cols
+        self.figure.clear()
+        gs = self.figure.add_gridspec(rows, cols, hspace=0.35, wspace=0.15,
+                                      left=0.04, right=0.98, top=0.95, bottom=0.05)
+        self.cells = []
+        for index, (symbol, interval) in enumerate(cells[:rows * cols]):
+            ax = self.figure.add_subplot(gs[index // cols, index % cols])
+            ax.set_facecolor('#0d1117')
+            ax.set_title(f"{symbol} {interval}", color='#8b949e', fontsize=9)
+            self.cells.append({'symbol': symbol, 'interval': interval, 'ax': ax,
+                               'data': None, 'dirty': False})
+        with self._pending_lock:
+            self._generation += 1
+            self._pending.clear()
+        self._layout_dirty = True
+    
+    def refresh(self):
+        """Recharge les données (une requête par couple symbole/intervalle distinct)"""
+        targets: Dict[Tuple[str, str], List[int]] = {}
+        for index, cell in enumerate(self.cells):
+            targets.setdefault((cell['symbol'], cell['interval']), []).append(index)
+        generation = self._generation
+        for (symbol, interval), indices in targets.items():
+            self._executor.submit(self._fetch, symbol, interval, indices, generation)
+    
+    def _fetch(self, symbol: str, interval: str, indices: List[int], generation: int):
+        days = self.INTERVALS.get(interval, self.INTERVALS['1d'])[0]
+        data = self.data_provider.get_crypto_data(symbol, interval, days, max_age=self.refresh_interval)
+        if data is None:
+            return
+        if self.on_data:
+            self.on_data(symbol, interval, data)
+        with self._pending_lock:
+            if generation == self._generation:  # ignore les résultats d'une ancienne disposition
+                for index in indices:
+                    self._pending[index] = data
+    
+    def tick(self) -> bool:
+        """Une frame : applique les données reçues, retrace les cellules modifiées, dessine une fois"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for index, data in pending.items():
+            if index >= len(self.cells):
+                continue
+            cell = self.cells[index]
+            if cell['data'] is not data:
+                cell['data'] = data
+                cell['dirty'] = True
+        
+        dirty = [cell for cell in self.cells if cell['dirty']]
+        if not dirty and not self._layout_dirty:
+            return False
+        
+        with metrics.timer('grid_frame'):
+            for cell in dirty:
+                self._plot_cell(cell)
+                cell['dirty'] = False
+            with metrics.timer('canvas_draw'):
+                self.canvas.draw()
+        metrics.increment('grid_cells_plotted', len(dirty))
+        self._layout_dirty = False
+        return True
+    
+    def _plot_cell(self, cell: Dict):
+        """Retrace une cellule : chandeliers, SMA 20 et dernier prix"""
+        ax, data = cell['ax'], cell['data']
+        ax.clear()
+        ax.set_facecolor('#0d1117')
+        x = mdates.date2num(data.index)
+        width = self.INTERVALS.get(cell['interval'], self.INTERVALS['1d'])[1] * 0.6
+        plot_ohlc(ax, x, data, width=width)
+        if 'SMA_20' in data.columns:
+            ax.plot(x, data['SMA_20'].to_numpy(), color='#ffaa00', linewidth=1)
+        
+        last = data['close'].iloc[-1] if len(data) else float('nan')
+        ax.set_title(f"{cell['symbol']} {cell['interval']}  ${last:,.2f}", color='white', fontsize=9)
+        ax.xaxis.set_major_locator(MaxNLocator(nbins=4))
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%d %H:%M' if cell['interval'] != '1d' else '%m/%d'))
+        ax.tick_params(labelsize=7)
+        ax.grid(True, alpha=0.2)
+    
+    def set_cell_interval(self, index: int, interval: str):
+        """Change l'intervalle d'une cellule et recharge la grille"""
+        cell = self.cells[index]
+        cell['interval'] = interval
+        cell['data'] = None
+        cell['ax'].clear()
+        cell['ax'].set_facecolor('#0d1117')
+        cell['ax'].set_title(f"{cell['symbol']} {interval}", color='#8b949e', fontsize=9)
+        with self._pending_lock:
+            self._generation += 1  # les chargements en cours portent l'ancien intervalle
+            self._pending.clear()
+        self._layout_dirty = True
+        self.refresh()
+    
+    def _on_click(self, event):
+        for index, cell in enumerate(self.cells):
+            if cell['ax'] is not event.inaxes:
+                continue
+            if event.dblclick and self.on_select:
+                self.on_select(cell['symbol'])
+            elif event.button == 3:
+                # Clic droit : intervalle suivant pour cette cellule
+                intervals = list(self.INTERVALS)
+                following = (intervals.index(cell['interval']) + 1) % len(intervals) \
+                    if cell['interval'] in intervals else 0
+                self.set_cell_interval(index, intervals[following])
+    
+    def start(self):
+        """Démarre la boucle de frames et l'actualisation périodique (thread Tk)"""
+        if self._running:
+            return
+        self._running = True
+        self.refresh()
+        self._frame_loop()
+        self._refresh_loop()
+    
+    def stop(self):
+        """Suspend la grille (les données en cache restent disponibles)"""
+        self._running = False
+        # Annule les boucles programmées : un start() immédiat ne doit pas les dupliquer
+        for name in ('_frame_job', '_refresh_job'):
+            job = getattr(self, name)
+            if job is not None:
+                self.canvas.get_tk_widget().after_cancel(job)
+                setattr(self, name, None)
+    
+    def _frame_loop(self):
+        self._frame_job = None
+        if not self._running:
+            return
+        try:
+            self.tick()
+        finally:
+            # Une frame en erreur ne doit pas arrêter les suivantes
+            self._frame_job = self.canvas.get_tk_widget().after(self.frame_ms, self._frame_loop)
+    
+    def _refresh_loop(self):
+        self._refresh_job = None
+        if not self._running:
+            return
+        if self.should_refresh is None or self.should_refresh():
+            self.refresh()
+        self._refresh_job = self.canvas.get_tk_widget().after(int(self.refresh_interval * 1000),
+                                                              self._refresh_loop)
+    
+    def get_widget(self):
+        """Retourne le widget canvas"""
+        return self.canvas.get_tk_widget()
+    
+    def shutdown(self):
+        """Arrête la grille et ses threads de chargement"""
+        self.stop()
+        self._executor.shutdown(wait=False, cancel_futures=True)
 
-class ChartWidget:
-    """Widget graphique avancé"""
+class WatchlistTable:
+    """Table virtualisée et triable : seules les lignes visibles existent sur le canvas"""
     
-    def __init__(self, parent):
-        self.parent = parent
-        self.figure = Figure(figsize=(12, 8), dpi=100, facecolor='#0d1117')
-        self.canvas = FigureCanvasTkAgg(self.figure, parent)
-        self.canvas.get_tk_widget().configure(bg='#0d1117')
+    ROW_HEIGHT = 32
+    COLUMNS = (('symbol', 'Actif'), ('price', 'Prix'), ('change', '24h'))
+    SPARK_X, SPARK_WIDTH = 62, 48
+    SPARK_POINTS = 48
+    
+    def __init__(self, parent, model: WatchlistModel, colors: Dict[str, str], on_activate=None):
+        self.model = model
+        self.colors = colors
+        self.on_activate = on_activate
+        self.sort_key = 'symbol'
+        self.sort_descending = False
+        self.top = 0  # position de la première ligne visible
+        self.selected: Optional[str] = None
+        self.order = np.arange(0)
+        self._order_state = None
+        self._rendered_state = None
+        self.slots = []  # lignes graphiques réutilisées (une par ligne visible)
         
-        # Style sombre
-        plt.style.use('dark_background')
+        # En-têtes cliquables pour le tri
+        header = tk.Frame(parent, bg=colors['bg_secondary'])
+        header.pack(fill='x')
+        self.header_labels = {}
+        for key, text in self.COLUMNS:
+            label = tk.Label(header, text=text, font=('Arial', 9, 'bold'), cursor='hand2',
+                             bg=colors['bg_secondary'], fg=colors['text_secondary'])
+            label.pack(side='left', expand=True)
+            label.bind('<Button-1>', lambda e, k=key: self.sort_by(k))
+            self.header_labels[key] = label
         
-    def plot_candlestick(self, data: pd.DataFrame, symbol: str, indicators: List[str] = None):
-        """Affiche un graphique en chandeliers avec indicateurs"""
-        try:
-            self.figure.clear()
-            
-            # Configuration des subplots
-            if indicators and any(ind in ['RSI', 'MACD'] for ind in indicators):
-                gs = self.figure.add_gridspec(3, 1, height_ratios=[3, 1, 1], hspace=0.3)
-                ax_main = self.figure.add_subplot(gs[0])
-                ax_rsi = self.figure.add_subplot(gs[1]) if 'RSI' in indicators else None
-                ax_macd = self.figure.add_subplot(gs[2]) if 'MACD' in indicators else None
-            else:
-                ax_main = self.figure.add_subplot(111)
-                ax_rsi = ax_macd = None
-            
-            # Graphique principal - Chandeliers
-            self._plot_candlesticks(ax_main, data)
-            
-            # Indicateurs sur le graphique principal
-            if indicators:
-                self._plot_main_indicators(ax_main, data, indicators)
-            
-            # RSI
-            if ax_rsi and 'RSI' in indicators:
-                self._plot_rsi(ax_rsi, data)
-            
-            # MACD
-            if ax_macd and 'MACD' in indicators:
-                self._plot_macd(ax_macd, data)
-            
-            # Configuration générale
-            ax_main.set_title(f'{symbol} - Analyse Technique', 
-                            color='white', fontsize=14, fontweight='bold')
-            ax_main.grid(True, alpha=0.3)
-            ax_main.set_facecolor('#0d1117')
-            
-            self.canvas.draw()
-            
-        except Exception as e:
-            logger.error(f"Erreur affichage graphique: {e}")
+        body = tk.Frame(parent, bg=colors['bg_secondary'])
+        body.pack(fill='both', expand=True)
+        
+        self.scrollbar = tk.Scrollbar(body, command=self.yview)
+        self.scrollbar.pack(side='right', fill='y')
+        
+        self.canvas = tk.Canvas(body, bg=colors['bg_tertiary'], highlightthickness=0)
+        self.canvas.pack(side='left', fill='both', expand=True)
+        
+        self.canvas.bind('<Configure>', lambda e: self.refresh(force=True))
+        self.canvas.bind('<MouseWheel>', lambda e: self.scroll(-1 if e.delta > 0 else 1, 'units'))
+        self.canvas.bind('<Button-4>', lambda e: self.scroll(-1, 'units'))
+        self.canvas.bind('<Button-5>', lambda e: self.scroll(1, 'units'))
+        self.canvas.bind('<Button-1>', self._on_click)
+        self.canvas.bind('<Double-1>', self._on_double_click)
+        
+        self._update_headers()
+        self._poll()
     
-    def _plot_candlesticks(self, ax, data):
-        """Dessine les chandeliers"""
-        # Conversion pour matplotlib
-        ohlc_data = data.reset_index()
-        ohlc_data['datetime_num'] = mdates.date2num(ohlc_data['datetime'])
+    def _poll(self):
+        """Vérifie périodiquement (thread Tk) si le modèle a changé"""
+        self.refresh()
+        self.canvas.after(100, self._poll)
+    
+    def _visible_count(self) -> int:
+        return max(1, self.canvas.winfo_height() // self.ROW_HEIGHT + 1)
+    
+    def _ensure_slots(self, count: int):
+        """Crée ou supprime les lignes graphiques selon la hauteur visible"""
+        width = self.canvas.winfo_width()
+        while len(self.slots) < count:
+            y = len(self.slots) * self.ROW_HEIGHT
+            top_line, bottom_line = y + 10, y + 24
+            background = self.canvas.create_rectangle(0, y, width, y + self.ROW_HEIGHT, width=0,
+                                                      fill=self.colors['bg_tertiary'])
+            cells = [
+                self.canvas.create_text(6, top_line, anchor='w', font=('Courier', 10), text=''),
+                self.canvas.create_text(width - 64, top_line, anchor='e', font=('Courier', 10), text=''),
+                self.canvas.create_text(width - 6, top_line, anchor='e', font=('Courier', 10), text=''),
+                # Ligne secondaire : extrêmes du jour
+                self.canvas.create_text(6, bottom_line, anchor='w', font=('Courier', 7), text='')
+            ]
+            spark = self.canvas.create_line(0, 0, 0, 0, width=1, state='hidden')
+            self.slots.append({'bg': background, 'cells': cells, 'spark': spark, 'y': y,
+                               'texts': [None] * 4, 'fills': [None] * 4, 'bg_fill': None,
+                               'spark_key': None, 'width': width})
+        while len(self.slots) > count:
+            slot = self.slots.pop()
+            self.canvas.delete(slot['bg'], slot['spark'], *slot['cells'])
+    
+    def _layout_slot(self, slot, width: int):
+        """Repositionne une ligne après un redimensionnement"""
+        y = slot['y']
+        self.canvas.coords(slot['bg'], 0, y, width, y + self.ROW_HEIGHT)
+        self.canvas.coords(slot['cells'][1], width - 64, y + 10)
+        self.canvas.coords(slot['cells'][2], width - 6, y + 10)
+        slot['width'] = width
+    
+    def _draw_sparkline(self, slot, row: int, positive: Optional[bool]):
+        """Trace l'historique récent de la ligne dans la colonne sparkline"""
+        values = self.model.history(row)
+        values = values[~np.isnan(values)]
+        if len(values) < 2:
+            self.canvas.itemconfigure(slot['spark'], state='hidden')
+            return
+        if len(values) > self.SPARK_POINTS:
+            values = values[np.linspace(0, len(values) - 1, self.SPARK_POINTS).astype(int)]
         
-        # Chandeliers manuels pour plus de contrôle
-        for idx, row in ohlc_data.iterrows():
-            date = row['datetime_num']
-            open_price, high, low, close = row['open'], row['high'], row['low'], row['close']
-            
-            # Couleur selon la tendance
-            color = '#00ff88' if close >= open_price else '#ff4444'
-            
-            # Corps du chandelier
-            height = abs(close - open_price)
-            bottom = min(close, open_price)
-            ax.bar(date, height, bottom=bottom, width=0.6, color=color, alpha=0.8)
-            
-            # Mèches
-            ax.plot([date, date], [low, high], color=color, linewidth=1)
+        low, high = values.min(), values.max()
+        span = high - low if high > low else 1.0
+        top, height = slot['y'] + 3, 14
+        xs = self.SPARK_X + np.linspace(0, self.SPARK_WIDTH, len(values))
+        ys = top + height - (values - low) / span * height
+        coords = np.column_stack((xs, ys)).ravel().tolist()
         
-        # Format des dates
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%m/%d'))
-        ax.xaxis.set_major_locator(mdates.DayLocator(interval=5))
+        self.canvas.coords(slot['spark'], *coords)
+        self.canvas.itemconfigure(slot['spark'], state='normal',
+                                  fill=self.colors['success'] if positive else self.colors['error'])
     
-    def _plot_main_indicators(self, ax, data, indicators):
-        """Affiche les indicateurs sur le graphique principal"""
-        if 'SMA_20' in indicators and 'SMA_20' in data.columns:
-            ax.plot(data.index, data['SMA_20'], label='SMA 20', color='#ffaa00', linewidth=1.5)
+    def refresh(self, force: bool = False):
+        """Redessine les lignes visibles en ne modifiant que les cellules changées"""
+        generation = self.model.generation
+        order_state = (generation, self.sort_key, self.sort_descending)
+        if order_state != self._order_state:
+            self.order = self.model.sorted_rows(self.sort_key, self.sort_descending)
+            self._order_state = order_state
         
-        if 'SMA_50' in indicators and 'SMA_50' in data.columns:
-            ax.plot(data.index, data['SMA_50'], label='SMA 50', color='#ff6600', linewidth=1.5)
+        total = len(self.order)
+        visible = self._visible_count()
+        self.top = max(0, min(self.top, total - visible + 1))
+        state = (order_state, self.top, visible, self.selected)
+        if not force and state == self._rendered_state:
+            return
+        self._rendered_state = state
         
-        if 'BB_upper' in indicators and all(col in data.columns for col in ['BB_upper', 'BB_lower', 'BB_middle']):
-            ax.plot(data.index, data['BB_upper'], color='#888888', alpha=0.7, linewidth=1)
-            ax.plot(data.index, data['BB_lower'], color='#888888', alpha=0.7, linewidth=1)
-            ax.fill_between(data.index, data['BB_upper'], data['BB_lower'], 
-                          alpha=0.1, color='gray', label='Bollinger Bands')
+        self._ensure_slots(visible)
+        width = self.canvas.winfo_width()
+        rows = self.order[self.top:self.top + visible]
+        cells = self.model.cells(rows)
         
-        ax.legend(loc='upper left')
+        for position, slot in enumerate(self.slots):
+            if slot['width'] != width:
+                self._layout_slot(slot, width)
+            
+            if position < len(cells):
+                symbol, name, price, change, positive, day_range, row, version = cells[position]
+                change_fill = (self.colors['text_secondary'] if positive is None else
+                               self.colors['success'] if positive else self.colors['error'])
+                texts = (name, price, change, day_range)
+                fills = (self.colors['text_primary'], self.colors['text_primary'], change_fill,
+                         self.colors['text_secondary'])
+                bg_fill = self.colors['accent'] if symbol == self.selected else self.colors['bg_tertiary']
+                spark_key = (row, version)
+            else:
+                texts = ('', '', '', '')
+                fills = slot['fills']
+                bg_fill = self.colors['bg_tertiary']
+                spark_key = None
+            
+            if bg_fill != slot['bg_fill']:
+                self.canvas.itemconfigure(slot['bg'], fill=bg_fill)
+                slot['bg_fill'] = bg_fill
+            if spark_key != slot['spark_key']:
+                if spark_key is None:
+                    self.canvas.itemconfigure(slot['spark'], state='hidden')
+                else:
+                    self._draw_sparkline(slot, row, positive)
+                slot['spark_key'] = spark_key
+            for column in range(4):
+                if texts[column] != slot['texts'][column] or fills[column] != slot['fills'][column]:
+                    self.canvas.itemconfigure(slot['cells'][column], text=texts[column], fill=fills[column])
+                    slot['texts'][column] = texts[column]
+                    slot['fills'][column] = fills[column]
+        
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + visible - 1) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
     
-    def _plot_rsi(self, ax, data):
-        """Affiche le RSI"""
-        if 'RSI' in data.columns:
-            ax.plot(data.index, data['RSI'], color='#00aaff', linewidth=2)
-            ax.axhline(y=70, color='red', linestyle='--', alpha=0.7)
-            ax.axhline(y=30, color='green', linestyle='--', alpha=0.7)
-            ax.fill_between(data.index, 30, 70, alpha=0.1, color='gray')
-            ax.set_ylabel('RSI', color='white')
-            ax.set_ylim(0, 100)
-            ax.grid(True, alpha=0.3)
-            ax.set_facecolor('#0d1117')
+    def yview(self, *args):
+        """Commande de la scrollbar (moveto / scroll)"""
+        if args[0] == 'moveto':
+            self.top = int(float(args[1]) * len(self.order))
+            self.refresh()
+        elif args[0] == 'scroll':
+            self.scroll(int(args[1]), args[2])
     
-    def _plot_macd(self, ax, data):
-        """Affiche le MACD"""
-        if all(col in data.columns for col in ['MACD', 'MACD_signal', 'MACD_histogram']):
-            ax.plot(data.index, data['MACD'], color='#00aaff', label='MACD', linewidth=1.5)
-            ax.plot(data.index, data['MACD_signal'], color='#ff6600', label='Signal', linewidth=1.5)
-            ax.bar(data.index, data['MACD_histogram'], color='gray', alpha=0.6, 
-                  width=0.8, label='Histogram')
-            ax.axhline(y=0, color='white', linestyle='-', alpha=0.5)
-            ax.legend(loc='upper left')
-            ax.set_ylabel('MACD', color='white')
-            ax.grid(True, alpha=0.3)
-            ax.set_facecolor('#0d1117')
+    def scroll(self, amount: int, what: str = 'units'):
+        """Fait défiler la table d'un nombre de lignes ou de pages"""
+        step = self._visible_count() - 1 if what == 'pages' else 1
+        self.top = max(0, self.top + amount * step)
+        self.refresh()
     
-    def get_widget(self):
-        """Retourne le widget canvas"""
-        return self.canvas.get_tk_widget()
+    def sort_by(self, key: str):
+        """Trie par colonne ; un second clic inverse l'ordre"""
+        if key == self.sort_key:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_key = key
+            self.sort_descending = key != 'symbol'
+        self._update_headers()
+        self.refresh()
+    
+    def _update_headers(self):
+        for key, text in self.COLUMNS:
+            arrow = (' ▼' if self.sort_descending else ' ▲') if key == self.sort_key else ''
+            self.header_labels[key].config(text=text + arrow)
+    
+    def _symbol_at(self, y: int) -> Optional[str]:
+        position = self.top + int(self.canvas.canvasy(y)) // self.ROW_HEIGHT
+        if 0 <= position < len(self.order):
+            return self.model.symbols[self.order[position]]
+        return None
+    
+    def _on_click(self, event):
+        self.selected = self._symbol_at(event.y)
+        self.refresh()
+    
+    def _on_double_click(self, event):
+        symbol = self._symbol_at(event.y)
+        if symbol and self.on_activate:
+            self.selected = symbol
+            self.on_activate(symbol)
+    
+    def selected_symbol(self) -> Optional[str]:
+        """Symbole actuellement sélectionné"""
+        return self.selected
 
 class BlackCubeApp:
     """Application principale BlackCube"""
     
-    def __init__(self):
+    def __init__(self, api_url: Optional[str] = None, use_collector: bool = True):
         self.root = None
-        self.data_provider = DataProvider()
+        self.data_provider = DataProvider(api_url)
+        # Séries des graphiques calculées dans un processus collecteur (mémoire partagée)
+        self.series_source = CollectorClient(api_url, fallback=self.data_provider)
+        self.use_collector = use_collector
         self.current_symbol = "BTCUSDT"
         self.chart_widget = None
         self.watchlist = ["BTCUSDT", "ETHUSDT", "ADAUSDT", "SOLUSDT", "AVAXUSDT", "DOGEUSDT"]
+        self.watchlist_model = WatchlistModel(self.watchlist)
+        self._watchlist_lock = threading.Lock()
+        self.watchlist_interval = 5  # secondes
+        self.thumbnail_service = None  # créé à la première ouverture de la galerie
+        self.chart_grid = None  # créée au premier passage en vue grille
+        self.grid_interval = '1h'
+        self.alert_engine = AlertEngine()
+        self.paper_trader = PaperTrader(journal_path='paper_trades.jsonl', price_source=self._last_price)
+        # Les alertes déclenchées passent par une file relevée par le thread Tk
+        self._alert_events = queue.Queue()
+        self.alert_engine.add_handler(self._alert_events.put)
+        if os.environ.get('BLACKCUBE_ALERT_WEBHOOK'):
+            self.alert_engine.add_handler(webhook_alert_handler(os.environ['BLACKCUBE_ALERT_WEBHOOK']))
         self.auto_refresh = tk.BooleanVar(value=True)
         self.refresh_interval = 60  # secondes
         self.setup_styles()
@@ -415,6 +3075,8 @@ class BlackCubeApp:
     
     def start_app(self):
         """Démarre l'application après le splash screen"""
+        if self.use_collector:
+            self.series_source.start()  # le collecteur démarre pendant le splash screen
         SplashScreen(self.create_main_window)
     
     def create_main_window(self):
@@ -436,11 +3098,21 @@ class BlackCubeApp:
         
         # Démarrer la mise à jour automatique
         self.start_auto_refresh()
+        self.start_watchlist_refresh()
+        self.start_alert_polling()
         
         # Charger le premier graphique
         self.load_chart(self.current_symbol)
         
         self.root.mainloop()
+        
+        if self.thumbnail_service:
+            self.thumbnail_service.shutdown()
+        if self.chart_grid:
+            self.chart_grid.shutdown()
+        self.paper_trader.close()
+        self.alert_engine.close()
+        self.series_source.shutdown()
     
     def create_menu(self):
         """Crée la barre de menu"""
@@ -466,10 +3138,28 @@ class BlackCubeApp:
         for name, symbol in crypto_symbols:
             crypto_menu.add_command(label=name, command=lambda s=symbol: self.load_chart(s))
         
+        # Menu Métaux (source spot des métaux)
+        metals_menu = tk.Menu(menubar, tearoff=0, bg=self.colors['bg_secondary'], fg=self.colors['text_primary'])
+        metal_symbols = [
+            ("Or (XAU)", "XAUUSD"),
+            ("Argent (XAG)", "XAGUSD"),
+            ("Platine (XPT)", "XPTUSD"),
+            ("Palladium (XPD)", "XPDUSD")
+        ]
+        
+        for name, symbol in metal_symbols:
+            metals_menu.add_command(label=name, command=lambda s=symbol: self.load_chart(s))
+        
         # Menu Outils
         tools_menu = tk.Menu(menubar, tearoff=0, bg=self.colors['bg_secondary'], fg=self.colors['text_primary'])
         tools_menu.add_checkbutton(label="Actualisation auto", variable=self.auto_refresh)
         tools_menu.add_command(label="Paramètres", command=self.show_settings)
+        tools_menu.add_command(label="Galerie de miniatures", command=self.show_gallery)
+        tools_menu.add_command(label="Carnet d'ordres", command=self.show_order_book)
+        tools_menu.add_command(label="Alertes", command=self.show_alerts)
+        tools_menu.add_command(label="Trading papier", command=self.show_paper_trading)
+        tools_menu.add_command(label="Analyse de portefeuille", command=self.show_portfolio_analytics)
+        tools_menu.add_command(label="Métriques (debug)", command=self.show_metrics_panel)
         
         # Menu Aide
         help_menu = tk.Menu(menubar, tearoff=0, bg=self.colors['bg_secondary'], fg=self.colors['text_primary'])
@@ -477,6 +3167,7 @@ class BlackCubeApp:
         
         menubar.add_cascade(label="Fichier", menu=file_menu)
         menubar.add_cascade(label="Cryptos", menu=crypto_menu)
+        menubar.add_cascade(label="Métaux", menu=metals_menu)
         menubar.add_cascade(label="Outils", menu=tools_menu)
         menubar.add_cascade(label="Aide", menu=help_menu)
         
@@ -504,6 +3195,16 @@ class BlackCubeApp:
                                bg=self.colors['bg_tertiary'], fg=self.colors['text_primary'])
         refresh_btn.pack(side='left', padx=5)
         
+        # Disposition : un graphique ou une grille
+        tk.Label(toolbar, text="Vue:", bg=self.colors['bg_secondary'], 
+                fg=self.colors['text_primary']).pack(side='left', padx=(20, 5))
+        
+        self.layout_var = tk.StringVar(value='1x1')
+        layout_combo = ttk.Combobox(toolbar, textvariable=self.layout_var,
+                                   values=['1x1', '2x2', '3x3'], state='readonly', width=5)
+        layout_combo.pack(side='left', padx=5)
+        layout_combo.bind('<<ComboboxSelected>>', self.on_layout_change)
+        
         # Indicateurs
         tk.Label(toolbar, text="Indicateurs:", bg=self.colors['bg_secondary'], 
                 fg=self.colors['text_primary']).pack(side='left', padx=(20, 5))
@@ -535,7 +3236,7 @@ class BlackCubeApp:
     def create_main_layout(self):
         """Crée la disposition principale"""
         # Panel de gauche - Watchlist
-        left_panel = tk.Frame(self.root, bg=self.colors['bg_secondary'], width=250)
+        left_panel = tk.Frame(self.root, bg=self.colors['bg_secondary'], width=300)
         left_panel.grid(row=1, column=0, sticky='ns', padx=(5, 2), pady=5)
         left_panel.grid_propagate(False)
         
@@ -544,6 +3245,7 @@ class BlackCubeApp:
         # Panel central - Graphique
         chart_frame = tk.Frame(self.root, bg=self.colors['bg_primary'])
         chart_frame.grid(row=1, column=1, sticky='nsew', padx=2, pady=5)
+        self.chart_frame = chart_frame
         
         self.chart_widget = ChartWidget(chart_frame)
         self.chart_widget.get_widget().pack(fill='both', expand=True)
@@ -565,19 +3267,9 @@ class BlackCubeApp:
         list_frame = tk.Frame(parent, bg=self.colors['bg_secondary'])
         list_frame.pack(fill='both', expand=True, padx=10, pady=5)
         
-        # Scrollbar
-        scrollbar = tk.Scrollbar(list_frame)
-        scrollbar.pack(side='right', fill='y')
-        
-        # Listbox
-        self.watchlist_box = tk.Listbox(list_frame, yscrollcommand=scrollbar.set,
-                                       bg=self.colors['bg_tertiary'], fg=self.colors['text_primary'],
-                                       selectbackground=self.colors['accent'],
-                                       font=('Courier', 10))
-        self.watchlist_box.pack(side='left', fill='both', expand=True)
-        self.watchlist_box.bind('<Double-1>', self.on_watchlist_select)
-        
-        scrollbar.config(command=self.watchlist_box.yview)
+        # Table virtualisée alimentée par le modèle en colonnes
+        self.watchlist_table = WatchlistTable(list_frame, self.watchlist_model, self.colors,
+                                              on_activate=self.on_watchlist_select)
         
         # Boutons de gestion
         btn_frame = tk.Frame(parent, bg=self.colors['bg_secondary'])
@@ -652,13 +3344,49 @@ class BlackCubeApp:
             self.current_symbol = new_symbol
             self.load_chart(new_symbol)
     
-    def on_watchlist_select(self, event):
+    def on_layout_change(self, event=None):
+        """Bascule entre le graphique unique et une grille de graphiques"""
+        rows, cols = (int(n) for n in self.layout_var.get().split('x'))
+        
+        if rows * cols == 1:
+            if self.chart_grid:
+                self.chart_grid.stop()
+                self.chart_grid.get_widget().pack_forget()
+            self.chart_widget.get_widget().pack(fill='both', expand=True)
+            self.load_chart(self.current_symbol)
+            return
+        
+        # Symbole courant en premier, puis le reste de la watchlist ; s'il y a plus de cellules
+        # que de symboles, ils reviennent sur l'intervalle suivant (jamais deux cellules identiques)
+        symbols = [self.current_symbol] + [s for s in self.watchlist if s != self.current_symbol]
+        intervals = list(ChartGrid.INTERVALS)
+        first = intervals.index(self.grid_interval) if self.grid_interval in intervals else 0
+        cells = [(symbols[i % len(symbols)], intervals[(first + i // len(symbols)) % len(intervals)])
+                 for i in range(min(rows * cols, len(symbols) * len(intervals)))]
+        
+        if self.chart_grid is None:
+            self.chart_grid = ChartGrid(self.chart_frame, self.series_source,
+                                        refresh_interval=self.watchlist_interval * 2,
+                                        on_select=self.on_grid_select,
+                                        should_refresh=self.auto_refresh.get,
+                                        on_data=lambda symbol, interval, data:
+                                            self.paper_trader.on_klines(symbol, data))
+        self.chart_grid.stop()
+        self.chart_grid.set_layout(rows, cols, cells)
+        self.chart_widget.get_widget().pack_forget()
+        self.chart_grid.get_widget().pack(fill='both', expand=True)
+        self.chart_grid.start()
+    
+    def on_grid_select(self, symbol):
+        """Double-clic sur une cellule : retour au graphique détaillé du symbole"""
+        self.current_symbol = symbol
+        self.symbol_var.set(symbol)
+        self.layout_var.set('1x1')
+        self.on_layout_change()
+    
+    def on_watchlist_select(self, symbol):
         """Gestionnaire de sélection dans la watchlist"""
-        selection = self.watchlist_box.curselection()
-        if selection:
-            item_text = self.watchlist_box.get(selection[0])
-            # Extraire le symbole (format: "BTC $45,123 +2.34%")
-            symbol = item_text.split()[0] + "USDT"
+        if symbol:
             self.current_symbol = symbol
             self.symbol_var.set(symbol)
             self.load_chart(symbol)
@@ -671,7 +3399,7 @@ class BlackCubeApp:
                 self.root.update_idletasks()
                 
                 # Récupération des données
-                data = self.data_provider.get_crypto_data(symbol)
+                data = self.series_source.get_crypto_data(symbol)
                 if data is None:
                     raise Exception("Impossible de récupérer les données")
                 
@@ -691,6 +3419,8 @@ class BlackCubeApp:
                 
                 # Mise à jour des informations
                 self.update_info_panel(symbol, data)
+                self._update_indicator_alerts(symbol, data)
+                self.paper_trader.on_klines(symbol, data)
                 
                 self.status_text.config(text=f"{symbol} chargé avec succès")
                 self.last_update_label.config(text=f"Mis à jour: {datetime.now().strftime('%H:%M:%S')}")
@@ -739,35 +3469,81 @@ class BlackCubeApp:
     
     def update_watchlist(self):
         """Met à jour la watchlist avec les prix actuels"""
+        # Une seule actualisation à la fois : on saute le tour si la précédente n'est pas finie
+        if not self._watchlist_lock.acquire(blocking=False):
+            metrics.increment('watchlist_refresh_skipped')
+            return
+        
         def update_prices():
+            # Le thread ne touche pas Tk : il écrit dans le modèle, la table se redessine seule
+            start = time.perf_counter()
             try:
-                self.watchlist_box.delete(0, tk.END)
+                symbols = list(self.watchlist)
+                # Les symboles ayant des ordres papier ouverts ou des alertes de prix sont cotés même hors watchlist
+                extra = [symbol for symbol in dict.fromkeys(self.paper_trader.pending_symbols()
+                                                            + self.alert_engine.ticker_symbols())
+                         if symbol not in symbols]
+                tickers = self.data_provider.get_tickers(symbols + extra)
+                missing = [symbol for symbol in symbols if symbol not in tickers]
+                changed = self.watchlist_model.update_from_tickers(tickers, missing)
+                metrics.increment('watchlist_rows_changed', changed)
+                metrics.set_gauge('watchlist_memory_bytes', self.watchlist_model.memory_bytes())
+                self.alert_engine.update_tickers(tickers)
+                self.paper_trader.on_tickers(tickers)
+                # Indicateurs des symboles sous alerte, même s'ils ne sont pas affichés (séries en cache)
+                for symbol in self.alert_engine.indicator_symbols():
+                    data = self.series_source.get_crypto_data(symbol)
+                    if data is not None:
+                        self._update_indicator_alerts(symbol, data)
                 
-                for symbol in self.watchlist:
-                    try:
-                        asset_data = self.data_provider.get_current_price(symbol)
-                        if asset_data:
-                            price_str = f"${asset_data.current_price:,.2f}"
-                            change_str = f"{asset_data.change_24h:+.2f}%"
-                            item_text = f"{asset_data.name:<6} {price_str:>10} {change_str:>8}"
-                            self.watchlist_box.insert(tk.END, item_text)
-                        else:
-                            self.watchlist_box.insert(tk.END, f"{symbol}: Erreur")
-                    except Exception as e:
-                        logger.error(f"Erreur mise à jour {symbol}: {e}")
-                        self.watchlist_box.insert(tk.END, f"{symbol}: N/A")
-                        
             except Exception as e:
                 logger.error(f"Erreur mise à jour watchlist: {e}")
+            finally:
+                metrics.observe('watchlist_refresh', time.perf_counter() - start)
+                self._watchlist_lock.release()
         
         threading.Thread(target=update_prices, daemon=True).start()
     
+    def start_watchlist_refresh(self):
+        """Actualise la watchlist à son propre rythme (indépendamment du graphique)"""
+        def watchlist_update():
+            if self.auto_refresh.get():
+                self.update_watchlist()
+            self.root.after(int(self.watchlist_interval * 1000), watchlist_update)
+        
+        self.root.after(int(self.watchlist_interval * 1000), watchlist_update)
+    
+    def _update_indicator_alerts(self, symbol: str, data: pd.DataFrame):
+        """Transmet les dernières valeurs RSI/MACD d'une série au moteur d'alertes"""
+        self.alert_engine.update(symbol, {column: float(data[column].iloc[-1])
+                                          for column in ('RSI', 'MACD') if column in data.columns})
+    
+    def _last_price(self, symbol: str) -> Optional[float]:
+        """Dernier prix connu du modèle de la watchlist (sans requête : appelé depuis le thread Tk)"""
+        row = self.watchlist_model.index.get(symbol)
+        if row is not None and not np.isnan(self.watchlist_model.prices[row]):
+            return float(self.watchlist_model.prices[row])
+        return None
+    
+    def start_alert_polling(self):
+        """Affiche les alertes déclenchées dans la barre de statut"""
+        def poll_alerts():
+            while True:
+                try:
+                    event = self._alert_events.get_nowait()
+                except queue.Empty:
+                    break
+                self.status_text.config(text=event.message())
+                self.root.bell()
+            self.root.after(500, poll_alerts)
+        
+        self.root.after(500, poll_alerts)
+    
     def start_auto_refresh(self):
         """Démarre la mise à jour automatique"""
         def auto_update():
-            if self.auto_refresh.get():
-                self.update_watchlist()
-                # Recharger le graphique actuel si nécessaire
+            if self.auto_refresh.get() and self.layout_var.get() == '1x1':
+                # Recharger le graphique actuel si nécessaire (la vue grille a sa propre boucle)
                 if hasattr(self, 'current_symbol'):
                     # Ne recharge que si l'utilisateur n'interagit pas
                     self.load_chart(self.current_symbol)
@@ -807,6 +3583,7 @@ class BlackCubeApp:
                 test_data = self.data_provider.get_current_price(symbol)
                 if test_data:
                     self.watchlist.append(symbol)
+                    self.watchlist_model.add(symbol)
                     self.update_watchlist()
                     dialog.destroy()
                     messagebox.showinfo("Succès", f"{symbol} ajouté à la watchlist")
@@ -857,15 +3634,15 @@ class BlackCubeApp:
         """Affiche les paramètres"""
         settings_window = tk.Toplevel(self.root)
         settings_window.title("Paramètres")
-        settings_window.geometry("400x300")
+        settings_window.geometry("400x380")
         settings_window.configure(bg=self.colors['bg_primary'])
         settings_window.transient(self.root)
         
         # Centrer la fenêtre
         settings_window.update_idletasks()
         x = (settings_window.winfo_screenwidth() - 400) // 2
-        y = (settings_window.winfo_screenheight() - 300) // 2
-        settings_window.geometry(f"400x300+{x}+{y}")
+        y = (settings_window.winfo_screenheight() - 380) // 2
+        settings_window.geometry(f"400x380+{x}+{y}")
         
         # Titre
         title = tk.Label(settings_window, text="⚙️ PARAMÈTRES", font=('Arial', 16, 'bold'),
@@ -886,12 +3663,25 @@ class BlackCubeApp:
                                  fg=self.colors['text_primary'], highlightthickness=0)
         interval_scale.pack(fill='x', pady=5)
         
+        # Intervalle de la watchlist
+        tk.Label(params_frame, text="Actualisation watchlist (secondes):",
+                bg=self.colors['bg_primary'], fg=self.colors['text_primary']).pack(anchor='w', pady=5)
+        
+        watchlist_var = tk.IntVar(value=self.watchlist_interval)
+        watchlist_scale = tk.Scale(params_frame, from_=1, to=60, orient='horizontal',
+                                  variable=watchlist_var, bg=self.colors['bg_secondary'],
+                                  fg=self.colors['text_primary'], highlightthickness=0)
+        watchlist_scale.pack(fill='x', pady=5)
+        
         # Boutons
         btn_frame = tk.Frame(settings_window, bg=self.colors['bg_primary'])
         btn_frame.pack(pady=20)
         
         def save_settings():
             self.refresh_interval = interval_var.get()
+            self.watchlist_interval = watchlist_var.get()
+            if self.chart_grid is not None:
+                self.chart_grid.refresh_interval = self.watchlist_interval * 2
             messagebox.showinfo("Paramètres", "Paramètres sauvegardés")
             settings_window.destroy()
         
@@ -901,6 +3691,479 @@ class BlackCubeApp:
                  bg=self.colors['bg_tertiary'], fg=self.colors['text_primary'], 
                  font=('Arial', 10)).pack(side='left', padx=5)
     
+    def show_gallery(self, columns: int = 4, limit: int = 100):
+        """Affiche les miniatures des symboles de la watchlist (rendues hors du thread Tk)"""
+        if self.thumbnail_service is None:
+            self.thumbnail_service = ThumbnailService(self.data_provider)
+        
+        gallery_window = tk.Toplevel(self.root)
+        gallery_window.title("Galerie - Watchlist")
+        gallery_window.geometry("1080x720")
+        gallery_window.configure(bg=self.colors['bg_primary'])
+        
+        top_bar = tk.Frame(gallery_window, bg=self.colors['bg_primary'])
+        top_bar.pack(fill='x', padx=10, pady=5)
+        tk.Label(top_bar, text="🖼 GALERIE", font=('Arial', 12, 'bold'),
+                bg=self.colors['bg_primary'], fg=self.colors['accent']).pack(side='left')
+        
+        # Zone défilante : canvas + frame intérieure
+        canvas = tk.Canvas(gallery_window, bg=self.colors['bg_primary'], highlightthickness=0)
+        scrollbar = tk.Scrollbar(gallery_window, command=canvas.yview)
+        canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side='right', fill='y')
+        canvas.pack(side='left', fill='both', expand=True)
+        
+        grid_frame = tk.Frame(canvas, bg=self.colors['bg_primary'])
+        canvas.create_window((0, 0), window=grid_frame, anchor='nw')
+        grid_frame.bind('<Configure>', lambda e: canvas.configure(scrollregion=canvas.bbox('all')))
+        canvas.bind('<Button-4>', lambda e: canvas.yview_scroll(-1, 'units'))
+        canvas.bind('<Button-5>', lambda e: canvas.yview_scroll(1, 'units'))
+        canvas.bind('<MouseWheel>', lambda e: canvas.yview_scroll(-1 if e.delta > 0 else 1, 'units'))
+        
+        symbols = list(self.watchlist)[:limit]
+        tiles = {}
+        images = {}  # références aux PhotoImage (sinon détruites par le ramasse-miettes)
+        results = queue.Queue()  # propre à cette galerie : deux fenêtres ne se volent pas leurs miniatures
+        
+        def open_chart(symbol):
+            self.current_symbol = symbol
+            self.symbol_var.set(symbol)
+            self.load_chart(symbol)
+        
+        for position, symbol in enumerate(symbols):
+            tile = tk.Label(grid_frame, text=f"{symbol}\n...", width=30, height=9, cursor='hand2',
+                            bg=self.colors['bg_secondary'], fg=self.colors['text_secondary'])
+            tile.grid(row=position // columns, column=position % columns, padx=4, pady=4)
+            tile.bind('<Button-1>', lambda e, s=symbol: open_chart(s))
+            tiles[symbol] = tile
+        
+        def poll_results():
+            if not gallery_window.winfo_exists():
+                return
+            for symbol, image in self.thumbnail_service.poll(results):
+                tile = tiles.get(symbol)
+                if tile is None:
+                    continue
+                if image is None:
+                    tile.config(text=f"{symbol}\nErreur", fg=self.colors['error'])
+                    continue
+                photo = tk.PhotoImage(data=base64.b64encode(image).decode('ascii'))
+                images[symbol] = photo
+                tile.config(image=photo, text='', width=photo.width(), height=photo.height())
+            gallery_window.after(100, poll_results)
+        
+        def refresh_gallery():
+            self.thumbnail_service.request(symbols, results=results)
+        
+        tk.Button(top_bar, text="🔄 Actualiser", command=refresh_gallery,
+                 bg=self.colors['bg_tertiary'], fg=self.colors['text_primary']).pack(side='right')
+        
+        refresh_gallery()
+        poll_results()
+    
+    def show_order_book(self, levels: int = 100):
+        """Affiche le carnet d'ordres local du symbole courant (profondeur cumulée)"""
+        symbol = self.current_symbol
+        feed = self.data_provider.open_order_book(symbol)
+        
+        book_window = tk.Toplevel(self.root)
+        book_window.title(f"Carnet d'ordres - {symbol}")
+        book_window.geometry("720x480")
+        book_window.configure(bg=self.colors['bg_primary'])
+        
+        header = tk.Frame(book_window, bg=self.colors['bg_primary'])
+        header.pack(fill='x', padx=10, pady=5)
+        tk.Label(header, text=f"📚 {symbol}", font=('Arial', 12, 'bold'),
+                bg=self.colors['bg_primary'], fg=self.colors['accent']).pack(side='left')
+        summary_label = tk.Label(header, text="Synchronisation...", font=('Courier', 10),
+                                 bg=self.colors['bg_primary'], fg=self.colors['text_primary'])
+        summary_label.pack(side='right')
+        
+        canvas = tk.Canvas(book_window, bg=self.colors['bg_secondary'], highlightthickness=0)
+        canvas.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+        bid_line = canvas.create_line(0, 0, 0, 0, fill=self.colors['success'], width=2)
+        ask_line = canvas.create_line(0, 0, 0, 0, fill=self.colors['error'], width=2)
+        mid_text = canvas.create_text(0, 0, text='', fill=self.colors['text_secondary'], anchor='n')
+        
+        def depth_points(prices, depth, low, high, max_depth, width, height):
+            x = (prices - low) / (high - low) * width
+            y = height - depth / max_depth * (height - 20)
+            # Courbe en escalier : chaque niveau ajoute sa quantité
+            steps = np.empty((2 * len(x), 2))
+            steps[0::2, 0], steps[1::2, 0] = x, x
+            steps[0::2, 1] = np.concatenate(([height], y[:-1]))
+            steps[1::2, 1] = y
+            return steps.ravel().tolist()
+        
+        def redraw():
+            if not book_window.winfo_exists():
+                return
+            book = feed.book
+            bid, ask = book.best_bid(), book.best_ask()
+            if book.live and bid and ask:
+                bid_depth, ask_depth = book.depth_within(1.0)
+                summary_label.config(
+                    text=f"Achat {bid[0]:,.8g}  Vente {ask[0]:,.8g}  Écart {ask[0] - bid[0]:.8g}  "
+                         f"±1%: {bid_depth:,.2f} / {ask_depth:,.2f}  Resync: {feed.resyncs}")
+                depth = book.cumulative_depth(levels)
+                width, height = canvas.winfo_width(), canvas.winfo_height()
+                low, high = depth['bid_prices'][-1], depth['ask_prices'][-1]
+                max_depth = max(depth['bid_depth'][-1], depth['ask_depth'][-1])
+                if width > 1 and high > low and max_depth > 0:
+                    canvas.coords(bid_line, *depth_points(depth['bid_prices'], depth['bid_depth'],
+                                                          low, high, max_depth, width, height))
+                    canvas.coords(ask_line, *depth_points(depth['ask_prices'], depth['ask_depth'],
+                                                          low, high, max_depth, width, height))
+                    mid = (bid[0] + ask[0]) / 2
+                    canvas.coords(mid_text, (mid - low) / (high - low) * width, 5)
+                    canvas.itemconfig(mid_text, text=f"{mid:,.8g}")
+            elif feed.error:
+                summary_label.config(text=f"Erreur: {feed.error}", fg=self.colors['error'])
+            book_window.after(200, redraw)
+        
+        def close():
+            feed.stop()
+            book_window.destroy()
+        
+        book_window.protocol("WM_DELETE_WINDOW", close)
+        redraw()
+    
+    def show_alerts(self):
+        """Gestion des règles d'alerte (prix, variation 24h, indicateurs)"""
+        alerts_window = tk.Toplevel(self.root)
+        alerts_window.title("Alertes")
+        alerts_window.geometry("520x420")
+        alerts_window.configure(bg=self.colors['bg_primary'])
+        alerts_window.transient(self.root)
+        
+        title = tk.Label(alerts_window, text="🔔 ALERTES", font=('Arial', 14, 'bold'),
+                        bg=self.colors['bg_primary'], fg=self.colors['accent'])
+        title.pack(pady=10)
+        
+        form = tk.Frame(alerts_window, bg=self.colors['bg_primary'])
+        form.pack(fill='x', padx=10)
+        
+        symbol_var = tk.StringVar(value=self.current_symbol)
+        metric_var = tk.StringVar(value='price')
+        condition_var = tk.StringVar(value='above')
+        threshold_var = tk.StringVar()
+        
+        ttk.Combobox(form, textvariable=symbol_var, values=self.watchlist, width=12).pack(side='left', padx=2)
+        ttk.Combobox(form, textvariable=metric_var, values=['price', 'change', 'RSI', 'MACD'],
+                     state='readonly', width=7).pack(side='left', padx=2)
+        ttk.Combobox(form, textvariable=condition_var, values=list(AlertEngine.CONDITIONS),
+                     state='readonly', width=7).pack(side='left', padx=2)
+        tk.Entry(form, textvariable=threshold_var, width=12).pack(side='left', padx=2)
+        
+        rules_list = tk.Listbox(alerts_window, font=('Courier', 10),
+                                bg=self.colors['bg_tertiary'], fg=self.colors['text_primary'],
+                                selectbackground=self.colors['accent'])
+        rules_list.pack(fill='both', expand=True, padx=10, pady=10)
+        shown_rules = []
+        
+        def refresh_rules():
+            shown_rules[:] = self.alert_engine.rules()
+            rules_list.delete(0, tk.END)
+            for rule in shown_rules:
+                rules_list.insert(tk.END, rule.describe() + ('' if rule.once else '  (répétée)'))
+        
+        def add_rule():
+            try:
+                threshold = float(threshold_var.get().replace(',', '.'))
+            except ValueError:
+                messagebox.showerror("Erreur", "Seuil invalide", parent=alerts_window)
+                return
+            self.alert_engine.add_rule(symbol_var.get().upper().strip(), metric_var.get(),
+                                       condition_var.get(), threshold)
+            threshold_var.set('')
+            refresh_rules()
+        
+        def remove_rule():
+            for position in rules_list.curselection():
+                self.alert_engine.remove_rule(shown_rules[position].rule_id)
+            refresh_rules()
+        
+        tk.Button(form, text="Ajouter", command=add_rule,
+                 bg=self.colors['accent'], fg='white').pack(side='left', padx=5)
+        
+        btn_frame = tk.Frame(alerts_window, bg=self.colors['bg_primary'])
+        btn_frame.pack(pady=(0, 10))
+        tk.Button(btn_frame, text="Supprimer", command=remove_rule,
+                 bg=self.colors['bg_tertiary'], fg=self.colors['text_primary']).pack(side='left', padx=5)
+        tk.Button(btn_frame, text="Actualiser", command=refresh_rules,
+                 bg=self.colors['bg_tertiary'], fg=self.colors['text_primary']).pack(side='left', padx=5)
+        tk.Button(btn_frame, text="Fermer", command=alerts_window.destroy,
+                 bg=self.colors['accent'], fg='white').pack(side='left', padx=5)
+        
+        refresh_rules()
+    
+    def show_paper_trading(self):
+        """Trading papier : ordres simulés exécutés sur les prix de la watchlist"""
+        trader = self.paper_trader
+        trading_window = tk.Toplevel(self.root)
+        trading_window.title("Trading papier")
+        trading_window.geometry("760x520")
+        trading_window.configure(bg=self.colors['bg_primary'])
+        
+        title = tk.Label(trading_window, text="📝 TRADING PAPIER", font=('Arial', 14, 'bold'),
+                        bg=self.colors['bg_primary'], fg=self.colors['accent'])
+        title.pack(pady=10)
+        
+        form = tk.Frame(trading_window, bg=self.colors['bg_primary'])
+        form.pack(fill='x', padx=10)
+        
+        symbol_var = tk.StringVar(value=self.current_symbol)
+        side_var = tk.StringVar(value='buy')
+        type_var = tk.StringVar(value='market')
+        quantity_var = tk.StringVar(value='1')
+        price_var = tk.StringVar()
+        
+        ttk.Combobox(form, textvariable=symbol_var, values=self.watchlist, width=12).pack(side='left', padx=2)
+        ttk.Combobox(form, textvariable=side_var, values=['buy', 'sell'],
+                     state='readonly', width=5).pack(side='left', padx=2)
+        ttk.Combobox(form, textvariable=type_var, values=list(PaperTrader.ORDER_TYPES),
+                     state='readonly', width=7).pack(side='left', padx=2)
+        tk.Label(form, text="Qté", bg=self.colors['bg_primary'], fg=self.colors['text_primary']).pack(side='left')
+        tk.Entry(form, textvariable=quantity_var, width=10).pack(side='left', padx=2)
+        tk.Label(form, text="Prix", bg=self.colors['bg_primary'], fg=self.colors['text_primary']).pack(side='left')
+        tk.Entry(form, textvariable=price_var, width=12).pack(side='left', padx=2)
+        
+        summary_label = tk.Label(trading_window, text="", font=('Courier', 10),
+                                 bg=self.colors['bg_primary'], fg=self.colors['text_primary'])
+        summary_label.pack(pady=5)
+        
+        positions_text = tk.Text(trading_window, font=('Courier', 9), height=10,
+                                 bg=self.colors['bg_tertiary'], fg=self.colors['text_primary'])
+        positions_text.pack(fill='both', expand=True, padx=10, pady=5)
+        
+        orders_list = tk.Listbox(trading_window, font=('Courier', 9), height=8,
+                                 bg=self.colors['bg_tertiary'], fg=self.colors['text_primary'],
+                                 selectbackground=self.colors['accent'])
+        orders_list.pack(fill='both', expand=True, padx=10, pady=5)
+        shown_orders = []
+        
+        def refresh_view():
+            if not trading_window.winfo_exists():
+                return
+            equity = trader.equity()
+            pnl = equity - trader.initial_cash
+            summary_label.config(text=f"Liquidités: {trader.cash:,.2f}   Valeur: {equity:,.2f}   "
+                                      f"PnL: {pnl:+,.2f}",
+                                 fg=self.colors['success'] if pnl >= 0 else self.colors['error'])
+            
+            positions_text.config(state='normal')
+            positions_text.delete('1.0', tk.END)
+            positions_text.insert(tk.END, f"{'Symbole':<12} {'Qté':>10} {'Px moyen':>12} {'Dernier':>12} "
+                                          f"{'Latent':>10} {'Réalisé':>10} {'Frais':>8}\n")
+            for position in trader.positions():
+                positions_text.insert(tk.END, f"{position['symbol']:<12} {position['quantity']:>10g} "
+                                              f"{position['average_price']:>12.6g} {position['last_price']:>12.6g} "
+                                              f"{position['unrealized_pnl']:>10.2f} {position['realized_pnl']:>10.2f} "
+                                              f"{position['fees']:>8.2f}\n")
+            positions_text.config(state='disabled')
+            
+            orders = trader.open_orders()
+            if orders != shown_orders:
+                shown_orders[:] = orders
+                orders_list.delete(0, tk.END)
+                for order in orders:
+                    orders_list.insert(tk.END, f"#{order['id']:<5} {order['symbol']:<12} {order['side']:<5} "
+                                               f"{order['type']:<7} {order['quantity']:>10g} @ {order['price']:g}")
+            trading_window.after(1000, refresh_view)
+        
+        def submit_order():
+            try:
+                quantity = float(quantity_var.get().replace(',', '.'))
+                price = float(price_var.get().replace(',', '.')) if price_var.get().strip() else None
+                trader.submit(symbol_var.get().upper().strip(), side_var.get(), quantity, type_var.get(), price)
+            except ValueError as e:
+                messagebox.showerror("Erreur", f"Ordre invalide: {e}", parent=trading_window)
+                return
+            self.update_watchlist()  # cote le symbole : un ordre au marché sans prix connu s'exécute au ticker suivant
+        
+        def cancel_orders():
+            for position in orders_list.curselection():
+                trader.cancel(shown_orders[position]['id'])
+        
+        tk.Button(form, text="Envoyer", command=submit_order,
+                 bg=self.colors['accent'], fg='white').pack(side='left', padx=5)
+        
+        btn_frame = tk.Frame(trading_window, bg=self.colors['bg_primary'])
+        btn_frame.pack(pady=(0, 10))
+        tk.Button(btn_frame, text="Annuler l'ordre", command=cancel_orders,
+                 bg=self.colors['bg_tertiary'], fg=self.colors['text_primary']).pack(side='left', padx=5)
+        tk.Button(btn_frame, text="Fermer", command=trading_window.destroy,
+                 bg=self.colors['accent'], fg='white').pack(side='left', padx=5)
+        
+        refresh_view()
+    
+    def show_portfolio_analytics(self, refresh_seconds: int = 60):
+        """Heatmap des corrélations, bêtas et force relative de la watchlist"""
+        analytics_window = tk.Toplevel(self.root)
+        analytics_window.title("Analyse de portefeuille")
+        analytics_window.geometry("1100x720")
+        analytics_window.configure(bg=self.colors['bg_primary'])
+        
+        top_bar = tk.Frame(analytics_window, bg=self.colors['bg_primary'])
+        top_bar.pack(fill='x', padx=10, pady=5)
+        tk.Label(top_bar, text="🧮 CORRÉLATIONS", font=('Arial', 12, 'bold'),
+                bg=self.colors['bg_primary'], fg=self.colors['accent']).pack(side='left')
+        
+        interval_var = tk.StringVar(value='1h')
+        window_var = tk.StringVar(value='500')
+        benchmark_var = tk.StringVar(value=self.watchlist[0])
+        for label, variable, values, width in (("Intervalle", interval_var, ['1h', '4h', '1d'], 5),
+                                                ("Fenêtre", window_var, ['100', '250', '500', '900'], 5),
+                                                ("Référence", benchmark_var, self.watchlist, 12)):
+            tk.Label(top_bar, text=label, bg=self.colors['bg_primary'],
+                    fg=self.colors['text_primary']).pack(side='left', padx=(15, 2))
+            ttk.Combobox(top_bar, textvariable=variable, values=values, state='readonly',
+                         width=width).pack(side='left')
+        status_label = tk.Label(top_bar, text="", bg=self.colors['bg_primary'], fg=self.colors['text_secondary'])
+        status_label.pack(side='right')
+        
+        body = tk.Frame(analytics_window, bg=self.colors['bg_primary'])
+        body.pack(fill='both', expand=True, padx=10, pady=5)
+        
+        figure = Figure(figsize=(7, 6), dpi=100, facecolor='#0d1117')
+        ax = figure.add_subplot(111)
+        ax.set_facecolor('#0d1117')
+        image = ax.imshow(np.zeros((1, 1)), cmap='RdYlGn', vmin=-1, vmax=1, interpolation='nearest')
+        colorbar = figure.colorbar(image, ax=ax, fraction=0.046, pad=0.04)
+        colorbar.ax.tick_params(colors='white', labelsize=8)
+        canvas = FigureCanvasTkAgg(figure, body)
+        canvas.get_tk_widget().pack(side='left', fill='both', expand=True)
+        
+        ranking_text = tk.Text(body, font=('Courier', 9), width=36,
+                               bg=self.colors['bg_tertiary'], fg=self.colors['text_primary'])
+        ranking_text.pack(side='right', fill='y')
+        
+        # Jours d'historique par bougie, pour couvrir la fenêtre
+        bar_days = {'1h': 1 / 24, '4h': 4 / 24, '1d': 1}
+        state = {'analytics': None, 'shown': None, 'loading': False, 'reload': False}
+        
+        def load(symbols, interval, window):
+            """Thread d'attente : l'alignement et la mise à jour sont faits par le collecteur"""
+            days = int(np.ceil((window + 2) * bar_days[interval])) + 1
+            try:
+                snapshot = self.series_source.portfolio_analytics(symbols, interval, days, window,
+                                                                  max_age=refresh_seconds)
+                if snapshot is not None:
+                    state['analytics'] = ((interval, window), snapshot)
+            except Exception as e:
+                logger.error(f"Erreur analyse de portefeuille: {e}")
+            finally:
+                state['loading'] = False
+        
+        def start_load():
+            if state['loading']:
+                state['reload'] = True  # relancé par redraw() à la fin du chargement en cours
+                return
+            state['loading'] = True
+            status_label.config(text="Chargement...")
+            threading.Thread(target=load, args=(list(self.watchlist), interval_var.get(), int(window_var.get())),
+                             daemon=True).start()
+        
+        def refresh():
+            if not analytics_window.winfo_exists():
+                return
+            start_load()
+            analytics_window.after(refresh_seconds * 1000, refresh)
+        
+        def redraw():
+            """Thread Tk : ne redessine que si les statistiques ou la référence ont changé"""
+            if not analytics_window.winfo_exists():
+                return
+            if state['reload'] and not state['loading']:
+                state['reload'] = False
+                start_load()
+            settings, analytics = state['analytics'] or (None, None)
+            benchmark = benchmark_var.get()
+            if analytics is not None and analytics.symbols and \
+                    state['shown'] != (settings, analytics.version, benchmark):
+                state['shown'] = (settings, analytics.version, benchmark)
+                symbols = analytics.symbols
+                image.set_data(analytics.correlation)
+                image.set_extent((-0.5, len(symbols) - 0.5, len(symbols) - 0.5, -0.5))
+                # Étiquettes seulement si elles restent lisibles
+                ticks = range(len(symbols)) if len(symbols) <= 40 else []
+                labels = [symbol.replace('USDT', '') for symbol in symbols] if ticks else []
+                ax.set_xticks(ticks, labels, rotation=90, fontsize=7, color='white')
+                ax.set_yticks(ticks, labels, fontsize=7, color='white')
+                canvas.draw_idle()
+                
+                if benchmark in symbols:
+                    strength = analytics.relative_strength(benchmark)
+                    beta = analytics.beta(benchmark)
+                    ranking_text.config(state='normal')
+                    ranking_text.delete('1.0', tk.END)
+                    ranking_text.insert(tk.END, f"{'Symbole':<12} {'Force rel.':>10} {'Bêta':>7}\n")
+                    for row in np.argsort(-strength):
+                        ranking_text.insert(tk.END, f"{symbols[row]:<12} {strength[row]:>+9.2f}% {beta[row]:>7.2f}\n")
+                    ranking_text.config(state='disabled')
+            if analytics is not None and not state['loading']:
+                status_label.config(text=f"{len(analytics.symbols)} symboles, {analytics.count} rendements "
+                                         f"(réf. {benchmark})")
+            analytics_window.after(500, redraw)
+        
+        for variable in (interval_var, window_var):
+            variable.trace_add('write', lambda *args: start_load())
+        
+        refresh()
+        redraw()
+    
+    def show_metrics_panel(self):
+        """Affiche le panneau de debug des métriques de performance"""
+        metrics_window = tk.Toplevel(self.root)
+        metrics_window.title("Métriques de performance")
+        metrics_window.geometry("640x420")
+        metrics_window.configure(bg=self.colors['bg_primary'])
+        metrics_window.transient(self.root)
+        
+        title = tk.Label(metrics_window, text="⏱ MÉTRIQUES", font=('Arial', 14, 'bold'),
+                        bg=self.colors['bg_primary'], fg=self.colors['accent'])
+        title.pack(pady=10)
+        
+        report_text = tk.Text(metrics_window, font=('Courier', 9), height=18,
+                              bg=self.colors['bg_tertiary'], fg=self.colors['text_primary'])
+        report_text.pack(fill='both', expand=True, padx=10, pady=5)
+        
+        def refresh_report():
+            if not metrics_window.winfo_exists():
+                return
+            report_text.config(state='normal')
+            report_text.delete('1.0', tk.END)
+            report_text.insert(tk.END, metrics.format_report())
+            report_text.config(state='disabled')
+            metrics_window.after(1000, refresh_report)
+        
+        def export_metrics(fmt):
+            extension = '.prom' if fmt == 'prometheus' else '.jsonl'
+            filename = filedialog.asksaveasfilename(
+                parent=metrics_window,
+                defaultextension=extension,
+                filetypes=[("Prometheus", "*.prom"), ("JSON lines", "*.jsonl")],
+                title="Exporter les métriques"
+            )
+            if filename:
+                content = metrics.export_prometheus() if fmt == 'prometheus' else metrics.export_jsonl()
+                Path(filename).write_text(content, encoding='utf-8')
+                messagebox.showinfo("Succès", f"Métriques exportées vers {filename}", parent=metrics_window)
+        
+        btn_frame = tk.Frame(metrics_window, bg=self.colors['bg_primary'])
+        btn_frame.pack(pady=10)
+        
+        tk.Button(btn_frame, text="Export Prometheus", command=lambda: export_metrics('prometheus'),
+                 bg=self.colors['bg_tertiary'], fg=self.colors['text_primary']).pack(side='left', padx=5)
+        tk.Button(btn_frame, text="Export JSON lines", command=lambda: export_metrics('jsonl'),
+                 bg=self.colors['bg_tertiary'], fg=self.colors['text_primary']).pack(side='left', padx=5)
+        tk.Button(btn_frame, text="Réinitialiser", command=metrics.reset,
+                 bg=self.colors['bg_tertiary'], fg=self.colors['text_primary']).pack(side='left', padx=5)
+        tk.Button(btn_frame, text="Fermer", command=metrics_window.destroy,
+                 bg=self.colors['accent'], fg='white').pack(side='left', padx=5)
+        
+        refresh_report()
+    
     def show_about(self):
         """Affiche la fenêtre À propos"""
         about_window = tk.Toplevel(self.root)
@@ -961,8 +4224,14 @@ Données fournies par l'API Binance"""
 
 def main():
     """Point d'entrée principal"""
+    parser = argparse.ArgumentParser(description="BlackCube - Trading & Analysis")
+    parser.add_argument('--api-url', help="URL de l'API compatible Binance (ex: serveur local mock_server.py)")
+    parser.add_argument('--no-collector', action='store_true',
+                        help="calcule les séries dans le processus de l'interface (sans collecteur)")
+    args = parser.parse_args()
+    
     try:
-        app = BlackCubeApp()
+        app = BlackCubeApp(api_url=args.api_url, use_collector=not args.no_collector)
         app.start_app()
     except Exception as e:
         logger.error(f"Erreur critique: {e}")
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+BlackCube - Serveur de données de marché local compatible Binance
+Sert /klines et /ticker/24hr à partir de données synthétiques ou d'une session
+enregistrée, avec latence, erreurs et limitation de débit configurables, ainsi
+qu'un carnet d'ordres synthétique (/depth et flux de diffs /depthStream) et des
+cours spot de métaux au format metals.live (/v1/spot).
+
+Exemples :
+    python mock_server.py --port 8080 --symbols 1000 --latency 50 --jitter 20
+    python mock_server.py --record session.jsonl --upstream https://api.binance.com/api/v3
+    python mock_server.py --replay session.jsonl --error-rate 0.05 --rate-limit 20
+    python main.py --api-url http://127.0.0.1:8080/api/v3
+    BLACKCUBE_METALS_URL=http://127.0.0.1:8080/v1/spot python main.py
+"""
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from synthetic import INTERVAL_MS, SyntheticDepth, generate_klines, live_ticker, synthetic_symbols
+
+logger = logging.getLogger(__name__)
+
+ENDPOINTS = ('klines', 'ticker/24hr', 'depthStream', 'depth', 'ping')
+METALS = ('gold', 'silver', 'platinum', 'palladium')
+
+class TokenBucket:
+    """Limiteur de débit (jetons par seconde, rafale = capacité)"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """Consomme un jeton, retourne False si la limite est atteinte"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+def _select(klines: List[list], limit: int, start_time: Optional[int]) -> List[list]:
+    """Applique startTime puis limit comme l'API Binance"""
+    if start_time:
+        klines = [kline for kline in klines if kline[0] >= start_time]
+        return klines[:limit]
+    return klines[-limit:]
+
+class SyntheticSource:
+    """Source de données générées (tous les symboles sont valides)"""
+
+    def __init__(self, length: int = 1000, seed: int = 42):
+        self.length = length
+        self.seed = seed
+        self._klines = lru_cache(maxsize=4096)(self._generate)
+
+    def _generate(self, symbol: str, interval: str, end_time: int, length: int) -> List[list]:
+        return generate_klines(symbol, length, interval, end_time=end_time, seed=self.seed)
+
+    def klines(self, symbol: str, interval: str = '1d', limit: int = 500,
+               start_time: Optional[int] = None, end_time: Optional[int] = None) -> Optional[List[list]]:
+        """Klines entre `start_time` et `end_time` (alignées sur l'intervalle)"""
+        step = INTERVAL_MS.get(interval, INTERVAL_MS['1d'])
+        end_time = end_time or int(time.time() * 1000)
+        body = self._klines(symbol, interval, end_time - end_time % step, self.length)
+        return _select(body, limit, start_time)
+
+    def ticker(self, symbol: str) -> Optional[Dict]:
+        """Ticker 24h évoluant avec le temps"""
+        now = time.time()
+        end_time = int(now * 1000)
+        # Historique court dédié : les tickers de milliers de symboles restent peu coûteux
+        klines = self._klines(symbol, '1h', end_time - end_time % INTERVAL_MS['1h'], 24)
+        return live_ticker(symbol, klines, now, self.seed)
+
+    def spot_history(self, metal: str, hours: int = 720) -> List[Dict]:
+        """Historique horaire d'un métal ([{timestamp, price}])"""
+        end_time = int(time.time() * 1000)
+        klines = self._klines(metal.upper(), '1h', end_time - end_time % INTERVAL_MS['1h'], hours)
+        return [{'timestamp': kline[0], 'price': float(kline[4])} for kline in klines]
+
+class ReplaySource:
+    """Source rejouant une session enregistrée (JSON lines)"""
+
+    def __init__(self, path: str, fallback: Optional[SyntheticSource] = None):
+        self.fallback = fallback
+        self.records: Dict[Tuple[str, str, str], object] = {}
+        with open(path, encoding='utf-8') as session:
+            for line in session:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get('status') != 200:
+                    continue
+                params = record.get('params', {})
+                body = record['body']
+                if record['endpoint'] == 'ticker/24hr':
+                    # Lot (?symbols=[...]) ou tous les symboles : un ticker par symbole
+                    for ticker in (body if isinstance(body, list) else [body]):
+                        self.records[('ticker/24hr', ticker['symbol'], '')] = ticker
+                    continue
+                key = (record['endpoint'], params.get('symbol', ''), params.get('interval', ''))
+                self.records[key] = body
+        logger.info(f"{len(self.records)} réponses chargées depuis {path}")
+
+    def klines(self, symbol: str, interval: str = '1d', limit: int = 500,
+               start_time: Optional[int] = None, end_time: Optional[int] = None) -> Optional[List[list]]:
+        body = self.records.get(('klines', symbol, interval))
+        if body is None:
+            if self.fallback:
+                return self.fallback.klines(symbol, interval, limit, start_time, end_time)
+            return None
+        if end_time:
+            body = [kline for kline in body if kline[0] <= end_time]
+        return _select(body, limit, start_time)
+
+    def ticker(self, symbol: str) -> Optional[Dict]:
+        body = self.records.get(('ticker/24hr', symbol, ''))
+        if body is None and self.fallback:
+            return self.fallback.ticker(symbol)
+        return body
+
+class Recorder:
+    """Relaie les requêtes vers l'API réelle et enregistre les réponses"""
+
+    def __init__(self, upstream: str, path: str):
+        self.upstream = upstream.rstrip('/')
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def forward(self, endpoint: str, params: Dict[str, str]) -> Tuple[int, object]:
+        response = requests.get(f'{self.upstream}/{endpoint}', params=params, timeout=10)
+        try:
+            body = response.json()
+        except ValueError:
+            body = {'code': -1, 'msg': response.text[:200]}
+        record = {'ts': time.time(), 'endpoint': endpoint, 'params': params,
+                  'status': response.status_code, 'body': body}
+        with self._lock, self.path.open('a', encoding='utf-8') as session:
+            session.write(json.dumps(record) + '\n')
+        return response.status_code, body
+
+class DepthFeed:
+    """Carnet synthétique d'un symbole publiant un diff toutes les `interval` secondes"""
+
+    def __init__(self, symbol: str, seed: int = 42, interval: float = 0.1,
+                 gap_rate: float = 0.0, history: int = 1000):
+        self.depth = SyntheticDepth(symbol, seed=seed)
+        self.interval = interval
+        self.gap_rate = gap_rate
+        self.events = deque(maxlen=history)
+        self.condition = threading.Condition()
+        self.running = True
+        self._random = random.Random(seed)
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f'depth-{symbol}')
+        self._thread.start()
+
+    def _run(self):
+        while self.running:
+            time.sleep(self.interval)
+            with self.condition:
+                event = self.depth.next_event(int(time.time() * 1000))
+                # Un diff perdu simule une rupture de séquence côté client
+                if not (self.gap_rate and self._random.random() < self.gap_rate):
+                    self.events.append(event)
+                self.condition.notify_all()
+
+    def snapshot(self, limit: int) -> Dict:
+        with self.condition:
+            return self.depth.snapshot(limit)
+
+    def follow(self, stopped: threading.Event):
+        """Itère sur les diffs publiés à partir de maintenant"""
+        with self.condition:
+            last = self.depth.update_id
+        while not stopped.is_set() and self.running:
+            with self.condition:
+                self.condition.wait(1.0)
+                pending = [event for event in self.events if event['u'] > last]
+            for event in pending:
+                last = event['u']
+                yield event
+
+    def stop(self):
+        self.running = False
+
+class MarketDataServer:
+    """Serveur HTTP local imitant l'API REST Binance v3"""
+
+    def __init__(self, source=None, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 rate_limit: Optional[float] = None, recorder: Optional[Recorder] = None,
+                 symbols: Optional[List[str]] = None, seed: int = 42,
+                 depth_interval: float = 0.1, gap_rate: float = 0.0):
+        self.source = source or SyntheticSource(seed=seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.limiter = TokenBucket(rate_limit) if rate_limit else None
+        self.recorder = recorder
+        self.symbols = symbols or []
+        self.seed = seed
+        self.depth_interval = depth_interval
+        self.gap_rate = gap_rate
+        self._depth: Dict[str, DepthFeed] = {}
+        self._depth_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.random = random.Random(seed)
+        self.stats = {'requests': 0, 'errors_injected': 0, 'rate_limited': 0}
+        self._stats_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """URL à passer à DataProvider (équivalent de https://api.binance.com/api/v3)"""
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/api/v3'
+
+    @property
+    def metals_url(self) -> str:
+        """URL des cours spot des métaux (équivalent de https://api.metals.live/v1/spot)"""
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/v1/spot'
+
+    def start(self) -> 'MarketDataServer':
+        """Démarre le serveur dans un thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Arrête le serveur"""
+        self._stopped.set()
+        for feed in self._depth.values():
+            feed.stop()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def depth_feed(self, symbol: str) -> DepthFeed:
+        """Carnet synthétique du symbole (créé à la première demande)"""
+        with self._depth_lock:
+            feed = self._depth.get(symbol)
+            if feed is None:
+                feed = self._depth[symbol] = DepthFeed(symbol, self.seed, self.depth_interval,
+                                                       self.gap_rate)
+            return feed
+
+    def handle(self, endpoint: str, params: Dict[str, str]) -> Tuple[int, object]:
+        """Calcule la réponse (statut, corps JSON) d'une requête"""
+        self._count('requests')
+
+        if self.limiter and not self.limiter.acquire():
+            self._count('rate_limited')
+            return 429, {'code': -1003, 'msg': 'Too many requests; rate limit exceeded.'}
+
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            self._count('errors_injected')
+            return 500, {'code': -1000, 'msg': 'An unknown error occurred (injected).'}
+
+        if endpoint == 'ping':
+            return 200, {}
+
+        if endpoint == 'spot':
+            source = self.source if hasattr(self.source, 'spot_history') else SyntheticSource(seed=self.seed)
+            metal = params.get('metal')
+            if metal:
+                return 200, source.spot_history(metal)
+            return 200, [{name: source.spot_history(name)[-1]['price']} for name in METALS]
+
+        if self.recorder:
+            return self.recorder.forward(endpoint, params)
+
+        symbol = params.get('symbol', '')
+        if endpoint == 'depth':
+            if not symbol:
+                return 400, {'code': -1102, 'msg': "Mandatory parameter 'symbol' was not sent."}
+            return 200, self.depth_feed(symbol).snapshot(min(int(params.get('limit', 100)), 5000))
+        if endpoint == 'klines':
+            body = self.source.klines(symbol, params.get('interval', '1d'),
+                                      min(int(params.get('limit', 500)), 1000),
+                                      int(params['startTime']) if 'startTime' in params else None,
+                                      int(params['endTime']) if 'endTime' in params else None)
+        elif symbol:
+            body = self.source.ticker(symbol)
+        elif 'symbols' in params:
+            # Comme Binance, un symbole inconnu fait échouer tout le lot
+            tickers = [self.source.ticker(name) for name in json.loads(params['symbols'])]
+            body = None if any(ticker is None for ticker in tickers) else tickers
+        else:
+            # Sans symbole, Binance retourne les tickers de tous les symboles
+            body = [ticker for ticker in map(self.source.ticker, self.symbols) if ticker]
+
+        if body is None:
+            return 400, {'code': -1121, 'msg': 'Invalid symbol.'}
+        return 200, body
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                endpoint = next((name for name in ENDPOINTS if url.path.endswith('/' + name)), None)
+                extra = {}
+                if '/v1/spot' in url.path:
+                    endpoint = 'spot'
+                    metal = url.path.split('/v1/spot', 1)[1].strip('/')
+                    extra = {'metal': metal} if metal else {}
+                if endpoint is None:
+                    status, body = 404, {'code': -1, 'msg': 'Not found'}
+                else:
+                    params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                    params.update(extra)
+                    if endpoint == 'depthStream' and params.get('symbol'):
+                        return self._stream_depth(params['symbol'])
+                    try:
+                        status, body = server.handle(endpoint, params)
+                    except Exception as e:
+                        logger.error(f"Erreur serveur {self.path}: {e}")
+                        status, body = 500, {'code': -1000, 'msg': str(e)}
+
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                if status == 429:
+                    self.send_header('Retry-After', '1')
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _stream_depth(self, symbol: str):
+                """Flux JSON lines de diffs depthUpdate (équivalent local du websocket)"""
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.end_headers()
+                try:
+                    for event in server.depth_feed(symbol).follow(server._stopped):
+                        self.wfile.write(json.dumps(event).encode() + b'\n')
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Serveur local compatible Binance pour BlackCube")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--symbols', type=int, default=6, help="symboles listés par /ticker/24hr sans paramètre")
+    parser.add_argument('--length', type=int, default=1000, help="historique synthétique par symbole")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--replay', help="session JSON lines à rejouer")
+    parser.add_argument('--record', help="enregistre les réponses de --upstream dans ce fichier")
+    parser.add_argument('--upstream', default='https://api.binance.com/api/v3')
+    parser.add_argument('--latency', type=float, default=0.0, help="latence ajoutée (ms)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="gigue aléatoire ajoutée (ms)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="probabilité de réponse 500")
+    parser.add_argument('--rate-limit', type=float, help="requêtes par seconde avant réponse 429")
+    parser.add_argument('--depth-interval', type=float, default=100, help="période des diffs du carnet (ms)")
+    parser.add_argument('--gap-rate', type=float, default=0.0, help="probabilité de perdre un diff du carnet")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    synthetic = SyntheticSource(args.length, args.seed)
+    source = ReplaySource(args.replay, fallback=synthetic) if args.replay else synthetic
+    recorder = Recorder(args.upstream, args.record) if args.record else None
+
+    server = MarketDataServer(source, args.host, args.port,
+                              latency=args.latency / 1000, jitter=args.jitter / 1000,
+                              error_rate=args.error_rate, rate_limit=args.rate_limit,
+                              recorder=recorder, symbols=synthetic_symbols(args.symbols),
+                              seed=args.seed, depth_interval=args.depth_interval / 1000,
+                              gap_rate=args.gap_rate)
+    logger.info(f"Serveur de marché sur {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+if __name__ == "__main__":
+    main()
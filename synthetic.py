@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+BlackCube - Générateur déterministe de données de marché synthétiques
+Produit des klines et tickers au format de l'API Binance (benchmarks, serveur local)
+"""
+
+import zlib
+from typing import Dict, List
+
+import numpy as np
+
+BASE_SYMBOLS = ["BTCUSDT", "ETHUSDT", "ADAUSDT", "SOLUSDT", "AVAXUSDT", "DOGEUSDT"]
+
+INTERVAL_MS = {
+    '1m': 60_000, '3m': 180_000, '5m': 300_000, '15m': 900_000, '30m': 1_800_000,
+    '1h': 3_600_000, '2h': 7_200_000, '4h': 14_400_000, '6h': 21_600_000,
+    '8h': 28_800_000, '12h': 43_200_000, '1d': 86_400_000, '3d': 259_200_000,
+    '1w': 604_800_000
+}
+
+def synthetic_symbols(count: int) -> List[str]:
+    """Liste de symboles : les symboles usuels puis des symboles numérotés"""
+    symbols = BASE_SYMBOLS[:count]
+    symbols.extend(f"SYM{index:04d}USDT" for index in range(len(symbols), count))
+    return symbols
+
+def _rng(symbol: str, seed: int) -> np.random.Generator:
+    """Générateur aléatoire propre à un symbole (reproductible)"""
+    return np.random.default_rng(zlib.crc32(symbol.encode()) ^ seed)
+
+def generate_klines(symbol: str, length: int = 1000, interval: str = '1d',
+                    end_time: int = 1_700_000_000_000, seed: int = 42) -> List[list]:
+    """Génère `length` klines (marche aléatoire géométrique) au format Binance"""
+    rng = _rng(symbol, seed)
+    step = INTERVAL_MS.get(interval, INTERVAL_MS['1d'])
+
+    start_price = float(rng.uniform(0.05, 50_000))
+    returns = rng.normal(0.0, 0.02, length)
+    closes = start_price * np.exp(np.cumsum(returns))
+    opens = np.concatenate(([start_price], closes[:-1]))
+    spread = np.abs(rng.normal(0.0, 0.01, (2, length)))
+    highs = np.maximum(opens, closes) * (1 + spread[0])
+    lows = np.minimum(opens, closes) * (1 - spread[1])
+    volumes = rng.lognormal(8.0, 1.0, length)
+    trades = rng.integers(100, 10_000, length)
+
+    open_times = end_time - step * np.arange(length, 0, -1, dtype=np.int64)
+
+    klines = []
+    for i in range(length):
+        open_time = int(open_times[i])
+        quote_volume = volumes[i] * closes[i]
+        klines.append([
+            open_time, f"{opens[i]:.8f}", f"{highs[i]:.8f}", f"{lows[i]:.8f}",
+            f"{closes[i]:.8f}", f"{volumes[i]:.8f}", open_time + step - 1,
+            f"{quote_volume:.8f}", int(trades[i]), f"{volumes[i] / 2:.8f}",
+            f"{quote_volume / 2:.8f}", "0"
+        ])
+    return klines
+
+def ticker_from_klines(symbol: str, klines: List[list]) -> Dict:
+    """Construit un ticker 24h (format /ticker/24hr) à partir des dernières klines"""
+    last = klines[-1]
+    open_price = float(last[1])
+    last_price = float(last[4])
+    change = last_price - open_price
+    return {
+        'symbol': symbol,
+        'priceChange': f"{change:.8f}",
+        'priceChangePercent': f"{change / open_price * 100:.3f}",
+        'lastPrice': last[4],
+        'openPrice': last[1],
+        'highPrice': last[2],
+        'lowPrice': last[3],
+        'volume': last[5],
+        'quoteVolume': last[7],
+        'openTime': last[0],
+        'closeTime': last[6],
+        'count': last[8]
+    }
+
+def live_ticker(symbol: str, klines: List[list], now: float, seed: int = 42) -> Dict:
+    """Ticker 24h qui évolue chaque seconde (marche aléatoire autour du dernier close)"""
+    ticker = ticker_from_klines(symbol, klines)
+    second = int(now)
+    rng = np.random.default_rng((zlib.crc32(symbol.encode()) ^ seed, second))
+    last_price = float(ticker['lastPrice']) * float(np.exp(rng.normal(0.0, 0.002)))
+    open_price = float(ticker['openPrice'])
+    change = last_price - open_price
+    ticker.update({
+        'lastPrice': f"{last_price:.8f}",
+        'priceChange': f"{change:.8f}",
+        'priceChangePercent': f"{change / open_price * 100:.3f}",
+        'closeTime': second * 1000
+    })
+    return ticker
+
+class SyntheticDepth:
+    """Carnet d'ordres synthétique produisant un snapshot et des diffs au format Binance"""
+
+    def __init__(self, symbol: str, levels: int = 500, seed: int = 42, tick: float = None):
+        self.symbol = symbol
+        self.rng = _rng(symbol, seed)
+        mid = float(self.rng.uniform(0.05, 50_000))
+        self.tick = tick or 10 ** (np.floor(np.log10(mid)) - 4)
+        self.mid = round(mid / self.tick)  # en ticks
+        self.update_id = 1_000
+        offsets = np.arange(1, levels + 1)
+        self.bids = dict(zip((self.mid - offsets).tolist(), self.rng.lognormal(0.0, 1.0, levels).tolist()))
+        self.asks = dict(zip((self.mid + offsets).tolist(), self.rng.lognormal(0.0, 1.0, levels).tolist()))
+
+    def _format(self, ticks: int, quantity: float) -> List[str]:
+        return [f"{ticks * self.tick:.8f}", f"{quantity:.8f}"]
+
+    def snapshot(self, limit: int = 1000) -> Dict:
+        """Réponse /depth (meilleurs niveaux d'abord)"""
+        bids = sorted(self.bids.items(), reverse=True)[:limit]
+        asks = sorted(self.asks.items())[:limit]
+        return {
+            'lastUpdateId': self.update_id,
+            'bids': [self._format(*level) for level in bids],
+            'asks': [self._format(*level) for level in asks]
+        }
+
+    def next_event(self, now_ms: int, changes: int = 10) -> Dict:
+        """Diff depthUpdate suivant : le prix médian dérive et des niveaux proches changent"""
+        self.mid += int(self.rng.integers(-2, 3))
+        bids, asks = {}, {}
+        for side, updates, sign in ((self.bids, bids, -1), (self.asks, asks, 1)):
+            # Les niveaux qui croisent le nouveau prix médian disparaissent
+            for ticks in [ticks for ticks in side if sign * (ticks - self.mid) <= 0]:
+                del side[ticks]
+                updates[ticks] = 0.0
+            for offset in self.rng.integers(1, 50, changes // 2):
+                ticks = int(self.mid + sign * offset)
+                if self.rng.random() < 0.2 and ticks in side:
+                    del side[ticks]
+                    updates[ticks] = 0.0
+                else:
+                    side[ticks] = updates[ticks] = float(self.rng.lognormal(0.0, 1.0))
+        first = self.update_id + 1
+        self.update_id += 1 + int(self.rng.integers(0, 3))
+        return {
+            'e': 'depthUpdate', 'E': now_ms, 's': self.symbol, 'U': first, 'u': self.update_id,
+            'b': [self._format(*level) for level in bids.items()],
+            'a': [self._format(*level) for level in asks.items()]
+        }